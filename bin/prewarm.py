@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download into the local cache the NUTS/country vector files provided by GISCO
+Rest API, so that later requests issued with the same parameters do not hit
+the network, e.g.:
+
+    python prewarm.py --year 2013 2016 --scale 20m 60m --level 0 1 2 3 \
+                      --manifest prewarm.jsonl --workers 8
+
+An interrupted run can be resumed by launching the same command again: files
+already recorded in the manifest (or already cached) are skipped.
+"""
+
+import sys
+import argparse
+
+try:
+    from happygisco import services
+except ImportError:
+    print('visit: https://github.com/eurostat/happyGISCO')
+    raise IOError
+
+def progress(done, total, url, error):
+    if error is None:
+        print('[%s/%s] ok %s' % (done, total, url))
+    else:
+        print('[%s/%s] failed %s - %s' % (done, total, url, error))
+    sys.stdout.flush()
+
+parser = argparse.ArgumentParser(description='Prewarm the cache of GISCO vector files.')
+parser.add_argument('--data', default='NUTS', choices=['NUTS', 'nuts', 'country', 'COUNTRY'],
+                    help='type of vector files to download (default: NUTS)')
+parser.add_argument('--source', help='source of the files, e.g. NUTS, BULK, NUTS2JSON')
+parser.add_argument('--unit', nargs='+', help='region/country identifiers')
+for dim in ('year', 'proj', 'scale', 'vector', 'level', 'ifmt'):
+    parser.add_argument('--' + dim, nargs='+', help='%s dimension(s) of the files' % dim)
+parser.add_argument('--cache-store', dest='cache_store',
+                    help='cache directory (default: platform dependent)')
+parser.add_argument('--workers', type=int, help='number of concurrent downloads')
+parser.add_argument('--rps', type=float, help='maximum number of requests per second')
+parser.add_argument('--manifest', help='file recording the downloads, used to resume a run')
+parser.add_argument('--force', action='store_true', help='download files even when already cached')
+args = parser.parse_args()
+
+dimensions = {k: v for k, v in vars(args).items()
+              if k in ('source', 'unit', 'year', 'proj', 'scale', 'vector', 'level', 'ifmt') and v is not None}
+for k in ('year', 'level', 'proj'):
+    if k in dimensions:
+        dimensions[k] = [int(v) if v.isdigit() else v for v in dimensions[k]]
+
+serv = services.GISCOService(cache_store=args.cache_store or True)
+report = serv.prewarm(data=args.data, workers=args.workers, rps=args.rps,
+                      manifest=args.manifest, progress=progress,
+                      _force_download_=args.force, **dimensions)
+
+print('\n%s files: %s downloaded, %s skipped, %s failed'
+      % (report['total'], report['downloaded'], report['skipped'], len(report['failed'])))
+sys.exit(1 if report['failed'] else 0)
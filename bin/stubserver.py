@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run a local stand-in for GISCO/OSM/ArcGIS web-services so that the services can
+be load tested or benchmarked offline, e.g.:
+
+    python stubserver.py --port 8080 --latency 0.05 --jitter 0.02 \
+                         --error-rate 0.01 --rate 50 --burst 10
+
+then point the services to the printed domains:
+
+    >>> serv = services.GISCOService(rest_url='http://127.0.0.1:8080/gisco', ...)
+"""
+
+import sys
+import argparse
+
+try:
+    from happygisco import settings
+    from happygisco.stubs import StubServer
+except ImportError:
+    print('visit: https://github.com/eurostat/happyGISCO')
+    raise IOError
+
+parser = argparse.ArgumentParser(description='Run a local stand-in for GISCO/OSM/ArcGIS web-services.')
+parser.add_argument('--host', default='127.0.0.1', help='address to listen to (default: 127.0.0.1)')
+parser.add_argument('--port', type=int, default=8080, help='port to listen to (default: 8080)')
+parser.add_argument('--latency', type=float, default=0., help='delay (in seconds) added to every answer')
+parser.add_argument('--jitter', type=float, default=0., help='upper bound of a random delay added to the latency')
+parser.add_argument('--error-rate', dest='error_rate', type=float, default=0.,
+                    help='probability of answering with an error status')
+parser.add_argument('--error-status', dest='error_status', type=int, nargs='+', default=[503],
+                    help='status(es) of the simulated errors (default: 503)')
+parser.add_argument('--rate', type=float, help='maximum number of requests per second before answering 429')
+parser.add_argument('--burst', type=int, default=1, help='number of requests accepted at once (default: 1)')
+parser.add_argument('--max-age', dest='max_age', type=int, help='value of the Cache-Control max-age header')
+parser.add_argument('--seed', type=int, help='seed of the random generator')
+parser.add_argument('--fixtures', help='JSON file with fixtures updating the default ones')
+args = parser.parse_args()
+
+server = StubServer(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                    error_rate=args.error_rate, error_status=args.error_status, rate=args.rate,
+                    burst=args.burst, max_age=args.max_age, seed=args.seed, fixtures=args.fixtures)
+server.start()
+for coder in (settings.CODER_GISCO, settings.CODER_OSM):
+    print('%s: %s' % (coder, ', '.join(['%s=%s' % kv for kv in server.domains(coder).items()])))
+sys.stdout.flush()
+server.serve_forever()
+print('\n%s' % dict(server.status))
@@ -54,7 +54,7 @@ import imp, inspect
 import collections, itertools, functools
 import six
 
-__all__ = ['settings', 'base', 'tools', 'services', 'features']#analysis:ignore
+__all__ = ['settings', 'base', 'tools', 'services', 'features', 'stubs']#analysis:ignore
 
 
 # sys.path.append(os.path.dirname(os.path.realpath(__file__)))
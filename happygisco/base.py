@@ -48,9 +48,9 @@ sake of an exhaustive documentation.
 
 **Dependencies**
 
-*require*:      :mod:`os`, :mod:`sys`, :mod:`io`, :mod:`asyncio`, :mod:`itertools`, :mod:`functools`, :mod:`collections`, :mod:`time`, :mod:`hashlib`, :mod:`zipfile`, :mod:`copy`, :mod:`json`
+*require*:      :mod:`os`, :mod:`sys`, :mod:`io`, :mod:`asyncio`, :mod:`itertools`, :mod:`functools`, :mod:`collections`, :mod:`time`, :mod:`threading`, :mod:`concurrent.futures`, :mod:`contextvars`, :mod:`weakref`, :mod:`hashlib`, :mod:`tempfile`, :mod:`zipfile`, :mod:`gzip`, :mod:`copy`, :mod:`json`
 
-*optional*:     :mod:`datetime`, :mod:`requests`,  :mod:`requests_cache`,  :mod:`cachecontrol`, :mod:`aiohttp`, :mod:`aiofiles`, :mod:`chardet`, :mod:`zipstream` 
+*optional*:     :mod:`datetime`, :mod:`sqlite3`, :mod:`requests`,  :mod:`requests_cache`,  :mod:`cachecontrol`, :mod:`aiohttp`, :mod:`aiofiles`, :mod:`chardet`, :mod:`orjson`, :mod:`ujson`, :mod:`zstandard`, :mod:`zipstream` 
 
 *call*:         :mod:`settings`         
 
@@ -68,15 +68,17 @@ __all__         = ['_Service', '_Feature', '_Tool', '_Decorator', '_NestedDict']
 #==============================================================================
 
 # import modules from Python Standard Library
-import os, sys, io
-import itertools, functools, collections
+import os, sys, io, re
+import itertools, functools, collections, contextlib, contextvars, weakref
 import inspect
 import asyncio
 
-import time
-import hashlib, urllib
-import shutil
-import copy, zipfile
+import time, threading, random
+import concurrent.futures
+import hashlib, urllib, urllib.parse
+import email.utils
+import shutil, tempfile
+import copy, zipfile, gzip
 #import abc
 
 # local (absolute) imports
@@ -93,19 +95,27 @@ except ImportError:
         class timedelta: 
             def __init__(self,arg): return arg
 
+try:                                
+    import sqlite3
+except ImportError:          
+    SQLITE3_INSTALLED = False
+    happyWarning("missing SQLITE3 module in Python Standard Library", ImportWarning)
+else:
+    SQLITE3_INSTALLED = True
+
 # requirements
 
 try:
     import aiohttp
 except:
-    ASYNCIO_AVAILABLE = False
+    ASYNCIO_AVAILABLE = AIOHTTP_INSTALLED = False
     happyWarning("missing AIOHTTP package (visit https://github.com/aio-libs/aiohttp)", ImportWarning)
     class aiohttp():
         class ClientResponse():
             pass
 else:
     SERVICE_AVAILABLE = True                
-    ASYNCIO_AVAILABLE = True
+    ASYNCIO_AVAILABLE = AIOHTTP_INSTALLED = True
     happyVerbose('AIOHTTP help: https://aiohttp.readthedocs.io/en/latest/')
     try:
         import aiofiles
@@ -129,6 +139,14 @@ except (AssertionError,ImportError) as e:
 else:
     SERVICE_AVAILABLE = True                
 
+try:
+    import urllib3
+    import urllib3.connection
+except ImportError:
+    URLLIB3_INSTALLED = False
+else:
+    URLLIB3_INSTALLED = True
+
 try:   
     assert ASYNCIO_AVAILABLE is False                              
     import requests_cache 
@@ -155,6 +173,7 @@ else:
     CACHECONTROL_INSTALLED = True
     happyVerbose('CACHECONTROL help: https://cachecontrol.readthedocs.io/en/latest/')
     from cachecontrol import CacheControl
+    from cachecontrol.adapter import CacheControlAdapter
     from cachecontrol.caches import FileCache
     try:
         import fasteners#analysis:ignore
@@ -175,6 +194,30 @@ except ImportError:
         class json:
             def loads(arg):  return '%s' % arg
 
+try:                                
+    import orjson
+except ImportError:  
+    ORJSON_INSTALLED = False
+else:
+    ORJSON_INSTALLED = True
+    happyVerbose('ORJSON help: https://github.com/ijl/orjson')
+
+try:                                
+    import ujson
+except ImportError:  
+    UJSON_INSTALLED = False
+else:
+    UJSON_INSTALLED = True
+    happyVerbose('UJSON help: https://github.com/ultrajson/ultrajson')
+
+try:                                
+    import zstandard
+except ImportError:  
+    ZSTANDARD_INSTALLED = False
+    happyWarning("missing ZSTANDARD package (visit https://pypi.org/project/zstandard/)", ImportWarning)
+else:
+    ZSTANDARD_INSTALLED = True
+
 try:                                
     import chardet
 except ImportError:  
@@ -203,12 +246,30 @@ class _Decorator(object):
     KW_CACHE        = 'cache_store'
     KW_EXPIRE       = 'expire_after'
     KW_FORCE        = '_force_download_' 
+    KW_PROBE        = '_probe_status_'
+    KW_DRY_RUN      = '_dry_run_'
     KW_BACKEND      = 'cache_backend'
+    KW_CACHE_SIZE   = 'cache_size'
+    KW_MEMORY       = 'memory_size'
+    KW_NEGATIVE     = 'negative_ttl'
+    KW_RATE_LIMITS  = 'rate_limits'
+    KW_RETRIES      = 'retries'
+    KW_FAMILIES     = 'families'
+    KW_ERRORS       = '_return_errors_'
+    KW_COPY         = '_copy_'
+    KW_POOL_LIMIT   = 'pool_limit'
+    KW_POOL_PER_HOST= 'pool_per_host'
+    KW_WORKERS      = 'workers'
+    KW_RPS          = 'rps'
+    KW_MANIFEST     = 'manifest'
+    KW_PROGRESS     = 'progress'
     
     KW_REST_URL     = 'rest_url'
     KW_CACHE_URL    = 'cache_url'
     KW_MAP_URL      = 'map_url'
     KW_ARCGIS       = 'arcgis'
+    KW_RESOLVER     = 'resolver'
+    KW_TRANSFORMER  = 'transformer'
     
     KW_CODER        = 'coder'
     
@@ -1974,27 +2035,39 @@ else:
         """Generic class used for representing a cached response.
             
             >>> resp = base._CachedResponse(resp, url, path='')
+            
+        where :data:`resp` is either a response, its content (:data:`bytes`), or
+        a binary file storing its content, in which case the content is read 
+        lazily from the file; :data:`codec` is the codec of the cached file stored
+        in :data:`path` (:data:`None` when it is not compressed) and :data:`fetched`
+        the time it was fetched.
         """ 
         # why not derive this class from aiohttp.ClientResponse in the case
         # ASYNCIO_AVAILABLE is True? actually, we refer here to aiohttp doc,
         # namely http://docs.aiohttp.org/en/stable/client_reference.html:
         #   "User never creates the instance of ClientResponse class but gets 
         #   it from API calls"
-        __attrs__ = requests.Response.__attrs__ + ['_cache_path', 'cache_store']
+        __attrs__ = requests.Response.__attrs__ + ['_cache_path', '_cache_codec', '_cache_fetched', 'cache_store']
         def __init__(self, *args, **kwargs):
             r, url = args
             path = kwargs.pop('path','')
+            codec, fetched = kwargs.pop('codec',None), kwargs.pop('fetched',None)
             try:
                 assert happyType.isstring(url) and happyType.isstring(path) \
-                    and isinstance(r,(bytes,requests.Response,aiohttp.ClientResponse))
+                    and isinstance(r,(bytes,io.IOBase,requests.Response,aiohttp.ClientResponse))
             except:
                 raise happyError('parsed initialising parameters not recognised')
             super(_CachedResponse,self).__init__()
             self.url = url
             self._cache_path = self.cache_store = path
+            self._cache_codec, self._cache_fetched = codec, fetched
             if isinstance(r,bytes):
                 self.reason, self.status_code = "OK", 200
                 self._content, self._content_consumed = r, True           
+            elif isinstance(r,io.IOBase):
+                # content is streamed from the file when (and if) accessed
+                self.reason, self.status_code = "OK", 200
+                self.raw, self._content, self._content_consumed = r, False, False
             elif isinstance(r,(requests.Response,aiohttp.ClientResponse)):
                 # self.__response = r
                 for attr in r.__dict__:
@@ -2005,201 +2078,2234 @@ else:
                  
 #%%
 #==============================================================================
-# CLASS _Service
+# CLASS _JSONBackend
 #==============================================================================
 
-class _Service(object):
-    """Base class for web-based geospatial services.
+class _JSONBackend(object):
+    """Pluggable JSON decoder used to parse the responses of the web-services.
     
-    This class is used to defined a web-session and simple connection operations 
-    called by a web-service. 
+        >>> data = _JSONBackend.loads(content, encoding=None)
+        >>> _JSONBackend.use(backend=None)
         
-       >>> serv = base._Service()        
+    The fastest available backend among :literal:`orjson`, :literal:`ujson` and 
+    the standard :mod:`json` (see :data:`settings.DEF_JSON_BACKENDS`) is used by 
+    default.
+    
+    Note
+    ----
+    Bytes contents are parsed directly (*i.e.* without decoding them first into
+    a text): the declared :data:`encoding` (*e.g.*, the charset of the response)
+    and, as a last resort, the encoding detected by :mod:`chardet` are used only 
+    when the content is not valid UTF-8.
     """
     
-    RESPONSE_FORMATS = ['resp', 'zip', 'raw', 'text', 'stringio', 'content', 'bytes', 'bytesio', 'json']
-    ZIP_OPERATIONS  = ['extract', 'extractall', 'getinfo', 'namelist', 'read', 'infolist']
+    BACKENDS = collections.OrderedDict([('json', json.loads)])
+    if UJSON_INSTALLED is True:
+        BACKENDS['ujson'] = ujson.loads
+    if ORJSON_INSTALLED is True:
+        BACKENDS['orjson'] = orjson.loads
+    backend, __loads = None, None
     
     #/************************************************************************/
-    def __init__(self, **kwargs):
-        self.__session           = None
-        self.__cache_store       = True
-        self.__expire_after      = None # datetime.deltatime(0)
-        self.__cache_backend     = None
-        # update with keyword arguments passed
-        if kwargs != {}:
-            attrs = (_Decorator.KW_CACHE,_Decorator.KW_EXPIRE,_Decorator.KW_FORCE)
-            for attr in list(set(attrs).intersection(kwargs.keys())):
-                setattr(self, '%s' % attr, kwargs.pop(attr))
-        # determine appropriate setting for a given session, taking into account
-        # the explicit setting on that request, and the setting in the session. 
-        self.__cache_backend = 'File'
-        if isinstance(self.__cache_store, bool):
-            self.__cache_store = self.__default_cache() if self.cache_store else None
-        # determine appropriate setting for a given session, taking into account
-        # the explicit setting on that request, and the setting in the session.
-        if ASYNCIO_AVAILABLE is False:            
-            try:
-                # whether requests_cache is defined or not, no matter
-                self.__session = requests.Session()
-                # session = requests.session(**kwargs)
-            except:
-                raise happyError('wrong requests setting - SESSION not initialised')
-            if CACHECONTROL_INSTALLED is True and self.cache_store is not None:
-                try:
-                    if self.expire_after is None or int(self.expire_after) > 0:
-                        cache_store = FileCache(os.path.abspath(self.cache_store))  
-                    else:
-                        cache_store = FileCache(os.path.abspath(self.cache_store), forever=True)
-                except:
-                    pass
-                else:
-                    self.__session = CacheControl(self.session, cache_store)
-            try:
-                assert self.session is not None
-            except:
-                raise happyError('wrong definition for SESSION parameters - SESSION not initialised')
-        else:
-            self.__session = None
+    @classmethod
+    def use(cls, backend=None):
+        """Select the JSON backend.
         
-    #/************************************************************************/
-    @property
-    def session(self):
-        """Session property (:data:`getter`/:data:`setter`) of an instance of
-        a class :class:`_Service`. :data:`session` is itself an instance of a
-        :class:`requests.session.Session` class.
-        """ # A session type is :class:`requests.session.Session`.
-        return self.__session
-    @session.setter#analysis:ignore
-    def session(self, session):
-        if session is not None and not isinstance(session, requests.sessions.Session, aiohttp.client.ClientSession):
-            raise happyError('wrong type for SESSION parameter')
-        self.__session = session
-    
-    #/************************************************************************/
-    @property
-    def cache_store(self):
-        """Cache property (:data:`getter`/:data:`setter`) of an instance of
-        a class :class:`_Service`. :data:`cache_store` is set to the physical 
-        location (*i.e.* on the drive) of the repository used to cache the 
-        downloaded datasets/responses.
+            >>> backend = _JSONBackend.use(backend=None)
+            
+        Keyword arguments
+        -----------------
+        backend : str
+            any key of :data:`_JSONBackend.BACKENDS`; default: the first available 
+            backend in :data:`settings.DEF_JSON_BACKENDS`.
         """
-        return self.__cache_store
-    @cache_store.setter
-    def cache_store(self, cache_store):
-        if not(cache_store is None or isinstance(cache_store, (str,bool))):
-            raise happyError('wrong type for %s parameter' % _Decorator.KW_CACHE.upper())
-        else:
-            #if cache_store not in (False,'',None) and requests_cache is None and CACHECONTROL_INSTALLED is False:
-            #    raise happyError('caching not supported in the absence of modules requests_cache and cachecontrol')                
-            pass
-        self.__cache_store = cache_store
-    
-    #/************************************************************************/
-    @property
-    def cache_backend(self):
-        return self.__cache_backend
-    # note: no setter ... 
+        if backend is None:
+            backend = next((b for b in settings.DEF_JSON_BACKENDS if b in cls.BACKENDS), 'json')
+        try:
+            assert backend in cls.BACKENDS
+        except:
+            raise happyError('JSON backend %s not available' % backend)
+        cls.backend, cls.__loads = backend, cls.BACKENDS[backend]
+        return backend
 
     #/************************************************************************/
-    @property
-    def expire_after(self):
-        """Expiration property (:data:`getter`/:data:`setter`) of an instance of
-        a class :class:`_Service`. :data:`expire_after` represents the time after
-        which datasets downloaded and cached through this instance shall be 
-        downloaded again.
-        """
-        return self.__expire_after
-    @expire_after.setter
-    def expire_after(self, expire_after):
-        if expire_after is None or isinstance(expire_after, (int, datetime.timedelta)) \
-                and (int(expire_after)>=0 or expire_after==-1):
-            self.__expire_after = expire_after
-        elif not isinstance(expire_after, (int, datetime.timedelta)):
-            raise happyError('wrong type for %s parameter' % _Decorator.KW_EXPIRE.upper())
-        #elif isinstance(expire_after, int) and expire_after<0:
-        #    raise happyError('wrong time setting for %s parameter' % _Decorator.KW_EXPIRE.upper())
+    @classmethod
+    def loads(cls, data, encoding=None):
+        """Parse a JSON document.
         
-    #/************************************************************************/   
-    def __get_status(self, url):
-        # sequential implementation of get_status
+            >>> obj = _JSONBackend.loads(data, encoding=None)
+            
+        Arguments
+        ---------
+        data : bytes,str
+            JSON document.
+            
+        Keyword arguments
+        -----------------
+        encoding : str
+            encoding of :data:`data` (when parsed as bytes) tried when it is not 
+            valid UTF-8.
+        """
         try:
-            response = self.session.head(url)
-        except requests.ConnectionError:
-            raise happyError('connection failed - a Connection error occurred')  
-        except requests.HTTPError:
-            raise happyError('request failed - an HTTP error occurred.')  
-        else:
-            status = response.status_code
+            return cls.__loads(data)
+        except (ValueError, TypeError): # including JSONDecodeError and UnicodeDecodeError
+            if not isinstance(data, (bytes, bytearray, memoryview)):
+                raise happyError('error JSON-decoding of str text')
+        data = bytes(data)
+        encodings = [encoding, 'utf-8-sig']
+        if CHARDET_INSTALLED is True:
+            encodings.append(lambda: chardet.detect(data)['encoding'])
+        for enc in encodings:
+            try:
+                enc = enc() if callable(enc) else enc
+                assert enc is not None
+                return cls.__loads(data.decode(enc))
+            except (AssertionError, LookupError, ValueError, TypeError):
+                pass
+        raise happyError('error JSON-decoding of bytes content')
+
+_JSONBackend.use()
+
+#%%
+#==============================================================================
+# CLASS _RateLimiter
+#==============================================================================
+
+class _RateLimiter(object):
+    """Thread-safe limiter of the rate and of the concurrency of the requests 
+    issued to every host, adapting to the responses of the servers.
+    
+        >>> limiter = base._RateLimiter(rates=None, concurrency=None, rps=None)
+        >>> limiter.acquire(url)
+        >>> ... # issue the request
+        >>> limiter.release(url, status, latency)
+        >>> limiter.wait() # pace a batch of requests, whatever their hosts
+        
+    Keyword arguments
+    -----------------
+    rates : dict
+        maximum number of requests per second issued to given hosts; default to
+        :data:`settings.DEF_RATE_LIMITS`; other hosts are not rate limited.
+    concurrency : int
+        maximum number of concurrent requests to the same host; default to 
+        :data:`settings.DEF_POOL_PER_HOST`.
+    rps : float
+        maximum overall number of requests per second, enforced by :meth:`wait`
+        (*e.g.*, for batches of requests); default to :data:`None`, *i.e.* 
+        :meth:`wait` returns immediately.
+        
+    Note
+    ----
+    The rate of the requests to a host is bounded by a token bucket (of capacity
+    :data:`settings.DEF_RATE_BURST`). Their concurrency follows an additive-increase/
+    multiplicative-decrease (AIMD) scheme: it is cut (see :data:`settings.DEF_AIMD`)
+    whenever the server throttles (429/503 status), fails to respond, or is much
+    slower than usual, and it grows back by one request per window of successful
+    requests. When a server asks to retry later (:literal:`Retry-After` header), 
+    no request is issued to that host until then. Coroutines waiting for a slot
+    are woken up by :meth:`release`, whatever the thread or event loop it is run
+    from.
+    """
+    
+    #/************************************************************************/
+    def __init__(self, rates=None, concurrency=None, rps=None):
+        rates = dict(settings.DEF_RATE_LIMITS if rates is None else rates)
+        concurrency = settings.DEF_POOL_PER_HOST if concurrency is None else concurrency
         try:
-            name = settings.HTTP_ERROR_STATUS[status]['name']
-            desc = settings.HTTP_ERROR_STATUS[status]['desc']
-        except KeyError:
-            name = desc = 'Unknown error'#analysis:ignore
-        happyVerbose('response status from web-service: %s ("%s")' % (status,name))
+            assert all([r is None or (happyType.isnumeric(r) and r > 0) for r in rates.values()])
+            assert isinstance(concurrency, int) and concurrency > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_RATE_LIMITS.upper())
         try:
-            response.raise_for_status()
+            assert rps is None or (happyType.isnumeric(rps) and rps > 0)
         except:
-            raise happyError('wrong request - %s status ("%s") returned' % (status,name))  
-        else:
-            response.close()
-        return status
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_RPS.upper())
+        self.rates = {h.lower(): r for h, r in rates.items()}
+        self.concurrency, self.rps = concurrency, rps
+        self.__hosts = {}
+        self.__cond = threading.Condition()
+        self.__waiters = [] # (loop, future) of the coroutines waiting for a slot
+        self.__next = 0. # next slot of the overall pace
 
     #/************************************************************************/
-    async def __aio_get_status(self, session, url):
-        # asynchronous implementation of get_status
+    @staticmethod
+    def host(url):
+        """Host (and port, if any) of a URL.
+        
+            >>> host = _RateLimiter.host(url)
+        """
         try:
-            response = await session.head(url)
-        except Exception as e: # aiohttp.ClientConnectionError:
-            raise happyError('connection failed', errtype=e)  
-        else: 
-            status = response.status
+            return urllib.parse.urlsplit(url).netloc.lower()
+        except (ValueError, AttributeError):
+            return ''
+    
+    def __state(self, host):
+        # state of a host, created on first use
         try:
-            name = settings.HTTP_ERROR_STATUS[status]['name']
-            desc = settings.HTTP_ERROR_STATUS[status]['desc']
+            return self.__hosts[host]
         except KeyError:
-            name = desc = 'Unknown error'#analysis:ignore
-        happyVerbose('response status from web-service: %s ("%s")' % (status,name))
-        async with response:
+            rate = self.rates.get(host, self.rates.get(host.split(':')[0]))
+            state = {'rate': rate, 'tokens': settings.DEF_RATE_BURST, 'refill': time.monotonic(),
+                     'limit': float(self.concurrency), 'inflight': 0, 'latency': None, 'resume': 0.}
+            self.__hosts[host] = state
+            return state
+
+    #/************************************************************************/
+    def __reserve(self, host):
+        # take a token and a concurrency slot if available (and return 0), or 
+        # return the time to wait before trying again; the lock shall be held
+        state, now = self.__state(host), time.monotonic()
+        if now < state['resume']:
+            return state['resume'] - now
+        if state['rate'] is not None:
+            state['tokens'] = min(settings.DEF_RATE_BURST, 
+                                  state['tokens'] + (now - state['refill']) * state['rate'])
+            state['refill'] = now
+            if state['tokens'] < 1:
+                return (1 - state['tokens']) / state['rate']
+        if state['inflight'] >= int(state['limit']):
+            return None # until a request completes
+        if state['rate'] is not None:
+            state['tokens'] -= 1
+        state['inflight'] += 1
+        return 0.
+
+    #/************************************************************************/
+    def acquire(self, url):
+        """Block until a request to the host of a URL can be issued.
+        
+            >>> limiter.acquire(url)
+        """
+        host = self.host(url)
+        with self.__cond:
+            delay = self.__reserve(host)
+            while delay is None or delay > 0:
+                self.__cond.wait(delay)
+                delay = self.__reserve(host)
+
+    #/************************************************************************/
+    async def aacquire(self, url):
+        """Asynchronous counterpart of :meth:`acquire`, which suspends the calling
+        coroutine only.
+        """
+        host = self.host(url)
+        while True:
+            with self.__cond:
+                delay = self.__reserve(host)
+                if delay is None:
+                    # woken up by release, possibly from another thread/loop
+                    loop = asyncio.get_running_loop()
+                    waiter = (loop, loop.create_future())
+                    self.__waiters.append(waiter)
+            if delay is None:
+                try:
+                    await waiter[1]
+                finally:
+                    with self.__cond:
+                        if waiter in self.__waiters:
+                            self.__waiters.remove(waiter)
+            elif delay <= 0:
+                return
+            else:
+                await asyncio.sleep(delay)
+
+    #/************************************************************************/
+    def release(self, url, status=None, latency=None):
+        """Release the slot of a completed request, and adapt the concurrency of 
+        the requests to its host.
+        
+            >>> limiter.release(url, status=None, latency=None)
+            
+        Keyword arguments
+        -----------------
+        status : int
+            HTTP status of the response; :data:`None` when the request failed.
+        latency : float
+            time (in seconds) the server took to respond.
+        """
+        decrease, slowdown = settings.DEF_AIMD
+        with self.__cond:
+            state = self.__state(self.host(url))
+            state['inflight'] = max(0, state['inflight'] - 1)
+            if status is None or status in (429, 503):
+                state['limit'] = max(1., state['limit'] * decrease)
+            elif latency is not None and state['latency'] is not None and latency > slowdown * state['latency']:
+                state['limit'] = max(1., state['limit'] * (1 + decrease) / 2) # milder
+            else:
+                state['limit'] = min(float(self.concurrency), state['limit'] + 1. / state['limit'])
+            if latency is not None and status is not None and status < 400:
+                state['latency'] = latency if state['latency'] is None else min(state['latency'], latency)
+            self.__cond.notify_all()
+            waiters, self.__waiters = self.__waiters, []
+        for loop, future in waiters:
             try:
-                response.raise_for_status()
-            except:
-                raise happyError('wrong request - %s status ("%s") returned' % (status,name))  
-                #happyVerbose('response status from web-service: %s' % status)
-        return status
+                loop.call_soon_threadsafe(self.__wake, future)
+            except RuntimeError: # loop closed
+                pass
+
+    @staticmethod
+    def __wake(future):
+        if not future.done():
+            future.set_result(None)
+
+    #/************************************************************************/
+    @staticmethod
+    def retry_after(value):
+        """Parse the value of a :literal:`Retry-After` header into a delay (in 
+        seconds), or :data:`None`.
         
-    #/************************************************************************/ 
-    @_Decorator.parse_url
-    def get_status(self, *url, **kwargs):
-        """Retrieve the header of a URL and return the server's status code.
+            >>> delay = _RateLimiter.retry_after(value)
+        """
+        if value in (None, ''):
+            return None
+        try:
+            return max(0., float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0., email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+
+    #/************************************************************************/
+    def backoff(self, url, attempt, retry_after=None):
+        """Delay (in seconds) before retrying a request.
         
-            >>> status = serv.get_status(*url)
+            >>> delay = limiter.backoff(url, attempt, retry_after=None)
             
         Arguments
         ---------
-        url : str
-            complete URL name(s) whom status will be checked.
-        
-        Returns
-        -------
-        status : int
-            response status code(s).
+        attempt : int
+            number of the retry, starting from 0.
             
-        Raises
-        ------
-        happyError
-            error is raised in the cases:
-                
-                * the request is wrongly formulated,
-                * the connection fails.
+        Keyword arguments
+        -----------------
+        retry_after : str, float
+            value of the :literal:`Retry-After` header of the response, if any; 
+            when set, the host is paused for that long.
             
-        Examples
-        --------
-        We can see the response status code when connecting to different web-pages
-        or services:
+        Returns
+        -------
+        delay : float
+            the delay stated by the server, or a random (jittered) delay growing
+            exponentially with :data:`attempt` (see :data:`settings.DEF_BACKOFF`).
+        """
+        base, cap = settings.DEF_BACKOFF
+        delay = self.retry_after(retry_after)
+        if delay is None:
+            return random.uniform(0, min(cap, base * 2 ** attempt))
+        with self.__cond:
+            state = self.__state(self.host(url))
+            state['resume'] = max(state['resume'], time.monotonic() + delay)
+        return delay
+
+    #/************************************************************************/
+    def state(self, url):
+        """Current rate, concurrency limit, number of requests in flight and lowest
+        latency of the requests to the host of a URL.
         
-            >>> serv = base._Service()
-            >>> serv.get_status('http://dumb')
+            >>> state = limiter.state(url)
+        """
+        with self.__cond:
+            state = self.__state(self.host(url))
+            return {k: state[k] for k in ('rate', 'limit', 'inflight', 'latency')}
+
+    #/************************************************************************/
+    def delay(self):
+        """Reserve the next slot of the overall pace (see :data:`rps`) and return
+        the time (in seconds) to wait until then.
+        
+            >>> delay = limiter.delay()
+        """
+        if self.rps is None:
+            return 0.
+        with self.__cond:
+            now = time.monotonic()
+            slot = max(now, self.__next)
+            self.__next = slot + 1. / self.rps
+        return slot - now
+
+    #/************************************************************************/
+    def wait(self):
+        """Block until the next request is allowed to be issued at the overall
+        pace (see :data:`rps`).
+        """
+        delay = self.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    #/************************************************************************/
+    async def await_(self):
+        """Asynchronous counterpart of :meth:`wait`, which suspends the calling 
+        coroutine only.
+        """
+        delay = self.delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+#%%
+#==============================================================================
+# CLASS _SingleFlight
+#==============================================================================
+
+class _SingleFlight(object):
+    """Coalescing of identical calls run concurrently, so that only the first 
+    one is actually executed while the other ones wait for and share its result.
+    
+        >>> flight = base._SingleFlight()
+        >>> res = flight.do(key, func, *args, **kwargs)
+        >>> res = await flight.ado(key, coro, *args, **kwargs)
+        
+    Note
+    ----
+    Calls are identified by their :data:`key` (*e.g.*, a URL); a call is shared 
+    as long as it is running only, *i.e.* results are not stored. Threads and
+    coroutines (of the same event loop) are coalesced separately.
+    """
+    
+    #/************************************************************************/
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__tasks = weakref.WeakKeyDictionary() # one table per event loop
+        self.coalesced = 0
+
+    #/************************************************************************/
+    def do(self, key, func, *args, **kwargs):
+        """Run :data:`func` unless a call with the same :data:`key` is already 
+        running in another thread, in which case its result is waited for.
+        """
+        with self.__lock:
+            future = self.__calls.get(key)
+            leader = future is None
+            if leader is True:
+                future = self.__calls[key] = concurrent.futures.Future()
+            else:
+                self.coalesced += 1
+        if leader is False:
+            return future.result()
+        try:
+            res = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(res)
+            return res
+        finally:
+            with self.__lock:
+                self.__calls.pop(key, None)
+
+    #/************************************************************************/
+    async def ado(self, key, coro, *args, **kwargs):
+        """Asynchronous counterpart of :meth:`do`: await the coroutine function
+        :data:`coro` unless a task with the same :data:`key` is already running 
+        on the caller's event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            tasks = self.__tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is not None:
+            with self.__lock:
+                self.coalesced += 1
+        else:
+            task = tasks[key] = loop.create_task(coro(*args, **kwargs))
+            def done(t):
+                if tasks.get(key) is t:
+                    tasks.pop(key)
+                if not t.cancelled():
+                    t.exception() # retrieved by the waiters anyway
+            task.add_done_callback(done)
+        # a cancelled waiter does not cancel the shared task
+        return await asyncio.shield(task)
+
+#%%
+#==============================================================================
+# CLASS _CacheStats
+#==============================================================================
+
+class _CacheStats(object):
+    """Counters of the activity of the caches of a web-service, broken down by
+    family of endpoints.
+    
+        >>> stats = base._CacheStats(families=None)
+        
+    Keyword arguments
+    -----------------
+    families : list[tuple]
+        pairs :literal:`(family, pattern)` where :data:`pattern` is a regular 
+        expression matched against the path of a URL to tell whether it belongs
+        to :data:`family`; default to :data:`settings.DEF_CACHE_FAMILIES`.
+        
+    Note
+    ----
+    The following counters are maintained for every family: 
+        
+    * :literal:`hits`: responses served from the memory or the disk cache,
+    * :literal:`misses`: responses downloaded,
+    * :literal:`revalidations`: expired responses confirmed by the server (not 
+      downloaded again),
+    * :literal:`bytes_read`, :literal:`bytes_written`: sizes of the responses 
+      read from and written into the caches,
+    * :literal:`evictions`: responses evicted from the disk cache,
+    * :literal:`network_time`, :literal:`disk_time`: time (in seconds) spent 
+      downloading responses and reading them from the disk.
+    """
+    
+    COUNTERS = ('hits', 'misses', 'revalidations', 'bytes_read', 'bytes_written', 
+                'evictions', 'network_time', 'disk_time')
+    OTHER = 'other'
+    
+    #/************************************************************************/
+    def __init__(self, families=None):
+        families = settings.DEF_CACHE_FAMILIES if families is None else families
+        try:
+            self.families = collections.OrderedDict([(f, re.compile(p)) for f, p in families])
+        except:
+            raise happyError('wrong format for endpoint families')
+        self.__lock = threading.Lock()
+        self.__counters = {}
+
+    #/************************************************************************/
+    def family(self, url):
+        """Family of the endpoint of a URL.
+        
+            >>> family = stats.family(url)
+        """
+        try:
+            path = urllib.parse.urlsplit(url).path
+        except ValueError:
+            return self.OTHER
+        return next((f for f, p in self.families.items() if p.search(path)), self.OTHER)
+
+    #/************************************************************************/
+    def add(self, url, **counters):
+        """Increment the counters of the family of a URL.
+        
+            >>> stats.add(url, **counters)
+        """
+        family = self.family(url)
+        with self.__lock:
+            current = self.__counters.setdefault(family, dict.fromkeys(self.COUNTERS, 0))
+            for counter, value in counters.items():
+                current[counter] += value
+
+    #/************************************************************************/
+    @contextlib.contextmanager
+    def timer(self, url, counter):
+        """Context manager adding the time spent in its body to a counter of the 
+        family of a URL.
+        
+            >>> with stats.timer(url, 'network_time'):
+                    ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(url, **{counter: time.perf_counter() - start})
+
+    #/************************************************************************/
+    def report(self, family=None):
+        """Report the counters.
+        
+            >>> report = stats.report(family=None)
+            
+        Keyword arguments
+        -----------------
+        family : str
+            family whose counters are reported; default: all families are.
+            
+        Returns
+        -------
+        report : dict
+            counters of every family (or of the input :data:`family` only), 
+            together with their :literal:`hit_rate`, *i.e.* the share of the 
+            responses not downloaded; all counters are summed up under the 
+            :literal:`'total'` key.
+        """
+        with self.__lock:
+            report = {f: dict(c) for f, c in self.__counters.items()}
+        report['total'] = {k: sum([c[k] for c in report.values()]) for k in self.COUNTERS}
+        for c in report.values():
+            n = c['hits'] + c['revalidations'] + c['misses']
+            c['hit_rate'] = (c['hits'] + c['revalidations']) / n if n > 0 else None
+        if family is None:
+            return report
+        return report.get(family) or dict(dict.fromkeys(self.COUNTERS, 0), hit_rate=None)
+
+    #/************************************************************************/
+    def reset(self):
+        """Reset all counters.
+        """
+        with self.__lock:
+            self.__counters = {}
+
+#%%
+#==============================================================================
+# CLASS _Tracer
+#==============================================================================
+
+class _Tracer(object):
+    """Dispatcher of the lifecycle events of the requests issued by a web-service
+    to the hooks registered on it.
+    
+        >>> tracer = base._Tracer(family=None)
+        
+    Keyword arguments
+    -----------------
+    family : callable
+        function returning the family of the endpoint of a URL (see :meth:`_CacheStats.family`);
+        default: no family is reported.
+        
+    Note
+    ----
+    Hooks are called with a single dictionary argument describing the event, with
+    keys :literal:`event`, :literal:`url` and :literal:`family`, together with:
+        
+    * for :literal:`'cache'` events, *i.e.* the lookup of a URL in the caches:
+      :literal:`lookup` (any of :literal:`'memory', 'fresh', 'revalidated', 'downloaded'`),
+      :literal:`size` (in bytes) and :literal:`disk_time` (time spent reading
+      the cached response, in seconds);
+    * for :literal:`'request'` events, *i.e.* an HTTP exchange with a server: 
+      :literal:`status`, :literal:`connect` (time spent opening a new connection,
+      DNS resolution and TLS handshake included; 0 when a pooled connection is 
+      reused), :literal:`dns` (time spent resolving the host; asynchronous requests
+      only), :literal:`ttfb` (time to the first byte of the response), :literal:`size`
+      (of the body, in bytes), :literal:`elapsed` and :literal:`retries`;
+    * for :literal:`'decode'` events, *i.e.* the parsing of a response: 
+      :literal:`format`, :literal:`size` and :literal:`decode_time`.
+      
+    Hooks are run in the thread, or on the event loop, issuing the request: they
+    shall be quick. Errors raised by hooks are reported as warnings and ignored.
+    """
+    
+    EVENTS = ('cache', 'request', 'decode')
+    
+    _CURRENT = contextvars.ContextVar('happygisco_trace', default=None)
+    # trace of the request currently run, if any
+    
+    #/************************************************************************/
+    def __init__(self, family=None):
+        self.family = family
+        self.__hooks = [] # (hook, events)
+        self.__lock = threading.Lock()
+
+    #/************************************************************************/
+    def register(self, hook, events=None):
+        """Register a hook called on given events.
+        
+            >>> tracer.register(hook, events=None)
+            
+        Arguments
+        ---------
+        hook : callable
+            function accepting a single dictionary argument.
+            
+        Keyword arguments
+        -----------------
+        events : str, list[str]
+            any of :data:`_Tracer.EVENTS`; default: the hook is called on all events.
+        """
+        if events is None:
+            events = self.EVENTS
+        elif happyType.isstring(events):
+            events = [events,]
+        try:
+            assert callable(hook)
+            assert all([e in self.EVENTS for e in events])
+        except:
+            raise happyError('wrong hook or events - must be any of %s' % list(self.EVENTS))
+        with self.__lock:
+            self.__hooks = self.__hooks + [(hook, tuple(events))]
+        return hook
+
+    #/************************************************************************/
+    def unregister(self, hook):
+        """Unregister a hook.
+        
+            >>> tracer.unregister(hook)
+        """
+        with self.__lock:
+            self.__hooks = [h for h in self.__hooks if h[0] != hook]
+
+    def __bool__(self):
+        return len(self.__hooks) > 0
+
+    #/************************************************************************/
+    def emit(self, event, url, **info):
+        """Call the hooks registered on an event.
+        
+            >>> tracer.emit(event, url, **info)
+        """
+        hooks = [h for h, events in self.__hooks if event in events]
+        if hooks == []:
+            return
+        info.update({'event': event, 'url': url, 
+                     'family': self.family(url) if self.family is not None and url is not None else None})
+        for hook in hooks:
+            try:
+                hook(dict(info))
+            except Exception as e:
+                happyWarning('error in %s hook %s - %s' % (event, hook, e))
+
+    #/************************************************************************/
+    @classmethod
+    def record(cls, key, value):
+        """Add a measure to the trace of the request currently run, if any.
+        
+            >>> _Tracer.record(key, value)
+        """
+        trace = cls._CURRENT.get()
+        if trace is not None:
+            trace[key] = trace.get(key, 0) + value
+
+    #/************************************************************************/
+    @contextlib.contextmanager
+    def request(self, url):
+        """Context manager collecting the trace of an HTTP exchange, emitted as a
+        :literal:`'request'` event when it exits.
+        
+            >>> with tracer.request(url) as trace:
+                    ...
+        """
+        trace = {'status': None, 'connect': 0., 'dns': 0., 'ttfb': None, 'size': 0, 'retries': 0, 
+                 'start': time.perf_counter()}
+        token = self._CURRENT.set(trace)
+        try:
+            yield trace
+        finally:
+            self._CURRENT.reset(token)
+            trace['elapsed'] = time.perf_counter() - trace.pop('start')
+            self.emit('request', url, **trace)
+
+    #/************************************************************************/
+    @classmethod
+    def trace_config(cls):
+        """Configuration of the tracing of the asynchronous requests, *i.e.* an
+        :class:`aiohttp.TraceConfig` instance, to be passed to a session.
+        
+            >>> config = _Tracer.trace_config()
+        """
+        config = aiohttp.TraceConfig()
+        def started(key):
+            async def on_start(session, ctx, params):
+                ctx.start = time.perf_counter()
+            return on_start
+        def ended(key):
+            async def on_end(session, ctx, params):
+                cls.record(key, time.perf_counter() - ctx.start)
+            return on_end
+        config.on_connection_create_start.append(started('connect'))
+        config.on_connection_create_end.append(ended('connect'))
+        config.on_dns_resolvehost_start.append(started('dns'))
+        config.on_dns_resolvehost_end.append(ended('dns'))
+        return config
+
+if URLLIB3_INSTALLED is True:
+    # connections reporting the time spent opening them (DNS resolution and TLS
+    # handshake included) to the trace of the current request
+    class _TracedHTTPConnection(urllib3.connection.HTTPConnection):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super(_TracedHTTPConnection, self).connect()
+            finally:
+                _Tracer.record('connect', time.perf_counter() - start)
+
+    class _TracedHTTPSConnection(urllib3.connection.HTTPSConnection):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super(_TracedHTTPSConnection, self).connect()
+            finally:
+                _Tracer.record('connect', time.perf_counter() - start)
+
+    class _TracedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+        ConnectionCls = _TracedHTTPConnection
+
+    class _TracedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+        ConnectionCls = _TracedHTTPSConnection
+
+#%%
+#==============================================================================
+# CLASS _DiskCache
+#==============================================================================
+
+class _DiskCache(object):
+    """Size-bounded on-disk store of web-service responses.
+    
+        >>> cache = base._DiskCache(root, max_size=None)
+        
+    Arguments
+    ---------
+    root : str
+        physical location (*i.e.* on the drive) of the cache repository.
+        
+    Keyword arguments
+    -----------------
+    max_size : int
+        maximum total size (in bytes) of the stored responses; when exceeded, the
+        least recently used responses are evicted; default to :data:`None`, *i.e.*
+        the cache is unbounded.
+    stats : _CacheStats
+        counters where evictions are recorded; default: :data:`None`.
+        
+    Note
+    ----
+    Responses are stored in files named after the MD5 hash of their URL, sharded
+    in two levels of subdirectories (*e.g.* :literal:`root/ab/cd/abcd...`), so 
+    that no directory grows too large. An SQLite index (:literal:`root/index.sqlite`)
+    records the URL, size, fetch and access times and validators (ETag, Last-Modified) 
+    of every response, so that freshness checks, cleaning and eviction never list
+    nor stat the files. Files are written atomically (in a temporary file then 
+    renamed). Flat files left by former versions of the cache are adopted on 
+    first access.
+    
+    Textual responses (see :data:`settings.DEF_CACHE_COMPRESS`) are compressed 
+    on the fly with the preferred available codec (see :data:`settings.DEF_CACHE_CODECS`)
+    and transparently decompressed when read. The codec is recorded in the index
+    entry of the response, while the file itself is a standard :literal:`gzip` 
+    or :literal:`zstd` frame.
+    
+    The whole cache, or part of it, can be exported into a single portable bundle
+    and imported elsewhere, *e.g.* on machines with no access to the internet 
+    (see :meth:`~_DiskCache.export_bundle` and :meth:`~_DiskCache.import_bundle`).
+    """
+    
+    INDEX = 'index.sqlite'
+    BUNDLE_INDEX = 'bundle.json'
+    BUNDLE_VERSION = 2 # 1: files located after the URLs
+    FLOAT = re.compile(r'^[+-]?(\d+\.\d*|\.\d+|\d+(\.\d*)?[eE][+-]?\d+)$')
+    CODECS = ('gzip', 'zstd') if ZSTANDARD_INSTALLED is True else ('gzip',)
+    
+    #/************************************************************************/
+    def __init__(self, root, max_size=None, stats=None):
+        try:
+            assert SQLITE3_INSTALLED is True
+        except:
+            raise happyError('SQLITE3 module not available')
+        try:
+            assert happyType.isstring(root)
+        except:
+            raise happyError('wrong type for cache root directory')
+        try:
+            assert max_size is None or (happyType.isnumeric(max_size) and max_size > 0)
+        except:
+            raise happyError('wrong value for cache maximum size')
+        self.root, self.max_size, self.stats = os.path.abspath(root), max_size, stats
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        elif not os.path.isdir(self.root):
+            raise happyError('cache %s is not a directory' % self.root)
+        self.__lock = threading.RLock()
+        self.__db = sqlite3.connect(os.path.join(self.root, self.INDEX), 
+                                    timeout=30, isolation_level=None, check_same_thread=False)
+        with self.__lock:
+            try:
+                self.__db.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                pass
+            self.__db.execute('''CREATE TABLE IF NOT EXISTS entries (
+                                    key TEXT PRIMARY KEY, url TEXT NOT NULL, path TEXT NOT NULL, 
+                                    size INTEGER NOT NULL, fetched REAL NOT NULL, accessed REAL NOT NULL, 
+                                    etag TEXT, modified TEXT, codec TEXT)''')
+            if 'codec' not in [c[1] for c in self.__db.execute('PRAGMA table_info(entries)')]:
+                self.__db.execute('ALTER TABLE entries ADD COLUMN codec TEXT') # former index
+            self.__db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+            self.__size = self.__db.execute('SELECT COALESCE(SUM(size),0) FROM entries').fetchone()[0]
+
+    #/************************************************************************/
+    @staticmethod
+    def canonical(url):
+        """Canonical form of a URL, so that equivalent URLs share the same key in 
+        the cache.
+        
+            >>> url = _DiskCache.canonical(url)
+            
+        Note
+        ----
+        The canonical form of a URL is obtained by:
+        
+        * lowering the case of its protocol and host, and dropping the default 
+          port of the protocol,
+        * using the first protocol of :data:`settings.DEF_CACHE_SCHEMES` in place
+          of the other ones, 
+        * removing empty segments and trailing slashes from its path, as well as
+          its fragment,
+        * sorting its query parameters by name (the order of the values of a 
+          repeated parameter is preserved),
+        * rounding numeric (floating point) values of the parameters to the number 
+          of decimals set in :data:`settings.DEF_CACHE_PRECISION`.
+        
+        Examples
+        --------
+        
+            >>> _DiskCache.canonical('HTTP://Europa.EU:80/webtools/rest/gisco/nuts/find-nuts.py?y=52.51703651&x=13.38886&f=JSON')
+                'https://europa.eu/webtools/rest/gisco/nuts/find-nuts.py?f=JSON&x=13.38886&y=52.5170365'
+        """
+        try:
+            parts = urllib.parse.urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url
+        scheme, host = parts.scheme.lower(), (parts.hostname or '').lower()
+        if port is not None and (scheme, port) not in (('http', 80), ('https', 443), ('ftp', 21)):
+            host = '%s:%s' % (host, port)
+        if parts.username is not None:
+            host = '%s@%s' % (parts.netloc.rsplit('@',1)[0], host)
+        if scheme in settings.DEF_CACHE_SCHEMES:
+            scheme = settings.DEF_CACHE_SCHEMES[0]
+        path = '/'.join([p for p in parts.path.split('/') if p != ''])
+        path = '/' + path if path != '' or parts.query != '' else path
+        precision = settings.DEF_CACHE_PRECISION
+        def number(v):
+            # round floating point values, leave anything else (e.g. codes) as is
+            if precision is None or not _DiskCache.FLOAT.match(v):
+                return v
+            v = ('%.*f' % (precision, float(v))).rstrip('0').rstrip('.')
+            return '0' if v in ('-0', '') else v
+        query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        query = urllib.parse.urlencode(sorted([(k, number(v)) for k, v in query], key=lambda kv: kv[0]))
+        return urllib.parse.urlunsplit((scheme, host, path, query, ''))
+
+    #/************************************************************************/
+    @staticmethod
+    def key(url):
+        """Unique key (MD5 hash) identifying a URL in the cache, computed from 
+        its canonical form (see :meth:`~_DiskCache.canonical`).
+        
+            >>> key = _DiskCache.key(url)
+        """
+        url = _DiskCache.canonical(url).encode('utf-8')
+        try:
+            return hashlib.md5(url).hexdigest()
+        except:
+            return url.hex()
+    
+    #/************************************************************************/
+    def path(self, url):
+        """Pathname of the file storing the response of a URL (whether it is 
+        actually cached or not).
+        
+            >>> path = cache.path(url)
+        """
+        key = self.key(url)
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    #/************************************************************************/
+    @classmethod
+    def codec(cls, content_type, url=None):
+        """Codec used to compress a response of given content type in the cache.
+        
+            >>> codec = _DiskCache.codec(content_type, url=None)
+            
+        Returns
+        -------
+        codec : str
+            one of :data:`_DiskCache.CODECS`, or :data:`None` when the response 
+            is not to be compressed.
+            
+        Note
+        ----
+        Files that are read directly from the cache by |GDAL| (see 
+        :data:`settings.DEF_CACHE_VSI_FORMATS`), as recognised from the extension
+        of their :data:`url`, are compressed with :literal:`gzip` only (*i.e.*, 
+        the only codec supported by |GDAL| virtual file systems), or else stored
+        uncompressed.
+        """
+        content_type = (content_type or '').split(';')[0].strip().lower()
+        if content_type == '' or not any([c in content_type for c in settings.DEF_CACHE_COMPRESS]):
+            return None
+        codecs = settings.DEF_CACHE_CODECS
+        if url is not None and os.path.splitext(urllib.parse.urlsplit(url).path)[-1].lower() in settings.DEF_CACHE_VSI_FORMATS:
+            codecs = [c for c in codecs if c == 'gzip']
+        return next((c for c in codecs if c in cls.CODECS), None)
+
+    #/************************************************************************/
+    @staticmethod
+    def _expired(fetched, expire_after):
+        # check whether a response fetched at a given time has expired
+        if isinstance(expire_after, datetime.timedelta):
+            expire_after = expire_after.total_seconds()
+        if expire_after is None or expire_after < 0:
+            return False
+        elif expire_after == 0:
+            return True
+        return time.time() - fetched >= expire_after
+
+    #/************************************************************************/
+    def __adopt(self, url, key):
+        # move a flat file left by former versions of the cache into its shard;
+        # these were named after the hash of the literal URL
+        legacy = [os.path.join(self.root, k) for k in (key, hashlib.md5(url.encode('utf-8')).hexdigest())]
+        legacy = next((l for l in legacy if os.path.isfile(l)), None)
+        if legacy is None:
+            return None
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fetched, size = os.stat(legacy).st_mtime, os.stat(legacy).st_size
+        os.replace(legacy, path)
+        self.__index(key, url, path, size, fetched)
+        return self.lookup(url)
+
+    #/************************************************************************/
+    def __index(self, key, url, path, size, fetched, codec=None, **validators):
+        with self.__lock:
+            row = self.__db.execute('SELECT size FROM entries WHERE key=?', (key,)).fetchone()
+            self.__db.execute('''INSERT OR REPLACE INTO entries (key, url, path, size, fetched, accessed, 
+                                 etag, modified, codec) VALUES (?,?,?,?,?,?,?,?,?)''',
+                              (key, url, os.path.relpath(path, self.root), size, fetched, time.time(),
+                               validators.get('etag'), validators.get('modified'), codec))
+            self.__size += size - (row[0] if row else 0)
+
+    #/************************************************************************/
+    def lookup(self, url):
+        """Retrieve the index entry of a URL.
+        
+            >>> entry = cache.lookup(url)
+            
+        Returns
+        -------
+        entry : dict
+            dictionary with keys :literal:`[url, path, size, fetched, accessed, etag, modified, codec]`,
+            or :data:`None` when the URL is not cached.
+        """
+        key = self.key(url)
+        with self.__lock:
+            row = self.__db.execute('''SELECT url, path, size, fetched, accessed, etag, modified, codec 
+                                       FROM entries WHERE key=?''', (key,)).fetchone()
+        if row is None:
+            return self.__adopt(url, key)
+        entry = dict(zip(('url', 'path', 'size', 'fetched', 'accessed', 'etag', 'modified', 'codec'), row))
+        entry['path'] = os.path.join(self.root, entry['path'])
+        if not os.path.exists(entry['path']): # removed behind our back
+            self.remove(url)
+            return None
+        return entry
+        
+    #/************************************************************************/
+    def __contains__(self, url):
+        return self.lookup(url) is not None
+
+    def __len__(self):
+        with self.__lock:
+            return self.__db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def size(self):
+        """Total size (in bytes) of the responses stored in the cache.
+        """
+        return self.__size
+
+    #/************************************************************************/
+    def is_fresh(self, url, expire_after=None):
+        """Check whether the response of a URL is cached and has not expired.
+        
+            >>> ans = cache.is_fresh(url, expire_after=None)
+            
+        Keyword arguments
+        -----------------
+        expire_after : int,datetime.timedelta
+            time (in seconds) after which a cached response expires; when :data:`None`
+            or negative, responses never expire; when 0, they always do.
+        """
+        entry = self.lookup(url)
+        return entry is not None and not self._expired(entry['fetched'], expire_after)
+
+    #/************************************************************************/
+    def open(self, url):
+        """Open the file storing the response of a URL in the cache.
+        
+            >>> f = cache.open(url)
+            
+        Returns
+        -------
+        f : file
+            binary file object opened for reading the (decompressed) cached response,
+            or :data:`None` when the URL is not cached; its :data:`codec`, :data:`size`
+            and :data:`fetched` attributes are the codec, size and fetch time of the
+            stored file; it is the caller's responsibility to close it.
+        """
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        try:
+            if entry['codec'] == 'gzip':
+                f = gzip.open(entry['path'], 'rb')
+            elif entry['codec'] == 'zstd':
+                f = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(entry['path'], 'rb'), 
+                                                                                 closefd=True))
+            else:
+                f = open(entry['path'], 'rb')
+        except (IOError, OSError):
+            return None
+        f.codec, f.size, f.fetched = entry['codec'], entry['size'], entry['fetched']
+        with self.__lock: # LRU bookkeeping
+            self.__db.execute('UPDATE entries SET accessed=? WHERE key=?', (time.time(), self.key(url)))
+        return f
+
+    #/************************************************************************/
+    def get(self, url):
+        """Read the response of a URL from the cache.
+        
+            >>> content = cache.get(url)
+            
+        Returns
+        -------
+        content : bytes
+            content of the cached response, or :data:`None` when the URL is not 
+            cached.
+        """
+        f = self.open(url)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    #/************************************************************************/
+    @contextlib.contextmanager
+    def writer(self, url, codec=None, **validators):
+        """Context manager writing the response of a URL into the cache, possibly
+        chunk by chunk, *e.g.* while it is being downloaded.
+        
+            >>> with cache.writer(url, codec=None, etag=None, modified=None) as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        
+        Note
+        ----
+        Data are written into a temporary file of the same directory, which is 
+        renamed (atomically) and indexed only when the writing succeeded; it is 
+        removed otherwise. When :data:`codec` is set (see :meth:`~_DiskCache.codec`),
+        data are compressed while they are written.
+        """
+        try:
+            assert codec is None or codec in self.CODECS
+        except:
+            raise happyError('codec %s not available' % codec)
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if codec == 'gzip':
+                    with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=6, mtime=0) as z:
+                        yield z
+                elif codec == 'zstd':
+                    with zstandard.ZstdCompressor().stream_writer(f, closefd=False) as z:
+                        yield z
+                else:
+                    yield f
+                size = f.tell()
+            os.replace(tmp, path)
+        except:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        key = self.key(url)
+        self.__index(key, url, path, size, time.time(), codec=codec, **validators)
+        if self.max_size is not None and self.__size > self.max_size:
+            self.evict(keep=key)
+
+    #/************************************************************************/
+    def put(self, url, content, codec=None, **validators):
+        """Store the response of a URL into the cache.
+        
+            >>> path = cache.put(url, content, codec=None, etag=None, modified=None)
+            
+        Arguments
+        ---------
+        url : str
+            URL of the response.
+        content : bytes
+            content of the response.
+            
+        Keyword arguments
+        -----------------
+        codec : str
+            codec used to compress the response; default: :data:`None`, the response
+            is stored as is.
+        etag, modified : str
+            :literal:`ETag` and :literal:`Last-Modified` headers of the response.
+            
+        Returns
+        -------
+        path : str
+            pathname of the file storing the response.
+        """
+        with self.writer(url, codec=codec, **validators) as f:
+            f.write(content)
+        return self.path(url)
+ 
+    #/************************************************************************/
+    def touch(self, url, **validators):
+        """Refresh the fetch time (and possibly the validators) of a cached response,
+        *e.g.* after the server confirmed it has not changed.
+        
+            >>> cache.touch(url, etag=None, modified=None)
+        """
+        now = time.time()
+        with self.__lock:
+            self.__db.execute("""UPDATE entries SET fetched=?, accessed=?, etag=COALESCE(?,etag), 
+                                 modified=COALESCE(?,modified) WHERE key=?""", 
+                              (now, now, validators.get('etag'), validators.get('modified'), self.key(url)))
+
+    #/************************************************************************/
+    def __delete(self, rows):
+        # remove both the files and the index entries
+        with self.__lock:
+            for key, path, size in rows:
+                try:
+                    os.remove(os.path.join(self.root, path))
+                except OSError:
+                    pass
+                self.__db.execute('DELETE FROM entries WHERE key=?', (key,))
+                self.__size -= size
+        return len(rows)
+
+    #/************************************************************************/
+    def remove(self, url):
+        """Remove the response of a URL from the cache.
+        
+            >>> cache.remove(url)
+        """
+        with self.__lock:
+            rows = self.__db.execute('SELECT key, path, size FROM entries WHERE key=?', 
+                                     (self.key(url),)).fetchall()
+            return self.__delete(rows)
+
+    #/************************************************************************/
+    def evict(self, max_size=None, keep=None):
+        """Evict the least recently used responses until the total size of the 
+        cache falls under a given size.
+        
+            >>> n = cache.evict(max_size=None, keep=None)
+            
+        Keyword arguments
+        -----------------
+        max_size : int
+            targeted total size (in bytes); default to :data:`max_size` attribute.
+        keep : str
+            key of a response never to evict, *e.g.* the one just written.
+            
+        Returns
+        -------
+        n : int
+            number of evicted responses.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return 0
+        with self.__lock:
+            # other processes may share the index
+            self.__size = self.__db.execute('SELECT COALESCE(SUM(size),0) FROM entries').fetchone()[0]
+            excess, rows, urls = self.__size - max_size, [], []
+            if excess <= 0:
+                return 0
+            for row in self.__db.execute('SELECT key, path, size, url FROM entries ORDER BY accessed'):
+                if excess <= 0:
+                    break
+                elif row[0] == keep:
+                    continue
+                rows.append(row[:3])
+                urls.append(row[3])
+                excess -= row[2]
+            n = self.__delete(rows)
+        if self.stats is not None:
+            [self.stats.add(u, evictions=1) for u in urls]
+        happyVerbose('%s responses evicted from cache %s' % (n, self.root))
+        return n
+
+    #/************************************************************************/
+    def clean(self, expire_after=None):
+        """Remove expired responses from the cache.
+        
+            >>> n = cache.clean(expire_after=None)
+            
+        Keyword arguments
+        -----------------
+        expire_after : int,datetime.timedelta
+            time (in seconds) after which a cached response expires; when :data:`None`
+            or non-positive, all responses are removed.
+            
+        Returns
+        -------
+        n : int
+            number of removed responses.
+        """
+        if isinstance(expire_after, datetime.timedelta):
+            expire_after = expire_after.total_seconds()
+        if expire_after is None or expire_after <= 0:
+            expire_after = -float('inf')
+        with self.__lock:
+            rows = self.__db.execute('SELECT key, path, size FROM entries WHERE fetched <= ?', 
+                                     (time.time() - expire_after,)).fetchall()
+            return self.__delete(rows)
+
+    #/************************************************************************/
+    def entries(self, sort='url', reverse=False, limit=None):
+        """List the responses stored in the cache.
+        
+            >>> entries = cache.entries(sort='url', reverse=False, limit=None)
+            
+        Keyword arguments
+        -----------------
+        sort : str
+            attribute the entries are sorted by, any of :literal:`['url', 'size', 'age', 'accessed']`;
+            default: :literal:`'url'`.
+        reverse : bool
+            flag set to sort the entries in descending order; default: :data:`False`.
+        limit : int
+            maximum number of entries listed; default: all entries are listed.
+            
+        Returns
+        -------
+        entries : list[dict]
+            dictionaries with keys :literal:`[url, size, age, fetched, accessed, etag, modified, codec]`,
+            where :literal:`age` is the time (in seconds) elapsed since the response
+            was fetched (or last revalidated).
+        """
+        order = {'url': 'url', 'size': 'size', 'age': 'fetched DESC', 'accessed': 'accessed'}
+        try:
+            order = order[sort]
+        except KeyError:
+            raise happyError('wrong value for SORT argument - must be any of %s' % list(order.keys()))
+        if reverse is True:
+            order = order[:-5] if order.endswith(' DESC') else order + ' DESC'
+        sql = 'SELECT url, size, fetched, accessed, etag, modified, codec FROM entries ORDER BY %s' % order
+        if limit is not None:
+            sql += ' LIMIT %d' % int(limit)
+        now = time.time()
+        with self.__lock:
+            rows = self.__db.execute(sql).fetchall()
+        entries = [dict(zip(('url', 'size', 'fetched', 'accessed', 'etag', 'modified', 'codec'), row)) 
+                   for row in rows]
+        [e.update({'age': now - e['fetched']}) for e in entries]
+        return entries
+
+    #/************************************************************************/
+    @staticmethod
+    def _digest(f):
+        # SHA-256 hash of the content of a (binary) file object
+        sha = hashlib.sha256()
+        for chunk in iter(lambda: f.read(settings.DEF_CHUNK_SIZE), b''):
+            sha.update(chunk)
+        return sha.hexdigest()
+
+    #/************************************************************************/
+    def export_bundle(self, dest, *url):
+        """Export cached responses, together with their index entries, into a
+        single portable bundle.
+        
+            >>> n = cache.export_bundle(dest, *url)
+            
+        Arguments
+        ---------
+        dest : str
+            pathname of the bundle, a :literal:`zip` archive.
+        url : str
+            URLs of the responses to export; when none is passed, the whole cache
+            is exported.
+            
+        Returns
+        -------
+        n : int
+            number of exported responses.
+            
+        Note
+        ----
+        The bundle contains the stored files (as is, *i.e.* possibly compressed,
+        bulk datasets included) under :literal:`data/`, and a :literal:`bundle.json`
+        index listing, for every response, its URL, its index entry (fetch time,
+        validators, codec), the name of its file in the bundle and the SHA-256 
+        hash of this file. The bundle is written
+        into a temporary file which is renamed only when complete.
+        """
+        if url in ((), None):
+            with self.__lock:
+                url = [row[0] for row in self.__db.execute('SELECT url FROM entries ORDER BY url')]
+        entries = []
+        dest = os.path.abspath(dest)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix='.tmp')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+                for u in url:
+                    entry = self.lookup(u)
+                    if entry is None:
+                        happyWarning('URL %s not cached - not exported' % u)
+                        continue
+                    path = os.path.relpath(entry.pop('path'), self.root)
+                    with open(os.path.join(self.root, path), 'rb') as f:
+                        entry['sha256'] = self._digest(f)
+                    entry['file'] = 'data/' + path.replace(os.sep, '/')
+                    zf.write(os.path.join(self.root, path), arcname=entry['file'])
+                    entry.pop('accessed')
+                    entries.append(entry)
+                zf.writestr(self.BUNDLE_INDEX, json.dumps({'version': self.BUNDLE_VERSION, 
+                                                           'created': time.time(), 
+                                                           'entries': entries}, indent=1))
+            os.replace(tmp, dest)
+        except:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        happyVerbose('%s responses exported from cache %s into bundle %s' % (len(entries), self.root, dest))
+        return len(entries)
+
+    #/************************************************************************/
+    def import_bundle(self, src, overwrite=False):
+        """Import the responses of a bundle created with :meth:`~_DiskCache.export_bundle`
+        into the cache.
+        
+            >>> n = cache.import_bundle(src, overwrite=False)
+            
+        Arguments
+        ---------
+        src : str
+            pathname of the bundle.
+            
+        Keyword arguments
+        -----------------
+        overwrite : bool
+            flag set to replace cached responses by older ones from the bundle; 
+            default to :data:`False`, *i.e.* a response is imported only when it
+            is not cached, or was fetched earlier than the one in the bundle.
+            
+        Returns
+        -------
+        n : int
+            number of imported responses.
+            
+        Raises
+        ------
+        happyError
+            when the bundle is not valid, *e.g.* a file is missing or its content
+            does not match its hash: in that case, nothing is imported.
+            
+        Note
+        ----
+        The import is atomic: all files are first extracted into temporary files
+        next to their final location and checked against their hashes; they are
+        then indexed in a single transaction, and renamed only once this transaction
+        is committed. Files are retrieved from the bundle under the names recorded
+        in its index, whatever the settings of the cache it was exported from.
+        """
+        try:
+            zf = zipfile.ZipFile(src, 'r')
+        except (IOError, OSError, zipfile.BadZipfile):
+            raise happyError('bundle %s not found or not readable' % src)
+        staged = []
+        with zf:
+            try:
+                index = json.loads(zf.read(self.BUNDLE_INDEX).decode('utf-8'))
+                assert index.get('version') in range(1, self.BUNDLE_VERSION + 1)
+                entries = index['entries']
+            except:
+                raise happyError('bundle %s has no valid index' % src)
+            try:
+                for entry in entries:
+                    current = self.lookup(entry['url'])
+                    if overwrite is False and current is not None and current['fetched'] >= entry['fetched']:
+                        continue
+                    path = self.path(entry['url'])
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+                    staged.append((entry, path, tmp))
+                    arcname = entry.get('file') or 'data/' + os.path.relpath(path, self.root).replace(os.sep, '/')
+                    try:
+                        with os.fdopen(fd, 'wb') as f, zf.open(arcname) as z:
+                            shutil.copyfileobj(z, f, settings.DEF_CHUNK_SIZE)
+                    except KeyError:
+                        raise happyError('file of URL %s missing from bundle %s' % (entry['url'], src))
+                    with open(tmp, 'rb') as f:
+                        if self._digest(f) != entry['sha256']:
+                            raise happyError('file of URL %s corrupted in bundle %s' % (entry['url'], src))
+            except:
+                [os.remove(tmp) for _, _, tmp in staged if os.path.exists(tmp)]
+                raise
+        with self.__lock:
+            self.__db.execute('BEGIN IMMEDIATE')
+            try:
+                for entry, path, tmp in staged:
+                    self.__index(self.key(entry['url']), entry['url'], path, entry['size'], entry['fetched'], 
+                                 codec=entry.get('codec'), etag=entry.get('etag'), modified=entry.get('modified'))
+                self.__db.execute('COMMIT')
+            except:
+                self.__db.execute('ROLLBACK')
+                [os.remove(tmp) for _, _, tmp in staged if os.path.exists(tmp)]
+                raise
+            finally:
+                self.__size = self.__db.execute('SELECT COALESCE(SUM(size),0) FROM entries').fetchone()[0]
+            # cached files are replaced only once the new entries are committed
+            [os.replace(tmp, path) for _, path, tmp in staged]
+        happyVerbose('%s responses imported from bundle %s into cache %s' % (len(staged), src, self.root))
+        if self.max_size is not None and self.__size > self.max_size:
+            self.evict()
+        return len(staged)
+
+    #/************************************************************************/
+    def close(self):
+        """Close the index of the cache.
+        """
+        with self.__lock:
+            self.__db.close()
+
+#%%
+#==============================================================================
+# CLASS _NegativeCache
+#==============================================================================
+
+class _NegativeCache(object):
+    """Store of the lookups (*e.g.*, URLs of geocoding queries) that returned no
+    result, so that they are not run again before a given time.
+    
+        >>> negative = base._NegativeCache(path=None, ttl=None)
+        
+    Keyword arguments
+    -----------------
+    path : str
+        pathname of the SQLite database where unresolved lookups are recorded, 
+        *e.g.* the index of a disk cache (see :class:`_DiskCache`), so that they
+        are remembered across runs; default to :data:`None`, *i.e.* lookups are
+        recorded in memory only.
+    ttl : float
+        time (in seconds) during which an unresolved lookup is remembered; default
+        to :data:`settings.DEF_NEGATIVE_TTL`.
+        
+    Note
+    ----
+    Lookups are identified by the key of their canonical form (see :meth:`_DiskCache.key`),
+    together with the HTTP status of the failed response, if any (:data:`None`
+    for an empty result).
+    """
+    
+    #/************************************************************************/
+    def __init__(self, path=None, ttl=None):
+        try:
+            assert SQLITE3_INSTALLED is True
+        except:
+            raise happyError('SQLITE3 module not available')
+        ttl = settings.DEF_NEGATIVE_TTL if ttl is None else ttl
+        try:
+            assert happyType.isnumeric(ttl) and ttl > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_NEGATIVE.upper())
+        self.path, self.ttl = path, ttl
+        self.__lock = threading.RLock()
+        self.__db = sqlite3.connect(path or ':memory:', timeout=30, isolation_level=None, 
+                                    check_same_thread=False)
+        self.__stats = dict.fromkeys(('hits', 'misses', 'stored'), 0)
+        with self.__lock:
+            self.__db.execute("""CREATE TABLE IF NOT EXISTS negatives (
+                                    key TEXT PRIMARY KEY, lookup TEXT NOT NULL, 
+                                    status INTEGER, fetched REAL NOT NULL)""")
+
+    #/************************************************************************/
+    @staticmethod
+    def status(error):
+        """Retrieve the HTTP status of a failed request from the (possibly nested)
+        error it raised.
+        
+            >>> status = _NegativeCache.status(error)
+        """
+        while isinstance(error, happyError):
+            try:
+                return int(error.errcode)
+            except (AttributeError, ValueError):
+                error = getattr(error, 'errtype', None)
+        return None
+
+    #/************************************************************************/
+    def get(self, lookup):
+        """Retrieve the record of an unresolved lookup.
+        
+            >>> entry = negative.get(lookup)
+            
+        Returns
+        -------
+        entry : dict
+            dictionary with keys :literal:`[lookup, status, fetched]`, or :data:`None`
+            when the lookup is not known as unresolved, or its record expired.
+        """
+        key = _DiskCache.key(lookup)
+        with self.__lock:
+            row = self.__db.execute('SELECT lookup, status, fetched FROM negatives WHERE key=?', 
+                                    (key,)).fetchone()
+            if row is not None and time.time() - row[2] >= self.ttl:
+                self.__db.execute('DELETE FROM negatives WHERE key=?', (key,))
+                row = None
+            self.__stats['misses' if row is None else 'hits'] += 1
+        return None if row is None else dict(zip(('lookup', 'status', 'fetched'), row))
+
+    def __contains__(self, lookup):
+        return self.get(lookup) is not None
+
+    def __len__(self):
+        with self.__lock:
+            return self.__db.execute('SELECT COUNT(*) FROM negatives WHERE fetched > ?', 
+                                     (time.time() - self.ttl,)).fetchone()[0]
+
+    #/************************************************************************/
+    def put(self, lookup, status=None):
+        """Record a lookup as unresolved.
+        
+            >>> negative.put(lookup, status=None)
+            
+        Keyword arguments
+        -----------------
+        status : int
+            HTTP status of the failed response; default: :data:`None`, *i.e.* the 
+            lookup returned an empty result.
+        """
+        with self.__lock:
+            self.__db.execute('INSERT OR REPLACE INTO negatives (key, lookup, status, fetched) VALUES (?,?,?,?)',
+                              (_DiskCache.key(lookup), lookup, status, time.time()))
+            self.__stats['stored'] += 1
+
+    #/************************************************************************/
+    def remove(self, *lookup):
+        """Forget unresolved lookups, or all of them when none is passed.
+        
+            >>> negative.remove(*lookup)
+        """
+        with self.__lock:
+            if lookup in ((), None):
+                self.__db.execute('DELETE FROM negatives')
+            else:
+                self.__db.executemany('DELETE FROM negatives WHERE key=?', 
+                                      [(_DiskCache.key(l),) for l in lookup])
+
+    #/************************************************************************/
+    @property
+    def stats(self):
+        """Counters of hits, misses and stored lookups.
+        """
+        with self.__lock:
+            return dict(self.__stats)
+
+    #/************************************************************************/
+    def close(self):
+        """Close the database of the store.
+        """
+        with self.__lock:
+            self.__db.close()
+
+#%%
+#==============================================================================
+# CLASS _Service
+#==============================================================================
+
+class _Service(object):
+    """Base class for web-based geospatial services.
+    
+    This class is used to defined a web-session and simple connection operations 
+    called by a web-service. 
+        
+       >>> serv = base._Service(**kwargs)        
+            
+    Keyword arguments
+    -----------------
+    pool_limit : int
+        total number of simultaneous connections kept open by the connection pool
+        of the service; with :mod:`aiohttp`, this is the limit of the connector,
+        while with :mod:`requests` (which does not cap the total), this is split
+        into :literal:`pool_limit // pool_per_host` pools of connections to 
+        distinct hosts; default to :data:`settings.DEF_POOL_LIMIT`.
+    pool_per_host : int
+        number of simultaneous connections kept open to the same host by the 
+        connection pool of the service, *i.e.* the size of every host pool with
+        :mod:`requests`; default to :data:`settings.DEF_POOL_PER_HOST`.
+    workers : int
+        default maximum number of requests run concurrently when processing a batch
+        of URLs; default to :data:`settings.DEF_BATCH_WORKERS`.
+    rps : float
+        default maximum number of requests per second when processing a batch 
+        of URLs; default to :data:`settings.DEF_BATCH_RPS`, *i.e.* no throttling.
+    cache_size : int
+        maximum total size (in bytes) of the responses stored in the disk cache 
+        (see :class:`_DiskCache`); default to :data:`settings.DEF_CACHE_SIZE`.
+    memory_size : int
+        maximum total size (in bytes) of the hot responses kept in memory in front
+        of the disk cache, both raw and parsed from JSON (see :class:`_MemoryCache`);
+        default to :data:`settings.DEF_MEMORY_SIZE`, *i.e.* no memory cache; the
+        data kept in memory are shared by all callers and shall be considered as
+        read-only (see the :data:`_copy_` keyword argument of :meth:`~_Service.read_response`).
+    negative_ttl : float
+        time (in seconds) during which lookups that returned no result are not 
+        run again (see :class:`_NegativeCache` and :meth:`~_Service.read_lookups`);
+        default to :data:`settings.DEF_NEGATIVE_TTL`; set to 0 to disable negative
+        caching.
+    families : list[tuple]
+        families of endpoints the statistics of the caches are broken down by 
+        (see :class:`_CacheStats`); default to :data:`settings.DEF_CACHE_FAMILIES`.
+    rate_limits : dict
+        maximum number of requests per second issued to given hosts, *e.g.* 
+        :literal:`{'europa.eu': 5}`, on top of :data:`settings.DEF_RATE_LIMITS`;
+        the concurrency of the requests to every host adapts to the responses of
+        the server (see :class:`_RateLimiter`).
+    retries : int
+        maximum number of times a request is retried, with a jittered exponential
+        backoff, when it fails to connect or is throttled (see :data:`settings.DEF_RETRY_STATUS`);
+        default to :data:`settings.DEF_RETRIES`.
+    cache_backend : str
+        store of the cached responses, any of :data:`CACHE_BACKENDS`: 
+        :literal:`'disk'` for the service's own disk cache (see :class:`_DiskCache`),
+        or, in the sequential case only, :literal:`'cachecontrol'` (*resp.* 
+        :literal:`'requests_cache'`) for the HTTP cache of the :mod:`cachecontrol` 
+        (*resp.* :mod:`requests_cache`) package, when installed; default to 
+        :literal:`'disk'`.
+    cache_store, expire_after, _force_download_ :
+        see :meth:`~_Service.get_response`.
+        
+    Note
+    ----
+    The connection pool (a :class:`requests.Session` in the sequential case, an
+    :class:`aiohttp.ClientSession` together with its event loop in the asynchronous
+    case) lives as long as the service, so that keep-alive connections are reused
+    across calls. It is released with :meth:`~_Service.close`, or when the service 
+    is used as a context manager:
+        
+       >>> with base._Service() as serv:
+               ...
+               
+    Third-party caches (see :data:`cache_backend`) are opt-in only: they bypass
+    the disk cache, hence its size limit, revalidation, compression, memory cache,
+    prefetching and bundles. They are stored in a subdirectory of :data:`cache_store`
+    named after the backend.
+    """
+    
+    RESPONSE_FORMATS = ['resp', 'zip', 'raw', 'text', 'stringio', 'content', 'bytes', 'bytesio', 'json']
+    ZIP_OPERATIONS  = ['extract', 'extractall', 'getinfo', 'namelist', 'read', 'infolist']
+    CACHE_BACKENDS  = ['disk', 'cachecontrol', 'requests_cache']
+    
+    _LOOP = contextvars.ContextVar('happygisco_loop', default=None)
+    # event loop of the caller of an asynchronous method, set while the synchronous
+    # counterpart of that method runs in a worker thread (see _arun)
+    
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self.__session           = None
+        self.__cache_store       = True
+        self.__expire_after      = None # datetime.deltatime(0)
+        self.__cache_backend     = kwargs.pop(_Decorator.KW_BACKEND, None) or 'disk'
+        self.__loop              = None
+        self.__aio_sessions      = weakref.WeakKeyDictionary() # one per event loop
+        self.__disk_caches       = {}
+        self.__disk_lock         = threading.Lock()
+        self.__inflight          = _SingleFlight() # identical requests in flight
+        self.__memory            = kwargs.pop(_Decorator.KW_MEMORY, settings.DEF_MEMORY_SIZE)
+        if self.__memory not in (None, 0):
+            self.__memory = _MemoryCache(self.__memory)
+        else:
+            self.__memory = None
+        self.__cache_size        = kwargs.pop(_Decorator.KW_CACHE_SIZE, settings.DEF_CACHE_SIZE)
+        self.__negative_ttl      = kwargs.pop(_Decorator.KW_NEGATIVE, settings.DEF_NEGATIVE_TTL)
+        self.__negatives         = {} # one per cache directory
+        self.__stats             = _CacheStats(kwargs.pop(_Decorator.KW_FAMILIES, None))
+        self.__tracer            = _Tracer(family=self.__stats.family)
+        self.__retries           = kwargs.pop(_Decorator.KW_RETRIES, settings.DEF_RETRIES)
+        try:
+            assert isinstance(self.__retries, int) and self.__retries >= 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_RETRIES.upper())
+        self.__pool_limit        = kwargs.pop(_Decorator.KW_POOL_LIMIT, settings.DEF_POOL_LIMIT)
+        self.__pool_per_host     = kwargs.pop(_Decorator.KW_POOL_PER_HOST, settings.DEF_POOL_PER_HOST)
+        try:
+            assert all([isinstance(p, int) and p > 0 for p in (self.__pool_limit, self.__pool_per_host)])
+        except:
+            raise happyError('wrong value for %s/%s parameters' % (_Decorator.KW_POOL_LIMIT.upper(), _Decorator.KW_POOL_PER_HOST.upper()))
+        rates = dict(settings.DEF_RATE_LIMITS, **(kwargs.pop(_Decorator.KW_RATE_LIMITS, None) or {}))
+        self.__limiter           = _RateLimiter(rates, concurrency=self.__pool_per_host)
+        self.__workers           = kwargs.pop(_Decorator.KW_WORKERS, settings.DEF_BATCH_WORKERS)
+        self.__rps               = kwargs.pop(_Decorator.KW_RPS, settings.DEF_BATCH_RPS)
+        try:
+            assert isinstance(self.__workers, int) and self.__workers > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_WORKERS.upper())
+        # update with keyword arguments passed
+        if kwargs != {}:
+            attrs = (_Decorator.KW_CACHE,_Decorator.KW_EXPIRE,_Decorator.KW_FORCE)
+            for attr in list(set(attrs).intersection(kwargs.keys())):
+                setattr(self, '%s' % attr, kwargs.pop(attr))
+        try:
+            assert self.__cache_backend in self.CACHE_BACKENDS
+            assert self.__cache_backend != 'cachecontrol' or CACHECONTROL_INSTALLED is True
+            assert self.__cache_backend != 'requests_cache' or REQUESTS_CACHE_INSTALLED is True
+        except:
+            raise happyError('wrong value for %s parameter - must be any available of %s' 
+                             % (_Decorator.KW_BACKEND.upper(), self.CACHE_BACKENDS))
+        if isinstance(self.__cache_store, bool):
+            self.__cache_store = self.__default_cache() if self.cache_store else None
+        # determine appropriate setting for a given session, taking into account
+        # the explicit setting on that request, and the setting in the session.
+        if ASYNCIO_AVAILABLE is False:            
+            # size the pool of the (possibly cached) adapters: connections are
+            # kept alive and reused across calls; requests has no global cap on
+            # the connections, hence pool_limit is split into pools (one per host)
+            # of pool_per_host connections each
+            pool = {'pool_connections': max(1, self.__pool_limit // self.__pool_per_host),
+                    'pool_maxsize': self.__pool_per_host}
+            try:
+                # whether requests_cache is defined or not, no matter
+                self.__session = requests.Session()
+                # session = requests.session(**kwargs)
+                for prefix in ('http://', 'https://'):
+                    self.__session.mount(prefix, requests.adapters.HTTPAdapter(**pool))
+            except:
+                raise happyError('wrong requests setting - SESSION not initialised')
+            if self.__cache_backend == 'cachecontrol' and self.cache_store is not None:
+                try:
+                    # never mixed with the files of the disk cache
+                    directory = os.path.join(os.path.abspath(self.cache_store), self.__cache_backend)
+                    if self.expire_after is None or int(self.expire_after) > 0:
+                        cache_store = FileCache(directory)  
+                    else:
+                        cache_store = FileCache(directory, forever=True)
+                except:
+                    pass
+                else:
+                    self.__session = CacheControl(self.session, cache_store,
+                                                  adapter_class=functools.partial(CacheControlAdapter, **pool))
+            try:
+                assert self.session is not None
+            except:
+                raise happyError('wrong definition for SESSION parameters - SESSION not initialised')
+            for adapter in self.session.adapters.values():
+                if not hasattr(adapter, 'poolmanager'):
+                    continue
+                elif URLLIB3_INSTALLED is True: # time the connections for tracing
+                    adapter.poolmanager.pool_classes_by_scheme = {'http': _TracedHTTPConnectionPool,
+                                                                  'https': _TracedHTTPSConnectionPool}
+        else:
+            self.__session = None
+        
+    #/************************************************************************/
+    @property
+    def session(self):
+        """Session property (:data:`getter`/:data:`setter`) of an instance of
+        a class :class:`_Service`. :data:`session` is itself an instance of a
+        :class:`requests.session.Session` class.
+        """ # A session type is :class:`requests.session.Session`.
+        return self.__session
+    @session.setter#analysis:ignore
+    def session(self, session):
+        if session is not None and not isinstance(session, requests.sessions.Session, aiohttp.client.ClientSession):
+            raise happyError('wrong type for SESSION parameter')
+        self.__session = session
+    
+    #/************************************************************************/
+    @property
+    def pool_limit(self):
+        """Total number of simultaneous connections of the pool (:data:`getter`) 
+        of an instance of a class :class:`_Service`.
+        """
+        return self.__pool_limit
+
+    @property
+    def pool_per_host(self):
+        """Number of simultaneous connections to the same host of the pool 
+        (:data:`getter`) of an instance of a class :class:`_Service`.
+        """
+        return self.__pool_per_host
+
+    #/************************************************************************/
+    @property
+    def workers(self):
+        """Maximum number of concurrent requests (:data:`getter`) used by default
+        when an instance of a class :class:`_Service` processes a batch of URLs.
+        """
+        return self.__workers
+
+    @property
+    def limiter(self):
+        """Per-host rate limiter (:data:`getter`) of the requests issued by an 
+        instance of a class :class:`_Service` (see :class:`_RateLimiter`).
+        """
+        return self.__limiter
+
+    @property
+    def rps(self):
+        """Maximum number of requests per second (:data:`getter`) used by default 
+        when an instance of a class :class:`_Service` processes a batch of URLs.
+        """
+        return self.__rps
+
+    #/************************************************************************/
+    def __run_async(self, coro):
+        # run a coroutine on the long-lived event loop of the service
+        if self.__loop is None or self.__loop.is_closed():
+            self.__loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.__loop)
+        return self.__loop.run_until_complete(coro)
+
+    #/************************************************************************/
+    async def __get_aio_session(self):
+        # long-lived asynchronous session, (re)created on the running loop: all
+        # coroutines run on the same loop share it
+        try:
+            assert AIOHTTP_INSTALLED is True
+        except:
+            raise happyError('AIOHTTP package not available - asynchronous requests not supported')
+        loop = asyncio.get_running_loop()
+        session = self.__aio_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.__pool_limit, 
+                                             limit_per_host=self.__pool_per_host)
+            session = aiohttp.ClientSession(connector=connector, raise_for_status=False,
+                                            trace_configs=[_Tracer.trace_config()])
+            self.__aio_sessions[loop] = session
+        return session
+
+    #/************************************************************************/
+    async def aclose(self):
+        """Asynchronous counterpart of :meth:`close`, releasing the session used
+        on the running event loop.
+        
+            >>> await serv.aclose()
+        """
+        session = self.__aio_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    #/************************************************************************/
+    def close(self):
+        """Release the connection pool (and the event loop) of the service.
+        
+            >>> serv.close()
+            
+        Note
+        ----
+        The pool (as well as the index of the disk cache) is transparently 
+        recreated when the service is used again.
+        """
+        session = self.__aio_sessions.pop(self.__loop, None) if self.__loop is not None else None
+        if session is not None and not session.closed:
+            try:
+                self.__run_async(session.close())
+            except:
+                pass
+        if self.__loop is not None and not self.__loop.is_closed():
+            self.__loop.close()
+        self.__loop = None
+        try:
+            self.session.close()
+        except AttributeError:
+            pass
+        with self.__disk_lock:
+            [cache.close() for cache in list(self.__disk_caches.values()) + list(self.__negatives.values())]
+            self.__disk_caches, self.__negatives = {}, {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    #/************************************************************************/
+    @property
+    def cache_store(self):
+        """Cache property (:data:`getter`/:data:`setter`) of an instance of
+        a class :class:`_Service`. :data:`cache_store` is set to the physical 
+        location (*i.e.* on the drive) of the repository used to cache the 
+        downloaded datasets/responses.
+        """
+        return self.__cache_store
+    @cache_store.setter
+    def cache_store(self, cache_store):
+        if not(cache_store is None or isinstance(cache_store, (str,bool))):
+            raise happyError('wrong type for %s parameter' % _Decorator.KW_CACHE.upper())
+        else:
+            #if cache_store not in (False,'',None) and requests_cache is None and CACHECONTROL_INSTALLED is False:
+            #    raise happyError('caching not supported in the absence of modules requests_cache and cachecontrol')                
+            pass
+        self.__cache_store = cache_store
+    
+    #/************************************************************************/
+    @property
+    def cache_size(self):
+        """Maximum total size (in bytes) of the disk cache (:data:`getter`) of 
+        an instance of a class :class:`_Service`.
+        """
+        return self.__cache_size
+
+    #/************************************************************************/
+    def __disk_cache(self, cache_store):
+        # one indexed disk cache per cache directory
+        if cache_store in (None, False):
+            return None
+        with self.__disk_lock:
+            try:
+                return self.__disk_caches[cache_store]
+            except KeyError:
+                cache = _DiskCache(cache_store, max_size=self.__cache_size, stats=self.__stats)
+                self.__disk_caches[cache_store] = cache
+        return cache
+
+    @property
+    def tracer(self):
+        """Dispatcher (:data:`getter`) of the lifecycle events of the requests 
+        issued by an instance of a class :class:`_Service` (see :class:`_Tracer`).
+        """
+        return self.__tracer
+
+    #/************************************************************************/
+    def add_hook(self, hook, events=None):
+        """Register a hook called on the lifecycle events of the requests issued
+        by the service, *e.g.* for tracing.
+        
+            >>> serv.add_hook(hook, events=None)
+            
+        Arguments
+        ---------
+        hook : callable
+            function accepting a single dictionary argument describing the event
+            (see :class:`_Tracer`).
+        
+        Keyword arguments
+        -----------------
+        events : str, list[str]
+            any of :literal:`['cache', 'request', 'decode']`; default: the hook 
+            is called on all events.
+            
+        Returns
+        -------
+        hook : callable
+            the input hook, so that the method can be used as a decorator.
+            
+        Examples
+        --------
+        Find out where the time is spent when identifying the NUTS of a place:
+            
+            >>> serv = services.GISCOService()
+            >>> events = []
+            >>> serv.add_hook(events.append)
+            >>> serv.place2nuts('Berlin, Germany')
+            >>> [(e['event'], e['family'], e.get('connect'), e.get('ttfb'), e.get('decode_time')) for e in events]
+        """
+        return self.__tracer.register(hook, events=events)
+
+    def remove_hook(self, hook):
+        """Unregister a hook registered with :meth:`~_Service.add_hook`.
+        
+            >>> serv.remove_hook(hook)
+        """
+        self.__tracer.unregister(hook)
+
+    #/************************************************************************/
+    @property
+    def cache_stats(self):
+        """Counters (:data:`getter`) of the activity of the caches of an instance 
+        of a class :class:`_Service`, broken down by family of endpoints (see 
+        :class:`_CacheStats`).
+        
+            >>> serv.cache_stats.report()
+        """
+        return self.__stats
+
+    @property
+    def negative_cache(self):
+        """Store (:data:`getter`) of the unresolved lookups of an instance of a 
+        class :class:`_Service` (see :class:`_NegativeCache`), kept in the index
+        of its disk cache when any, or :data:`None` when negative caching is 
+        disabled (see the :data:`negative_ttl` keyword argument).
+        """
+        if self.__negative_ttl in (None, 0):
+            return None
+        cache_store = self.cache_store if happyType.isstring(self.cache_store) else None
+        with self.__disk_lock:
+            try:
+                return self.__negatives[cache_store]
+            except KeyError:
+                path = None
+                if cache_store is not None:
+                    os.makedirs(cache_store, exist_ok=True)
+                    path = os.path.join(cache_store, _DiskCache.INDEX)
+                negative = _NegativeCache(path, ttl=self.__negative_ttl)
+                self.__negatives[cache_store] = negative
+        return negative
+
+    @property
+    def memory_cache(self):
+        """In-memory store (:data:`getter`) of the hot responses of an instance 
+        of a class :class:`_Service`, both raw and parsed from JSON, or :data:`None`
+        when not used (see the :data:`memory_size` keyword argument). 
+        """
+        return self.__memory
+
+    #/************************************************************************/
+    def __memory_get(self, path, force_download, expire_after, cache):
+        # retrieve a response from memory, unless it expired on disk
+        if self.__memory is None or force_download is True:
+            return None
+        hit = self.__memory.get(path)
+        if hit is None:
+            return None
+        content, meta = hit
+        if cache._expired(meta['fetched'], expire_after):
+            self.__memory.remove(path, ('json', path))
+            return None
+        return content, path, meta
+
+    @property
+    def disk_cache(self):
+        """Disk cache (:data:`getter`) of an instance of a class :class:`_Service`, 
+        *i.e.* the :class:`_DiskCache` instance storing the responses in the 
+        :data:`cache_store` location, if any.
+        """
+        return self.__disk_cache(self.cache_store)
+
+    #/************************************************************************/
+    @property
+    def cache_backend(self):
+        """Cache backend property (:data:`getter`) of an instance of a class 
+        :class:`_Service`, *i.e.* the name of the store of the cached responses
+        (see :data:`CACHE_BACKENDS`).
+        """
+        return self.__cache_backend
+    # note: no setter ... 
+
+    #/************************************************************************/
+    @property
+    def expire_after(self):
+        """Expiration property (:data:`getter`/:data:`setter`) of an instance of
+        a class :class:`_Service`. :data:`expire_after` represents the time after
+        which datasets downloaded and cached through this instance shall be 
+        downloaded again.
+        """
+        return self.__expire_after
+    @expire_after.setter
+    def expire_after(self, expire_after):
+        if expire_after is None or isinstance(expire_after, (int, datetime.timedelta)) \
+                and (int(expire_after)>=0 or expire_after==-1):
+            self.__expire_after = expire_after
+        elif not isinstance(expire_after, (int, datetime.timedelta)):
+            raise happyError('wrong type for %s parameter' % _Decorator.KW_EXPIRE.upper())
+        #elif isinstance(expire_after, int) and expire_after<0:
+        #    raise happyError('wrong time setting for %s parameter' % _Decorator.KW_EXPIRE.upper())
+        
+    #/************************************************************************/   
+    def __get_status(self, url):
+        # sequential implementation of get_status
+        try:
+            response = self.__send(url, method='head')
+        except requests.ConnectionError:
+            raise happyError('connection failed - a Connection error occurred')  
+        except requests.HTTPError:
+            raise happyError('request failed - an HTTP error occurred.')  
+        else:
+            status = response.status_code
+        try:
+            name = settings.HTTP_ERROR_STATUS[status]['name']
+            desc = settings.HTTP_ERROR_STATUS[status]['desc']
+        except KeyError:
+            name = desc = 'Unknown error'#analysis:ignore
+        happyVerbose('response status from web-service: %s ("%s")' % (status,name))
+        try:
+            response.raise_for_status()
+        except:
+            raise happyError('wrong request - %s status ("%s") returned' % (status,name))  
+        else:
+            response.close()
+        return status
+
+    #/************************************************************************/
+    @staticmethod
+    def __check_status(response, url):
+        # validate the status of a GET response (instead of a prior HEAD request)
+        status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+        if status is None or 200 <= status < 300:
+            return status
+        try:
+            name = settings.HTTP_ERROR_STATUS[status]['name']
+        except KeyError:
+            name = 'Unknown error'
+        raise happyError('wrong request - %s status ("%s") returned for URL %s' % (status,name,url),
+                         errcode=status)
+
+    #/************************************************************************/
+    @staticmethod
+    def __conditional_headers(entry):
+        # headers used to revalidate a cached response with the server
+        headers = {}
+        if entry is not None and entry.get('etag'):
+            headers.update({'If-None-Match': entry['etag']})
+        if entry is not None and entry.get('modified'):
+            headers.update({'If-Modified-Since': entry['modified']})
+        return headers
+
+    @staticmethod
+    def __validators(response):
+        # validators returned by the server with a response
+        try:
+            headers = response.headers
+        except AttributeError:
+            return {}
+        return {'etag': headers.get('ETag'), 'modified': headers.get('Last-Modified')}
+
+    #/************************************************************************/
+    async def __aio_get_status(self, session, url):
+        # asynchronous implementation of get_status
+        try:
+            response = await session.head(url)
+        except Exception as e: # aiohttp.ClientConnectionError:
+            raise happyError('connection failed', errtype=e)  
+        else: 
+            status = response.status
+        try:
+            name = settings.HTTP_ERROR_STATUS[status]['name']
+            desc = settings.HTTP_ERROR_STATUS[status]['desc']
+        except KeyError:
+            name = desc = 'Unknown error'#analysis:ignore
+        happyVerbose('response status from web-service: %s ("%s")' % (status,name))
+        async with response:
+            try:
+                response.raise_for_status()
+            except:
+                raise happyError('wrong request - %s status ("%s") returned' % (status,name))  
+                #happyVerbose('response status from web-service: %s' % status)
+        return status
+        
+    #/************************************************************************/ 
+    @_Decorator.parse_url
+    def get_status(self, *url, **kwargs):
+        """Retrieve the header of a URL and return the server's status code.
+        
+            >>> status = serv.get_status(*url)
+            
+        Arguments
+        ---------
+        url : str
+            complete URL name(s) whom status will be checked.
+        
+        Returns
+        -------
+        status : int
+            response status code(s).
+            
+        Raises
+        ------
+        happyError
+            error is raised in the cases:
+                
+                * the request is wrongly formulated,
+                * the connection fails.
+            
+        Examples
+        --------
+        We can see the response status code when connecting to different web-pages
+        or services:
+        
+            >>> serv = base._Service()
+            >>> serv.get_status('http://dumb')
                 Cannot connect to host dumb:80 ssl:None [nodename nor servname provided, or not known]: connection failed
             >>> serv.get_status('http://www.dumbanddumber.com')
                 301 
@@ -2235,23 +4341,17 @@ class _Service(object):
             except happyError as e:
                 raise happyError(errtype=e) # 'sequential status extraction error'
         else:
-            asyncio.set_event_loop(asyncio.new_event_loop())
-            loop = asyncio.get_event_loop() # event loop
-            async def aio_get_all_status(loop, url):
-                async with aiohttp.ClientSession(loop=loop, raise_for_status=True) as session:
-                    # tasks to do
-                    tasks = [self.__aio_get_status(session, u) for u in url]
-                    # gather task responses
-                    return await asyncio.gather(*tasks, return_exceptions=True) 
+            async def aio_get_all_status(url):
+                session = await self.__get_aio_session()
+                # tasks to do
+                tasks = [self.__aio_get_status(session, u) for u in url]
+                # gather task responses
+                return await asyncio.gather(*tasks, return_exceptions=True) 
             try:
-                future = asyncio.ensure_future(aio_get_all_status(loop, url)) 
-                # future = loop.create_task(aio_get_all_status(urls))
-                status = loop.run_until_complete(future) # loop until done
-                # status = future.result()
+                status = self.__run_async(aio_get_all_status(url)) # loop until done
             except happyError as e:
                 raise happyError(errtype=e) # 'asynchronous status extraction error'
-            finally:
-                loop.close()  
+
         status = [s if isinstance(s,int) else -1 for s in status]
         return status if status in ([],None) or len(status)>1 else status[0]
 
@@ -2271,41 +4371,6 @@ class _Service(object):
             basedir = os.getenv("XDG_CACHE_HOME",os.path.expanduser("~/.cache"))
         return os.path.join(basedir, settings.PACKAGE)    
 
-    #/************************************************************************/
-    @staticmethod
-    def __build_cache(url, cache_store):
-        #ignore-doc
-        # build unique filename from URL name and cache directory, e.g. using 
-        # hashlib encoding.
-        # :param url:
-        # :param cache_store:
-        # :returns: a unique pathname representing the input URL
-        pathname = url.encode('utf-8')
-        try:
-            pathname = hashlib.md5(pathname).hexdigest()
-        except:
-            pathname = pathname.hex()
-        return os.path.join(cache_store or './', pathname)
-
-    #/************************************************************************/
-    @staticmethod
-    def __is_cached(pathname, time_out): # note: we check a path here
-        #ignore-doc
-        if not os.path.exists(pathname):
-            resp = False
-        elif time_out is None:
-            resp = True
-        elif time_out < 0:
-            resp = True
-        elif time_out == 0:
-            resp = False
-        else:
-            cur = time.time()
-            mtime = os.stat(pathname).st_mtime
-            happyVerbose("%s - last modified: %s" % (pathname,time.ctime(mtime)))
-            resp = cur - mtime < time_out
-        return resp
-    
     #/************************************************************************/
     @_Decorator.parse_url
     def is_cached(self, *url, **kwargs):
@@ -2326,30 +4391,10 @@ class _Service(object):
         if isinstance(cache_store, bool) and cache_store is True:
             cache_store = self.__default_cache()
         expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
-        ans = [self.__is_cached(self.__build_cache(u, cache_store), expire_after) 
-                for u in url]
+        cache = self.__disk_cache(cache_store)
+        ans = [cache.is_fresh(u, expire_after) for u in url]
         return ans if len(ans)>1 else ans[0]
     
-    #/************************************************************************/
-    @staticmethod
-    def __clean_cache(pathname, time_expiration): # note: we clean a path here
-        #ignore-doc
-        if not os.path.exists(pathname):
-            resp = False
-        elif time_expiration is None or time_expiration <= 0:
-            resp = True
-        else:
-            cur = time.time()
-            mtime = os.stat(pathname).st_mtime
-            happyVerbose("%s - last modified: %s" % (pathname,time.ctime(mtime)))
-            resp = cur - mtime >= time_expiration
-        if resp is True:
-            happyVerbose("removing disk file %s" % pathname)
-            if os.path.isfile(pathname):
-                os.remove(pathname)
-            elif os.path.isdir(pathname):
-                shutil.rmtree(pathname) 
-            
     #/************************************************************************/
     @_Decorator.parse_url
     def clean_cache(self, *url, **kwargs):
@@ -2376,67 +4421,380 @@ class _Service(object):
         if isinstance(cache_store, bool) and cache_store is True:
             cache_store = self.__default_cache()
         expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
+        cache = self.__disk_cache(cache_store)
         if url in ((),None):
-            pathnames = os.scandir(cache_store) 
+            # the index tells which responses expired: no directory listing
+            cache.clean(expire_after)
+            if self.__memory is not None:
+                self.__memory.clear()
         else:
-            pathnames = [self.__build_cache(u, cache_store) for u in url]
-        for pathname in pathnames:
-            if pathname.is_dir():
-                self.__clean_cache(pathname, expire_after)
-        #try:
-        #    os.rmdir(cache_store)
-        #except OSError:
-        #    pass # the directory was not empty
-        if url in ((),None):
-            shutil.rmtree(cache_store) 
+            url = [u for u in url if not cache.is_fresh(u, expire_after if expire_after else 0)]
+            [cache.remove(u) for u in url if u in cache]
+            if self.__memory is not None:
+                [self.__memory.remove(cache.path(u), ('json', cache.path(u))) for u in url]
+                        
+    #/************************************************************************/
+    def export_cache(self, dest, *url, **kwargs):
+        """Export the cache, or some of the cached responses, into a portable bundle, 
+        *e.g.* to be imported with :meth:`~_Service.import_cache` on machines with
+        no access to the internet.
+        
+            >>> n = serv.export_cache(dest, *url, **kwargs)
+
+        Arguments
+        ---------
+        dest : str
+            pathname of the bundle.
+        url : str
+            URLs of the responses to export; default: the whole cache is exported.
+        
+        Keyword arguments
+        -----------------
+        cache_store : str
+            see :meth:`~_Service.get_response`.
+            
+        See also
+        --------
+        :meth:`_DiskCache.export_bundle`.
+        """
+        cache_store = kwargs.get(_Decorator.KW_CACHE) or self.cache_store or True
+        if isinstance(cache_store, bool) and cache_store is True:
+            cache_store = self.__default_cache()
+        return self.__disk_cache(cache_store).export_bundle(dest, *url)
+                        
+    #/************************************************************************/
+    def import_cache(self, src, **kwargs):
+        """Import a bundle exported with :meth:`~_Service.export_cache` into the
+        cache.
+        
+            >>> n = serv.import_cache(src, **kwargs)
+
+        Arguments
+        ---------
+        src : str
+            pathname of the bundle.
+        
+        Keyword arguments
+        -----------------
+        cache_store : str
+            see :meth:`~_Service.get_response`.
+        overwrite : bool
+            see :meth:`_DiskCache.import_bundle`.
+            
+        Examples
+        --------
+        
+            >>> serv = services.GISCOService()
+            >>> serv.prewarm(year=2016, scale=['20m','60m'], level=[0,1,2,3])
+            >>> serv.export_cache('gisco.zip')
+            
+        then, on a machine with no internet access:
+            
+            >>> serv = services.GISCOService(expire_after=-1)
+            >>> serv.import_cache('gisco.zip')
+            
+        See also
+        --------
+        :meth:`_DiskCache.import_bundle`.
+        """
+        cache_store = kwargs.get(_Decorator.KW_CACHE) or self.cache_store or True
+        if isinstance(cache_store, bool) and cache_store is True:
+            cache_store = self.__default_cache()
+        n = self.__disk_cache(cache_store).import_bundle(src, overwrite=kwargs.get('overwrite', False))
+        if self.__memory is not None:
+            self.__memory.clear()
+        return n
                         
     #/************************************************************************/
-    def __sync_cache_response(self, url, force_download, cache_store, expire_after):
-        # sequential implementation of cache_response
-        pathname = self.__build_cache(url, cache_store)
-        is_cached = self.__is_cached(pathname, expire_after)
-        if force_download is True or is_cached is False or cache_store in (None,False):
-            response = self.session.get(url)
-            content = response.content
-            if cache_store not in (None,False):
-                # write "content" to a given pathname
-                with open(pathname, 'wb') as f:
-                    f.write(content)
+    def cache_entries(self, *url, **kwargs):
+        """List the responses stored in the disk cache, together with their size
+        and age.
+        
+            >>> entries = serv.cache_entries(*url, **kwargs)
+
+        Arguments
+        ---------
+        url : str
+            URLs of the responses to list; default: all cached responses are.
+        
+        Keyword arguments
+        -----------------
+        family : str
+            family of endpoints (see :class:`_CacheStats`) of the responses to 
+            list; default: all families are.
+        sort, reverse, limit :
+            see :meth:`_DiskCache.entries`.
+        cache_store : str
+            see :meth:`~_Service.get_response`.
+            
+        Returns
+        -------
+        entries : list[dict]
+            see :meth:`_DiskCache.entries`; the family of every response is 
+            provided under the :literal:`family` key.
+            
+        Examples
+        --------
+        List the 10 largest responses stored:
+            
+            >>> serv = services.GISCOService()
+            >>> [(e['url'], e['size']) for e in serv.cache_entries(sort='size', reverse=True, limit=10)]
+            
+        See also
+        --------
+        :meth:`~_Service.is_cached`, :meth:`~_Service.cache_stats`.
+        """
+        cache_store = kwargs.get(_Decorator.KW_CACHE) or self.cache_store or True
+        if isinstance(cache_store, bool) and cache_store is True:
+            cache_store = self.__default_cache()
+        family = kwargs.get('family')
+        cache = self.__disk_cache(cache_store)
+        if url in ((), None):
+            entries = cache.entries(sort=kwargs.get('sort', 'url'), reverse=kwargs.get('reverse', False), 
+                                    limit=None if family is not None else kwargs.get('limit'))
         else:
-            # read "content" from a given pathname.
-            with open(pathname, 'rb') as f:
-                content = f.read()
-        return content, pathname
+            now = time.time()
+            entries = [e for e in map(cache.lookup, url) if e is not None]
+            [(e.pop('path'), e.update({'age': now - e['fetched']})) for e in entries]
+        [e.update({'family': self.__stats.family(e['url'])}) for e in entries]
+        if family is not None:
+            entries = [e for e in entries if e['family'] == family][:kwargs.get('limit')]
+        return entries
+                        
+    #/************************************************************************/
+    def __send(self, url, method='get', **kwargs):
+        # issue a request through the per-host limiter, retrying the failed and 
+        # throttled ones after a (jittered, exponential) backoff
+        attempt = 0
+        while True:
+            self.__limiter.acquire(url)
+            start, response, status = time.monotonic(), None, None
+            try:
+                response = getattr(self.session, method)(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.__retries:
+                    raise
+            else:
+                status = response.status_code
+            finally:
+                self.__limiter.release(url, status, time.monotonic() - start)
+            if status is not None and (status not in settings.DEF_RETRY_STATUS or attempt >= self.__retries):
+                return response
+            delay = self.__limiter.backoff(url, attempt, 
+                                           response.headers.get('Retry-After') if response is not None else None)
+            if response is not None:
+                response.close()
+            happyVerbose('request to %s failed (%s) - retried in %.2fs' % (url, status or 'no response', delay))
+            _Tracer.record('retries', 1)
+            attempt += 1
+            time.sleep(delay)
 
     #/************************************************************************/
     async \
-    def __async_cache_response(self, session, url, force_download, cache_store, expire_after):
-        # asynchronous implementation of cache_response
-        pathname = self.__build_cache(url, cache_store)
-        is_cached = self.__is_cached(pathname, expire_after)
-        if force_download is True or is_cached is False or cache_store in (None,False):
-            response = await session.get(url)
-            content = await response.content.read()
-            if cache_store not in (None,False):
-                try:
-                    assert aiofiles
-                except:  # we loose the benefits of the async ... but ok
-                    print('__async open')
-                    with open(pathname, 'wb') as f:
-                        f.write(content)
-                else:
-                    async with aiofiles.open(pathname, 'wb') as f:
-                        await f.write(content)
-        else:
+    def __asend(self, session, url, **kwargs):
+        # asynchronous counterpart of __send
+        attempt = 0
+        while True:
+            await self.__limiter.aacquire(url)
+            start, response, status = time.monotonic(), None, None
             try:
-                assert aiofiles
-            except:
-                with open(pathname, 'rb') as f:
-                    content = f.read() 
+                response = await session.get(url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.__retries:
+                    raise
             else:
-                async with aiofiles.open(pathname, 'rb') as f:
-                    content = await f.read() 
-        return content, pathname
+                status = response.status
+            finally:
+                self.__limiter.release(url, status, time.monotonic() - start)
+            if status is not None and (status not in settings.DEF_RETRY_STATUS or attempt >= self.__retries):
+                return response
+            delay = self.__limiter.backoff(url, attempt, 
+                                           response.headers.get('Retry-After') if response is not None else None)
+            if response is not None:
+                response.release()
+            happyVerbose('request to %s failed (%s) - retried in %.2fs' % (url, status or 'no response', delay))
+            _Tracer.record('retries', 1)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    #/************************************************************************/
+    def __sync_fetch(self, url):
+        # plain (uncached) request; concurrent requests of the same URL share it
+        try:
+            with self.__stats.timer(url, 'network_time'), self.__tracer.request(url) as trace:
+                if REQUESTS_CACHE_INSTALLED is True:
+                    with requests_cache.disabled():
+                        response = self.__send(url)    
+                else:
+                    response = self.__send(url)                
+                trace.update({'status': response.status_code, 'ttfb': response.elapsed.total_seconds(),
+                              'size': len(response.content)})
+        except:
+            raise happyError('wrong request formulated') 
+        self.__stats.add(url, misses=1)
+        self.__check_status(response, url)
+        return response
+
+    #/************************************************************************/
+    def __sync_cache_response(self, url, force_download, cache_store, expire_after, load=True):
+        # sequential implementation of cache_response; when load is False, an
+        # open file is returned instead of the content read in memory; the codec 
+        # and fetch time of the cached file are returned as well
+        cache = self.__disk_cache(cache_store)
+        if cache is None:
+            response = self.__inflight.do((url, None), self.__sync_fetch, url)
+            return response.content, '', {}
+        hit = self.__memory_get(cache.path(url), force_download, expire_after, cache)
+        if hit is not None:
+            self.__stats.add(url, hits=1, bytes_read=len(hit[0]))
+            self.__tracer.emit('cache', url, lookup='memory', size=len(hit[0]), disk_time=0.)
+            return hit
+        # concurrent requests of the same URL wait for the first one to be stored
+        lookup = self.__inflight.do((url, cache.root, force_download), 
+                                    self.__sync_store, cache, url, force_download, expire_after)
+        start = time.perf_counter()
+        f = cache.open(url)
+        if f is None:
+            return None, cache.path(url), {}
+        meta = {'codec': f.codec, 'fetched': f.fetched}
+        if load is True or (self.__memory is not None and f.size <= self.__memory.max_size // 8):
+            with f:
+                f = f.read()
+            if self.__memory is not None:
+                self.__memory.put(cache.path(url), (f, meta), len(f))
+        size, elapsed = len(f) if isinstance(f, bytes) else f.size, time.perf_counter() - start
+        self.__stats.add(url, bytes_read=size, disk_time=elapsed)
+        self.__tracer.emit('cache', url, lookup=lookup, size=size, disk_time=elapsed)
+        return f, cache.path(url), meta
+
+    #/************************************************************************/
+    def __sync_store(self, cache, url, force_download, expire_after):
+        # download (or revalidate) the response of a URL into the cache; return
+        # the outcome of the lookup: 'fresh', 'revalidated' or 'downloaded'
+        entry, cached = None, False
+        if force_download is False:
+            entry = cache.lookup(url)
+            cached = entry is not None and not cache._expired(entry['fetched'], expire_after)
+        if cached is True:
+            self.__stats.add(url, hits=1)
+            return 'fresh'
+        with self.__stats.timer(url, 'network_time'), self.__tracer.request(url) as trace:
+            # an expired response is revalidated rather than downloaded again
+            response = self.__send(url, headers=self.__conditional_headers(entry), stream=True)
+            if response.status_code == 304 and entry is not None:
+                happyVerbose('cached response for URL %s not modified' % url)
+                response.close()
+                cache.touch(url, **self.__validators(response))
+                cached = url in cache 
+                if cached is True:
+                    trace.update({'status': 304, 'ttfb': response.elapsed.total_seconds()})
+                    self.__stats.add(url, revalidations=1)
+                    return 'revalidated'
+                response = self.__send(url, stream=True) # file lost in between
+            trace.update({'status': response.status_code, 'ttfb': response.elapsed.total_seconds()})
+            try:
+                self.__check_status(response, url) # do not cache error pages
+                # stream the body straight into the cache
+                with cache.writer(url, codec=cache.codec(response.headers.get('Content-Type'), url), 
+                                  **self.__validators(response)) as f:
+                    for chunk in response.iter_content(chunk_size=settings.DEF_CHUNK_SIZE):
+                        f.write(chunk)
+                        trace['size'] += len(chunk)
+            finally:
+                response.close()
+        self.__stats.add(url, misses=1, bytes_written=(cache.lookup(url) or {}).get('size', 0))
+        return 'downloaded'
+
+    #/************************************************************************/
+    async \
+    def __async_fetch(self, session, url):
+        # plain (uncached) request; concurrent requests of the same URL share it
+        try:
+            with self.__stats.timer(url, 'network_time'), self.__tracer.request(url) as trace:
+                aresp = await self.__asend(session, url)                
+                trace.update({'status': aresp.status, 'ttfb': time.perf_counter() - trace['start']})
+                self.__check_status(aresp, url)
+                # read the body so that the connection returns to the pool
+                response = _CachedResponse(await aresp.read(), url)
+                trace['size'] = len(response.content)
+            self.__stats.add(url, misses=1)
+        except happyError as e:
+            raise happyError(errtype=e)
+        except:
+            raise happyError('wrong request formulated') 
+        response.headers = requests.structures.CaseInsensitiveDict(aresp.headers)
+        return response
+
+    #/************************************************************************/
+    async \
+    def __async_cache_response(self, session, url, force_download, cache_store, expire_after, load=True):
+        # asynchronous implementation of cache_response; see __sync_cache_response
+        # for the load argument
+        cache = self.__disk_cache(cache_store)
+        if cache is None:
+            response = await self.__inflight.ado((url, None), self.__async_fetch, session, url)
+            return response.content, '', {}
+        hit = self.__memory_get(cache.path(url), force_download, expire_after, cache)
+        if hit is not None:
+            self.__stats.add(url, hits=1, bytes_read=len(hit[0]))
+            self.__tracer.emit('cache', url, lookup='memory', size=len(hit[0]), disk_time=0.)
+            return hit
+        # concurrent requests of the same URL wait for the first one to be stored
+        lookup = await self.__inflight.ado((url, cache.root, force_download), 
+                                           self.__async_store, session, cache, url, force_download, expire_after)
+        start = time.perf_counter()
+        f = cache.open(url)
+        if f is None:
+            return None, cache.path(url), {}
+        meta = {'codec': f.codec, 'fetched': f.fetched}
+        if load is True or (self.__memory is not None and f.size <= self.__memory.max_size // 8):
+            with f:
+                f = f.read()
+            if self.__memory is not None:
+                self.__memory.put(cache.path(url), (f, meta), len(f))
+        size, elapsed = len(f) if isinstance(f, bytes) else f.size, time.perf_counter() - start
+        self.__stats.add(url, bytes_read=size, disk_time=elapsed)
+        self.__tracer.emit('cache', url, lookup=lookup, size=size, disk_time=elapsed)
+        return f, cache.path(url), meta
+
+    #/************************************************************************/
+    async \
+    def __async_store(self, session, cache, url, force_download, expire_after):
+        # download (or revalidate) the response of a URL into the cache; return
+        # the outcome of the lookup: 'fresh', 'revalidated' or 'downloaded'
+        entry, cached = None, False
+        if force_download is False:
+            entry = cache.lookup(url)
+            cached = entry is not None and not cache._expired(entry['fetched'], expire_after)
+        if cached is True:
+            self.__stats.add(url, hits=1)
+            return 'fresh'
+        with self.__stats.timer(url, 'network_time'), self.__tracer.request(url) as trace:
+            # an expired response is revalidated rather than downloaded again
+            response = await self.__asend(session, url, headers=self.__conditional_headers(entry))
+            if response.status == 304 and entry is not None:
+                happyVerbose('cached response for URL %s not modified' % url)
+                response.release()
+                cache.touch(url, **self.__validators(response))
+                cached = url in cache 
+                if cached is True:
+                    trace.update({'status': 304, 'ttfb': time.perf_counter() - trace['start']})
+                    self.__stats.add(url, revalidations=1)
+                    return 'revalidated'
+                response = await self.__asend(session, url) # file lost in between
+            trace.update({'status': response.status, 'ttfb': time.perf_counter() - trace['start']})
+            try:
+                self.__check_status(response, url) # do not cache error pages
+                # stream the body straight into the cache (small local writes)
+                with cache.writer(url, codec=cache.codec(response.headers.get('Content-Type'), url), 
+                                  **self.__validators(response)) as f:
+                    async for chunk in response.content.iter_chunked(settings.DEF_CHUNK_SIZE):
+                        f.write(chunk)
+                        trace['size'] += len(chunk)
+            finally:
+                response.release()
+        self.__stats.add(url, misses=1, bytes_written=(cache.lookup(url) or {}).get('size', 0))
+        return 'downloaded'
     
     #/************************************************************************/
     @_Decorator.parse_url
@@ -2475,59 +4833,55 @@ class _Service(object):
         expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
         if ASYNCIO_AVAILABLE is False:
             try:
-                resp, path = zip(*[self.__sync_cache_response(u, force_download, cache_store, expire_after)              \
-                                        for u in url])
+                # repeated URLs are fetched once
+                unique = {u: None for u in url}
+                for u in unique:
+                    unique[u] = self.__sync_cache_response(u, force_download, cache_store, expire_after)
+                resp, path, _ = zip(*[unique[u] for u in url])
             except happyError as e:
                 raise happyError(errtype=e) # 'sequential status extraction error'
         else:
-            asyncio.set_event_loop(asyncio.new_event_loop())
-            loop = asyncio.get_event_loop() # event loop
-            async def async_cache_all_response(loop, url):
-                async with aiohttp.ClientSession(loop=loop, raise_for_status=True) as session:
-                    # tasks to do
-                    tasks = [self.__async_cache_response(session, u,
-                                                         force_download, cache_store, expire_after)         \
-                                for u in url]
-                    # gather task responses
-                    return await asyncio.gather(*tasks, return_exceptions=True) 
+            async def async_cache_all_response(url):
+                session = await self.__get_aio_session()
+                # tasks to do
+                tasks = [self.__async_cache_response(session, u,
+                                                     force_download, cache_store, expire_after)         \
+                            for u in url]
+                # gather task responses
+                return await asyncio.gather(*tasks, return_exceptions=True) 
             try:
-                future = asyncio.ensure_future(async_cache_all_response(loop, url)) 
-                # future = loop.create_task(aio_get_all_status(urls))
-                resp, path = zip(*loop.run_until_complete(future)) # loop until done
-                # status = future.result()
+                resp, path, _ = zip(*self.__run_async(async_cache_all_response(url))) # loop until done
             except happyError as e:
                 raise happyError(errtype=e) # 'asynchronous status extraction error'
-            finally:
-                loop.close()             
+
         return (resp, path) if resp in ([],None) or len(resp)>1 else (resp[0], path[0])
 
     #/************************************************************************/
     def __sync_get_response(self, url, force_download, caching, cache_store, expire_after, **kwargs):
         if caching is False or cache_store is None:
-            try:
-                if REQUESTS_CACHE_INSTALLED is True:
-                    with requests_cache.disabled():
-                        resp = self.session.get(url)    
-                else:
-                    resp = self.session.get(url)                
-            except:
-                raise happyError('wrong request formulated') 
+            resp = self.__inflight.do((url, None), self.__sync_fetch, url)
         else: 
-            path = ''
+            path, meta = '', {}
             try:
-                if CACHECONTROL_INSTALLED is True:
-                    resp = self.session.get(url)                
+                # third-party caches are used on demand only (see cache_backend)
+                if self.__cache_backend == 'cachecontrol':
+                    resp = self.__send(url)                
+                    self.__check_status(resp, url)
                     path = cache_store
-                elif REQUESTS_CACHE_INSTALLED is True:
-                    with requests_cache.enabled(cache_store, **kwargs):
-                        resp = self.session.get(url)  
+                elif self.__cache_backend == 'requests_cache':
+                    with requests_cache.enabled(os.path.join(cache_store, self.__cache_backend), **kwargs):
+                        resp = self.__send(url)  
+                    self.__check_status(resp, url)
                     path = cache_store
                 else:
-                    resp, path = self.__sync_cache_response(url, force_download, cache_store, expire_after)
+                    # keep the (possibly large) cached content on disk until it is read
+                    resp, path, meta = self.__sync_cache_response(url, force_download, cache_store, expire_after, load=False)
+            except happyError as e:
+                raise happyError(errtype=e)
             except:
                 raise happyError('wrong request formulated')  
             else:
-                resp = _CachedResponse(resp, url, path=path)
+                resp = _CachedResponse(resp, url, path=path, **meta)
         try:
             assert resp is not None
         except:
@@ -2537,19 +4891,19 @@ class _Service(object):
     #/************************************************************************/
     async \
     def __async_get_response(self, session, url, force_download, caching, cache_store, expire_after):
-        if caching is False or cache_store is None:
-            try:
-                resp = await session.get(url)                
-            except:
-                raise happyError('wrong request formulated') 
+        if caching is False or cache_store in (None,False):
+            resp = await self.__inflight.ado((url, None), self.__async_fetch, session, url)
         else: 
             try:
-                resp, path = await self.__async_cache_response(session, url, force_download, cache_store, expire_after)
+                # keep the (possibly large) cached content on disk until it is read
+                resp, path, meta = await self.__async_cache_response(session, url, force_download, cache_store, 
+                                                                     expire_after, load=False)
+            except happyError as e:
+                raise happyError(errtype=e)
             except:
                 raise happyError('wrong request formulated')  
             else:
-                print('url=%s' % url)
-                resp = _CachedResponse(resp, url, path=path)
+                resp = _CachedResponse(resp, url, path=path, **meta)
         try:
             assert resp is not None
             # yield from response.raise_for_status()
@@ -2557,6 +4911,25 @@ class _Service(object):
             raise happyError('wrong response retrieved')  
         return resp
     
+    #/************************************************************************/
+    def __cache_arguments(self, kwargs):
+        # parse the caching arguments of get_response and aget_response
+        caching = kwargs.pop(_Decorator.KW_CACHING, True)
+        cache_store = kwargs.pop(_Decorator.KW_CACHE,None) or self.cache_store or False
+        if isinstance(cache_store, bool) and cache_store is True:
+            cache_store = self.__default_cache()
+        # create cache directory only the fist time it is needed
+        if cache_store not in (False, None):
+            if not os.path.exists(cache_store):
+                os.makedirs(cache_store)
+            elif not os.path.isdir(cache_store):
+                raise happyError('cache %s is not a directory' % cache_store)
+        force_download = kwargs.pop(_Decorator.KW_FORCE, False)
+        if not isinstance(force_download, bool):
+            raise happyError('wrong type for %s parameter' % _Decorator.KW_FORCE.upper())
+        expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
+        return caching, cache_store, force_download, expire_after
+    
     #/************************************************************************/
     @_Decorator.parse_url
     def get_response(self, *url, **kwargs):
@@ -2579,7 +4952,9 @@ class _Service(object):
         _expire_after_ : int,datetime
             time after which the already cached datasets shall be downloaded again; 
             when not set, the internal :data:`~_Service.expire_after` value already 
-            set for the service is used.
+            set for the service is used; expired datasets are first revalidated 
+            with the server (using their :literal:`ETag`/:literal:`Last-Modified` 
+            headers) and only transferred again when they changed.
         _force_download_ : bool
             flag set to force the downloading of the datasets/responses even if
             those are already cached, and independently of the value of the
@@ -2600,7 +4975,14 @@ class _Service(object):
             error is raised in the cases:
             
                 * the request is wrongly formulated,
-                * a bad response is retrieved.
+                * a bad response is retrieved,
+                * a non-2xx status is returned by the server.
+            
+        Note
+        ----
+        Identical requests are coalesced: a URL repeated in :data:`url` is fetched
+        once, and a URL already being fetched (by another thread or coroutine 
+        using the same service) is waited for instead of being requested again.
             
         Examples
         --------
@@ -2651,50 +5033,144 @@ class _Service(object):
             pass
         else:
             url = kwargs.pop(_Decorator.KW_URL)
-        caching = kwargs.pop(_Decorator.KW_CACHING, True)
-        cache_store = kwargs.pop(_Decorator.KW_CACHE,None) or self.cache_store or False
-        if isinstance(cache_store, bool) and cache_store is True:
-            cache_store = self.__default_cache()
-        # create cache directory only the fist time it is needed
-        if cache_store not in (False, None):
-            if not os.path.exists(cache_store):
-                os.makedirs(cache_store)
-            elif not os.path.isdir(cache_store):
-                raise happyError('cache %s is not a directory' % cache_store)
-        force_download = kwargs.pop(_Decorator.KW_FORCE, False)
-        if not isinstance(force_download, bool):
-            raise happyError('wrong type for %s parameter' % _Decorator.KW_FORCE.upper())
-        expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
-        #expire_after = kwargs.pop(_Decorator.KW_EXPIRE,None) or self.expire_after or 0
-        if isinstance(cache_store, bool) and cache_store is True:
-            cache_store = self.__default_cache()
+        loop = self._LOOP.get()
+        if loop is not None: # run by an asynchronous method: fetch on the caller's loop
+            return asyncio.run_coroutine_threadsafe(self.aget_response(url, **kwargs), loop).result()
+        caching, cache_store, force_download, expire_after = self.__cache_arguments(kwargs)
         if ASYNCIO_AVAILABLE is False:
             try:
-                response = [self.__sync_get_response(u, force_download, caching, cache_store, expire_after)              \
-                            for u in url]
+                # repeated URLs are fetched once (and share their response)
+                unique = {u: None for u in url}
+                for u in unique:
+                    unique[u] = self.__sync_get_response(u, force_download, caching, cache_store, expire_after)
+                response = [unique[u] for u in url]
             except happyError as e:
                 raise happyError(errtype=e) # 'sequential status extraction error'
         else:
-            asyncio.set_event_loop(asyncio.new_event_loop())
-            loop = asyncio.get_event_loop() # event loop
-            async def async_get_all_response(loop, url):
-                async with aiohttp.ClientSession(loop=loop, raise_for_status=True) as session:
-                    # tasks to do
-                    tasks = [self.__async_get_response(session, u, force_download, caching, cache_store, expire_after)  \
-                             for u in url]
-                    # gather task responses
-                    return await asyncio.gather(*tasks, return_exceptions=True) 
+            async def async_get_all_response(url):
+                session = await self.__get_aio_session()
+                # tasks to do
+                tasks = [self.__async_get_response(session, u, force_download, caching, cache_store, expire_after)  \
+                         for u in url]
+                # gather task responses
+                return await asyncio.gather(*tasks, return_exceptions=True) 
             try:
-                future = asyncio.ensure_future(async_get_all_response(loop, url)) 
-                # future = loop.create_task(aio_get_all_status(urls))
-                response = loop.run_until_complete(future) # loop until done
-                # status = future.result()
+                response = self.__run_async(async_get_all_response(url)) # loop until done
             except happyError as e:
                 raise happyError(errtype=e) # 'asynchronous status extraction error'
-            finally:
-                loop.close()             
+
         return response if response in ([],None) or len(response)>1 else response[0]
     
+    #/************************************************************************/
+    @_Decorator.parse_url
+    async def aget_response(self, *url, **kwargs):
+        """Asynchronous counterpart of :meth:`~_Service.get_response`, run on the 
+        caller's event loop.
+        
+            >>> response = await serv.aget_response(*url, **kwargs)
+            
+        Arguments
+        ---------
+        url : str
+            complete URL name(s) whose response(s) is(are) retrieved.
+            
+        Keyword arguments
+        -----------------
+        workers : int
+            maximum number of requests run concurrently; default: all requests
+            are issued at once (within the limits of the connection pool).
+        rps : float
+            maximum number of requests issued per second; default to the :data:`rps`
+            attribute of the service.
+        kwargs :
+            see keyword arguments of :meth:`~_Service.get_response`.
+            
+        Returns
+        -------
+        response : :class:`_CachedResponse`
+            response(s) fetched from the input :data:`url` addresses, whose content
+            has already been read.
+            
+        Note
+        ----
+        All coroutines running on the same event loop share a single (pooled) 
+        :class:`aiohttp.ClientSession`, released by :meth:`~_Service.aclose`.
+        """
+        try:
+            assert _Decorator.KW_URL in kwargs
+        except:
+            pass
+        else:
+            url = kwargs.pop(_Decorator.KW_URL)
+        workers, rps = kwargs.pop(_Decorator.KW_WORKERS, None), kwargs.pop(_Decorator.KW_RPS, None)
+        # a throttle may be shared by successive calls (see read_urls)
+        throttle = rps if isinstance(rps, _RateLimiter) else _RateLimiter(rps=rps or self.rps)
+        caching, cache_store, force_download, expire_after = self.__cache_arguments(kwargs)
+        session = await self.__get_aio_session()
+        semaphore = asyncio.Semaphore(workers or len(url) or 1)
+        async def fetch(u):
+            async with semaphore:
+                await throttle.await_()
+                return await self.__async_get_response(session, u, force_download, caching, cache_store, expire_after)
+        response = await asyncio.gather(*[fetch(u) for u in url])
+        return response if response in ([],None) or len(response)>1 else response[0]
+
+    #/************************************************************************/
+    async def aread_url(self, *url, **kwargs):
+        """Asynchronous counterpart of :meth:`~_Service.read_url`, run on the 
+        caller's event loop.
+        
+            >>> data = await serv.aread_url(*url, **kwargs)
+            
+        Arguments
+        ---------
+        url : str
+            complete URL name(s) from which data will be fetched.
+            
+        Keyword arguments
+        -----------------
+        kwargs :
+            see keyword arguments of :meth:`~_Service.aget_response` and 
+            :meth:`~_Service.read_response` methods.
+            
+        Returns
+        -------
+        data : 
+            data fetched from the input :data:`url`, formatted according to what 
+            is parsed through the keyword arguments.
+        """
+        response = await self.aget_response(*url, **kwargs)
+        [kwargs.pop(kw, None) for kw in (_Decorator.KW_URL, _Decorator.KW_WORKERS, _Decorator.KW_RPS)]
+        if isinstance(response, list):
+            return [self.__sync_read_response(r, **kwargs.copy()) for r in response]
+        return self.__sync_read_response(response, **kwargs)
+
+    #/************************************************************************/
+    async def _arun(self, func, *args, **kwargs):
+        """Run a synchronous method of the service as a coroutine on the caller's 
+        event loop.
+        
+            >>> res = await serv._arun(func, *args, **kwargs)
+            
+        Note
+        ----
+        The method :data:`func` runs in a worker thread, while all the requests 
+        it issues are sent back to the caller's loop (see :meth:`~_Service.aget_response`)
+        and hence share its session: the loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        ctx.run(self._LOOP.set, loop)
+        return await loop.run_in_executor(None, functools.partial(ctx.run, func, *args, **kwargs))
+
+    #/************************************************************************/
+    @staticmethod
+    def __release(response):
+        # close the cached file the content of a response is (or was) streamed from
+        raw = getattr(response, 'raw', None)
+        if isinstance(response, _CachedResponse) and isinstance(raw, io.IOBase):
+            raw.close()
+
     #/************************************************************************/
     def __sync_read_response(self, response, **kwargs):
         if not _Decorator.KW_OFORMAT in kwargs:
@@ -2721,25 +5197,35 @@ class _Service(object):
         else:
             if fmt == 'content':
                 fmt = 'bytes'
+        dup = kwargs.pop(_Decorator.KW_COPY, False)
+        if fmt == 'json' and self.__memory is not None \
+                and getattr(response, '_cache_fetched', None) is not None:
+            # parsed data are kept in memory as long as the cached response is unchanged
+            hit = self.__memory.get(('json', response._cache_path))
+            if hit is not None and hit[0] == response._cache_fetched:
+                self.__release(response)
+                return copy.deepcopy(hit[1]) if dup is True else hit[1]
         if fmt.startswith('json'):
             try:
-                assert fmt not in ('jsontext', 'jsonbytes')
-                data = response.json()
+                # parse the raw content at once, without decoding it into a text
+                data = response.text if fmt == 'jsontext' else response.content
             except:
-                try:
-                    assert fmt != 'jsonbytes'
-                    data = response.text
-                except:
-                    try:
-                        data = response.content 
-                    except:
-                        raise happyError('error JSON-encoding of response')
-                    else:
-                        fmt = 'jsonbytes' # force
-                else:
-                    fmt = 'jsontext' # force
+                raise happyError('error JSON-encoding of response')
             else:
-                return data
+                self.__release(response)
+            start = time.perf_counter()
+            try:
+                data = _JSONBackend.loads(data, encoding=getattr(response, 'encoding', None))
+            except happyError as e:
+                raise happyError(errtype=e)
+            self.__tracer.emit('decode', getattr(response, 'url', None), format=fmt, size=len(response.content), 
+                               decode_time=time.perf_counter() - start)
+            # data parsed for a caller who wants its own copy are not shared
+            if self.__memory is not None and getattr(response, '_cache_fetched', None) is not None \
+                    and dup is False:
+                self.__memory.put(('json', response._cache_path), (response._cache_fetched, data), 
+                                  len(response.content))
+            return data
         elif fmt == 'raw':
             try:
                 data = response.raw
@@ -2750,35 +5236,30 @@ class _Service(object):
                 data = response.text
             except:
                 raise happyError('error accessing ''text'' attribute of response')
+            else:
+                self.__release(response)
+        elif fmt == 'zip' and os.path.isfile(getattr(response, '_cache_path', '') or '')    \
+                and getattr(response, '_cache_codec', None) is None:
+            # work directly on the cached file rather than loading it in memory
+            data = response._cache_path
+            self.__release(response)
         elif fmt in ('bytes', 'bytesio', 'zip'):
             try:
                 data = response.content 
             except:
                 raise happyError('error accessing ''content'' attribute of response')
+            else:
+                self.__release(response)
         if fmt == 'stringio':
             try:
                 data = io.StringIO(data)
             except:
                 raise happyError('error loading StringIO data')
-        elif fmt in ('bytesio', 'zip'):
+        elif fmt in ('bytesio', 'zip') and not happyType.isstring(data):
             try:
                 data = io.BytesIO(data)
             except:
                 raise happyError('error loading BytesIO data')
-        elif fmt == 'jsontext':
-            try:
-                data = json.loads(data)
-            except:
-                raise happyError('error JSON-encoding of str text')
-        elif fmt == 'jsonbytes':                
-                try:
-                    data = json.loads(data.decode())
-                except:
-                    try:            
-                        assert CHARDET_INSTALLED is True
-                        data = json.loads(data.decode(chardet.detect(data)["encoding"]))
-                    except:
-                        raise happyError('error JSON-encoding of bytes content')
         if fmt != 'zip':
             return data 
         # deal with special case
@@ -2851,7 +5332,7 @@ class _Service(object):
         if fmt.startswith('json'):
             try:
                 assert fmt not in ('jsontext', 'jsonbytes')
-                data = await response.json()
+                data = _JSONBackend.loads(await response.read(), encoding=response.charset)
             except:
                 try:
                     assert fmt != 'jsonbytes'
@@ -2892,20 +5373,11 @@ class _Service(object):
                 data = await io.BytesIO(data)
             except:
                 raise happyError('error loading BytesIO data')
-        elif fmt == 'jsontext':
+        elif fmt in ('jsontext', 'jsonbytes'):
             try:
-                data = await json.loads(data)
-            except:
-                raise happyError('error JSON-encoding of str text')
-        elif fmt == 'jsonbytes':                
-                try:
-                    data = json.loads(data.decode())
-                except:
-                    try:            
-                        assert CHARDET_INSTALLED is True
-                        data = await json.loads(data.decode(chardet.detect(data)["encoding"]))
-                    except:
-                        raise happyError('error JSON-encoding of bytes content')
+                data = _JSONBackend.loads(data)
+            except happyError as e:
+                raise happyError(errtype=e)
         if fmt != 'zip':
             return data 
         # deal with special case
@@ -2965,6 +5437,11 @@ class _Service(object):
         Keyword arguments
         -----------------
         ofmt : str
+        _copy_ : bool
+            flag set to return a (deep) copy of the JSON data kept in the memory 
+            cache of the service (see :data:`memory_size`), which the caller can 
+            then modify; default: :data:`_copy_=False`, shared data are returned,
+            and shall not be modified.
         kwargs :
             
         Returns
@@ -3001,22 +5478,16 @@ class _Service(object):
             except happyError as e:
                 raise happyError(errtype=e) # 'sequential status extraction error'
         else:
-            asyncio.set_event_loop(asyncio.new_event_loop())
-            loop = asyncio.get_event_loop() # event loop
-            async def async_read_all_response(loop, response):
+            async def async_read_all_response(response):
                 # tasks to do
                 tasks = [self.__async_read_response(resp, **kwargs) for resp in response]
                 # gather task responses
                 return await asyncio.gather(*tasks, return_exceptions=True) 
             try:
-                future = asyncio.ensure_future(async_read_all_response(loop, response)) 
-                # future = loop.create_task(aio_get_all_status(urls))
-                data = loop.run_until_complete(future) # loop until done
-                # status = future.result()
+                data = self.__run_async(async_read_all_response(response)) # loop until done
             except happyError as e:
                 raise happyError(errtype=e) # 'asynchronous status extraction error'
-            finally:
-                loop.close()             
+
         return data if data in ([],None) or len(data)>1 else data[0]
     
     #/************************************************************************/
@@ -3033,8 +5504,15 @@ class _Service(object):
             
         Keyword arguments
         -----------------
+        _probe_status_ : bool
+            flag set to check the status of the URL through a separate HEAD request 
+            (see :meth:`~_Service.get_status`) prior to fetching it; default: 
+            :data:`_probe_status_=False`, the status is instead validated on the GET 
+            response itself, and no request at all is sent when the response is 
+            served from the cache.
         kwargs :
-            see keyword arguments of :meth:`~_Service.read_response` method.
+            see keyword arguments of :meth:`~_Service.get_response` and 
+            :meth:`~_Service.read_response` methods.
             
         Returns
         -------
@@ -3047,7 +5525,7 @@ class _Service(object):
         happyError
             error is raised in the cases:
             
-                * there is a wrong URL status,
+                * there is a wrong URL status (non-2xx),
                 * data cannot be loaded.
              
         Examples
@@ -3055,7 +5533,13 @@ class _Service(object):
         
         Note
         ----
-        A mix of sequential/asynchronous implementations... 
+        The request is run through :meth:`~_Service.get_response`, hence either
+        sequentially (with :mod:`requests`) or asynchronously (with :mod:`aiohttp`,
+        on the event loop of the service) depending on the packages available, 
+        and its response is served from the cache whenever possible. Only one GET
+        request is sent per URL, unless :data:`_probe_status_` is set. Use 
+        :meth:`~_Service.read_urls` to fetch a batch of URLs concurrently, or 
+        :meth:`~_Service.aread_url` from a coroutine.
 
         See also
         --------
@@ -3068,12 +5552,13 @@ class _Service(object):
             pass
         else:
             url = kwargs.pop(_Decorator.KW_URL)
-        try:
-            assert self.get_status(url) is not None
-        except happyError as e:
-            raise happyError(errtype=e)
-        except:
-            raise happyError('error API request - wrong URL status')
+        if kwargs.pop(_Decorator.KW_PROBE, False) is True:
+            try:
+                assert self.get_status(url) is not None
+            except happyError as e:
+                raise happyError(errtype=e)
+            except:
+                raise happyError('error API request - wrong URL status')
         try:
             response = self.get_response(url, **kwargs)
         except happyError as e:
@@ -3082,6 +5567,344 @@ class _Service(object):
             raise happyError('URL data for %s not loaded' % url)
         return self.read_response(response, **kwargs)
             
+    #/************************************************************************/
+    def read_urls(self, url, **kwargs):
+        """Iterate over the (possibly formatted) responses of a batch of URLs 
+        fetched concurrently.
+        
+            >>> for data in serv.read_urls(url, **kwargs):
+                    ...
+            
+        Arguments
+        ---------
+        url : iterable
+            complete URL names from which data will be fetched.
+            
+        Keyword arguments
+        -----------------
+        workers : int
+            maximum number of requests run concurrently; default to the :data:`workers` 
+            attribute of the service.
+        rps : float
+            maximum number of requests issued per second; default to the :data:`rps`
+            attribute of the service.
+        kwargs :
+            see keyword arguments of :meth:`~_Service.get_response` and
+            :meth:`~_Service.read_response` methods.
+            
+        Returns
+        -------
+        data : generator
+            data fetched from the input :data:`url` addresses, yielded in the
+            order of the input; a request that failed raises its error when its 
+            turn comes.
+            
+        Note
+        ----
+        When the :data:`_return_errors_` keyword argument is set to :data:`True`,
+        the error of a failed request is yielded (instead of raised) in place of
+        its data, so that the other requests are not interrupted.
+        
+        As with :meth:`~_Service.read_url`, no HEAD request is sent: bad responses 
+        are detected when reading them. No more than twice :data:`workers` requests 
+        are pending at any time, so that results are consumed as they arrive.
+
+        See also
+        --------
+        :meth:`~_Service.read_url`, :meth:`~_Service.get_response`, 
+        :meth:`~_Service.read_response`.
+        """
+        workers = kwargs.pop(_Decorator.KW_WORKERS, None) or self.workers
+        try:
+            assert isinstance(workers, int) and workers > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_WORKERS.upper())
+        throttle = _RateLimiter(rps=kwargs.pop(_Decorator.KW_RPS, None) or self.rps)
+        errors = kwargs.pop(_Decorator.KW_ERRORS, False)
+        def fetch(u):
+            throttle.wait()
+            try:
+                response = self.get_response(u, **kwargs)
+            except happyError as e:
+                if errors is True:
+                    return happyError(errtype=e)
+                raise happyError(errtype=e)
+            except:
+                if errors is True:
+                    return happyError('URL data for %s not loaded' % u)
+                raise happyError('URL data for %s not loaded' % u)
+            return self.read_response(response, **kwargs)
+        loop = self._LOOP.get()
+        if loop is not None: 
+            # run by an asynchronous method: fetch windows of URLs on the caller's loop
+            url = iter(url)
+            window = list(itertools.islice(url, 2 * workers))
+            while window:
+                try:
+                    response = asyncio.run_coroutine_threadsafe(
+                        self.aget_response(window, workers=workers, rps=throttle, **kwargs), loop).result()
+                except happyError as e:
+                    if errors is False or len(window) == 1:
+                        if errors is False:
+                            raise happyError(errtype=e)
+                        response = e
+                    else: # find out which requests failed
+                        response = []
+                        for u in window:
+                            try:
+                                response.append(asyncio.run_coroutine_threadsafe(
+                                    self.aget_response(u, rps=throttle, **kwargs), loop).result())
+                            except happyError as e:
+                                response.append(e)
+                for r in (response if len(window)>1 else [response]):
+                    yield r if isinstance(r, happyError) else self.read_response(r, **kwargs)
+                window = list(itertools.islice(url, 2 * workers))
+            return
+        elif workers == 1 or ASYNCIO_AVAILABLE is True: 
+            # the asynchronous session is bound to the loop of the service
+            for u in url:
+                yield fetch(u)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for u in url:
+                pending.append(executor.submit(fetch, u))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+            
+    #/************************************************************************/
+    def read_lookups(self, url, key=None, **kwargs):
+        """Iterate over the (JSON) responses of a batch of lookup URLs, *e.g.* 
+        geocoding queries, remembering those that returned no result.
+        
+            >>> for data in serv.read_lookups(url, key=None, **kwargs):
+                    ...
+            
+        Arguments
+        ---------
+        url : iterable
+            complete URL names of the lookups.
+            
+        Keyword arguments
+        -----------------
+        key : str
+            key of the results in the data returned by a lookup, *e.g.* :literal:`'features'`;
+            when set, data where this key is missing or empty are an empty result;
+            default: only empty data are.
+        kwargs :
+            see keyword arguments of :meth:`~_Service.read_urls`.
+            
+        Returns
+        -------
+        data : generator
+            data fetched from the input :data:`url` addresses, yielded in the
+            order of the input; :literal:`[]` is yielded for lookups known as 
+            unresolved, which are not run.
+            
+        Note
+        ----
+        Lookups that returned an empty result, or failed with an HTTP status 
+        listed in :data:`settings.DEF_NEGATIVE_STATUS`, are recorded in the negative
+        cache of the service (see :meth:`~_Service.negative_cache`), and skipped
+        until their record expires; empty responses are removed from the disk
+        cache, so that they are looked up again afterwards. Other failures are 
+        raised as usual.
+
+        See also
+        --------
+        :meth:`~_Service.read_urls`, :class:`_NegativeCache`.
+        """
+        empty = lambda data: data in ([], {}, None)                                        \
+            or (key is not None and (not happyType.ismapping(data) or data.get(key) in ([], {}, None)))
+        url, negative = list(url), self.negative_cache
+        known = [negative is not None and negative.get(u) is not None for u in url]
+        kwargs.update({_Decorator.KW_OFORMAT: kwargs.get(_Decorator.KW_OFORMAT) or 'JSON',
+                       _Decorator.KW_ERRORS: True})
+        response = self.read_urls([u for u, k in zip(url, known) if k is False], **kwargs)
+        for u, k in zip(url, known):
+            if k is True:
+                happyVerbose('lookup %s known as unresolved - skipped' % u)
+                yield []
+                continue
+            data = next(response)
+            if isinstance(data, happyError):
+                status = _NegativeCache.status(data)
+                if negative is None or status not in settings.DEF_NEGATIVE_STATUS:
+                    raise data
+                negative.put(u, status=status)
+                data = []
+            elif negative is not None and empty(data):
+                negative.put(u)
+                # the empty response shall not outlive its record in the negative cache
+                cache = self.__disk_cache(kwargs.get(_Decorator.KW_CACHE) or self.cache_store)
+                if cache is not None and u in cache:
+                    cache.remove(u)
+                    if self.__memory is not None:
+                        self.__memory.remove(cache.path(u), ('json', cache.path(u)))
+            yield data
+            
+    #/************************************************************************/
+    def prefetch(self, url, **kwargs):
+        """Download a batch of URLs into the disk cache, concurrently, so that 
+        they are readily available for later requests.
+        
+            >>> report = serv.prefetch(url, **kwargs)
+            
+        Arguments
+        ---------
+        url : iterable
+            complete URL names whose responses are cached.
+            
+        Keyword arguments
+        -----------------
+        workers : int
+            maximum number of requests run concurrently; default to the :data:`workers` 
+            attribute of the service.
+        rps : float
+            maximum number of requests issued per second; default to the :data:`rps`
+            attribute of the service.
+        manifest : str
+            pathname of a manifest file where the outcome of every download is 
+            recorded (one JSON line per URL) as soon as it is known; URLs recorded 
+            as successfully downloaded in an existing manifest are skipped, so that
+            an interrupted run can be resumed; default: no manifest is used.
+        progress : callable
+            function called with arguments :data:`(done, total, url, error)` after
+            every URL processed, where :data:`error` is :data:`None` when the 
+            download succeeded; default: progress is reported through verbose 
+            messages.
+        cache_store, expire_after, _force_download_ :
+            see :meth:`~_Service.get_response`; responses already cached (and 
+            not expired) are not downloaded again, unless :data:`_force_download_`
+            is set.
+            
+        Returns
+        -------
+        report : dict
+            dictionary with keys :literal:`total`, :literal:`downloaded`, :literal:`skipped`
+            and :literal:`failed`, the latter mapping every failed URL onto its 
+            error message.
+            
+        Note
+        ----
+        A failed download does not interrupt the process: it is reported and 
+        retried when the run is resumed.
+        
+        See also
+        --------
+        :meth:`~_Service.get_response`, :meth:`~_Service.read_urls`.
+        """
+        workers = kwargs.pop(_Decorator.KW_WORKERS, None) or self.workers
+        try:
+            assert isinstance(workers, int) and workers > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_WORKERS.upper())
+        throttle = _RateLimiter(rps=kwargs.pop(_Decorator.KW_RPS, None) or self.rps)
+        manifest, progress = kwargs.pop(_Decorator.KW_MANIFEST, None), kwargs.pop(_Decorator.KW_PROGRESS, None)
+        try:
+            assert manifest is None or happyType.isstring(manifest)
+            assert progress is None or callable(progress)
+        except:
+            raise happyError('wrong format for %s/%s parameters' % (_Decorator.KW_MANIFEST.upper(), _Decorator.KW_PROGRESS.upper()))
+        cache_store = kwargs.get(_Decorator.KW_CACHE) or self.cache_store or False
+        if isinstance(cache_store, bool) and cache_store is True:
+            cache_store = self.__default_cache()
+        try:
+            cache = self.__disk_cache(cache_store)
+            assert cache is not None
+        except:
+            raise happyError('no cache available for prefetching')
+        force_download = kwargs.get(_Decorator.KW_FORCE) or False
+        expire_after = kwargs.get(_Decorator.KW_EXPIRE) or self.expire_after
+        url = list(collections.OrderedDict.fromkeys(url)) # unique, in order
+        done = set()
+        if manifest is not None and os.path.exists(manifest) and force_download is False:
+            with open(manifest, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError: # truncated line of an interrupted run
+                        continue
+                    if entry.get('status') == 'ok':
+                        done.add(entry.get('url'))
+        skipped = set(u for u in url if force_download is False and (u in done or cache.is_fresh(u, expire_after)))
+        todo = [u for u in url if u not in skipped]
+        report = {'total': len(url), 'downloaded': 0, 'skipped': len(skipped), 'failed': {}}
+        kwargs.update({_Decorator.KW_CACHE: cache_store, _Decorator.KW_CACHING: True})
+        def fetch(u):
+            throttle.wait()
+            response = self.get_response(u, **kwargs)
+            try: # do not keep the cached file open
+                response.raw.close()
+            except AttributeError:
+                pass
+        log = open(manifest, 'a') if manifest is not None else None
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(fetch, u): u for u in todo}
+                for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                    u, error = futures[future], None
+                    try:
+                        future.result()
+                    except Exception as e:
+                        error = str(e) or e.__class__.__name__
+                        report['failed'][u] = error
+                    else:
+                        report['downloaded'] += 1
+                    if log is not None:
+                        log.write(json.dumps({'url': u, 'status': 'ok' if error is None else 'failed', 
+                                              'error': error, 'time': time.time()}) + '\n')
+                        log.flush()
+                    if progress is not None:
+                        progress(report['skipped'] + i + 1, report['total'], u, error)
+                    else:
+                        happyVerbose('[%s/%s] %s %s' % (report['skipped'] + i + 1, report['total'], 
+                                                        'cached' if error is None else 'failed -', error or u))
+        finally:
+            if log is not None:
+                log.close()
+        return report
+            
+    #/************************************************************************/
+    @staticmethod
+    def split_domain(domain, protocol=None):
+        """Split a domain into its web protocol and the remaining part of the
+        domain, so that a service can be pointed to a domain whose protocol 
+        differs from the default one, *e.g.* a local server.
+        
+            >>> protocol, domain = _Service.split_domain(domain, protocol=None)
+            
+        Arguments
+        ---------
+        domain : str
+            domain of the URL, possibly starting with a protocol.
+            
+        Keyword arguments
+        -----------------
+        protocol : str
+            web protocol returned when none is set in :data:`domain`; default 
+            to :data:`settings.PROTOCOL`.
+            
+        Returns
+        -------
+        protocol, domain : str
+            the protocol and the domain stripped from it.
+            
+        Example
+        -------
+        
+            >>> _Service.split_domain('http://127.0.0.1:8080/gisco')
+                ('http', '127.0.0.1:8080/gisco')
+            >>> _Service.split_domain('europa.eu/webtools/rest/gisco/')
+                ('https', 'europa.eu/webtools/rest/gisco/')
+        """
+        match = re.match(r'^([a-zA-Z][a-zA-Z0-9+.-]*)://', domain or '')
+        if match is None:
+            return protocol or settings.PROTOCOL, domain
+        return match.group(1).lower(), domain[match.end():]
+            
     #/************************************************************************/
     @classmethod
     def build_url(cls, domain=None, **kwargs):
@@ -3097,7 +5920,8 @@ class _Service(object):
         Keyword arguments
         -----------------
         protocol : str
-            web protocol; default to :data:`settings.DEF_PROTOCOL`, *e.g.* :literal:`http`\ .
+            web protocol; default to :data:`settings.DEF_PROTOCOL`, *e.g.* :literal:`http`\ ;
+            it is ignored when :data:`domain` already starts with a protocol.
         domain : str
             this keyword can be used when :data:`domain` is not passed as a 
             positional argument already.
@@ -3161,8 +5985,8 @@ class _Service(object):
         protocol = kwargs.pop('protocol', settings.DEF_PROTOCOL)
         if protocol not in settings.PROTOCOLS:
             raise happyError('web protocol not recognised')
-        if not url.startswith(protocol):  
-            url = "%s://%s" % (protocol, url)
+        protocol, url = cls.split_domain(url, protocol)
+        url = "%s://%s" % (protocol, url)
         path = kwargs.pop('path','')  
         if path not in (None,''):
             url = "%s/%s" % (url, path)
@@ -4715,29 +7539,326 @@ class _Memoized(object):
     """Decorator caching a function's return value each time it is called.
     If called later with the same arguments, the cached value is returned
     (not reevaluated).
+    
+        >>> func = _Memoized(func)
+        >>> func = _Memoized(maxsize=maxsize, ttl=ttl, copy=copy)(func)
+        
+    so that it can be used either as :literal:`@_Memoized` or as 
+    :literal:`@_Memoized(maxsize=..., ttl=...)`.
+    
+    Keyword arguments
+    -----------------
+    maxsize : int
+        maximum number of entries kept in the cache; when exceeded, the least 
+        recently used entries are evicted; set to :data:`None` for an unbounded 
+        cache; default to :data:`settings.DEF_MEMOIZE_MAXSIZE`.
+    ttl : float
+        time-to-live (in seconds) of every entry, after which it is recomputed; 
+        set to :data:`None` for entries never to expire; default to 
+        :data:`settings.DEF_MEMOIZE_TTL`.
+    copy : bool
+        flag set to return a (deep) copy of the cached value so that callers
+        cannot alter the cache by modifying mutable outputs; default to :data:`False`.
+        
+    Attributes
+    ----------
+    stats : dict
+        hits/misses/evictions/expired counters, together with current size and
+        maximum size of the cache.
+        
+    Note
+    ----
+    The cache can also be used directly (see :meth:`~_Memoized.get`, 
+    :meth:`~_Memoized.put` and :meth:`~_Memoized.remove`), in which case the 
+    entries may be given a size (*e.g.*, in bytes), and :data:`maxsize` bounds 
+    the total size of the entries rather than their number. Keys are built from the (hashable) positional and keyword arguments, where
+    lists, tuples, sets and dictionaries are recursively frozen. Calls whose 
+    arguments cannot be hashed (*e.g.*, a :class:`pandas.DataFrame`) simply 
+    bypass the cache. When decorating a method, the identity of the instance is 
+    part of the key: the cache holds no reference to the instance, and its entries 
+    are purged once the instance is garbage collected; calls on instances that
+    cannot be weakly referenced bypass the cache. The cache is protected by a 
+    lock, while the function itself is evaluated outside the lock. For methods, 
+    the statistics are accessed through the class, *e.g.* 
+    :literal:`GISCOService.place2coord.stats`.
     """
     
-    def __init__(self, func):
+    #/************************************************************************/
+    def __init__(self, func=None, **kwargs):
+        self.maxsize = kwargs.pop('maxsize', settings.DEF_MEMOIZE_MAXSIZE)
+        self.ttl = kwargs.pop('ttl', settings.DEF_MEMOIZE_TTL)
+        self.copy = kwargs.pop('copy', False)
+        try:
+            assert self.maxsize is None or (happyType.isnumeric(self.maxsize) and self.maxsize > 0)
+        except:
+            raise happyError('wrong value for MAXSIZE argument')
+        try:
+            assert self.ttl is None or (happyType.isnumeric(self.ttl) and self.ttl > 0)
+        except:
+            raise happyError('wrong value for TTL argument')
+        self.cache = collections.OrderedDict() # key: (value, expiry, size)
+        self.__size = 0
+        self.__lock = threading.RLock()
+        self.__stats = dict.fromkeys(('hits', 'misses', 'evictions', 'expired'), 0)
+        self.__finalizers = {} # id of the instances methods are bound to
+        self.func = None
+        if func is not None:
+            self.__wrap(func)
+
+    #/************************************************************************/
+    def __wrap(self, func):
         self.func = func
-        self.cache = {}
+        functools.update_wrapper(self, func)
+        return self
+
+    #/************************************************************************/
+    @classmethod
+    def __freeze(cls, arg):
+        if isinstance(arg, (list, tuple)):
+            return (type(arg).__name__,) + tuple(cls.__freeze(a) for a in arg)
+        elif isinstance(arg, dict):
+            return ('dict',) + tuple(sorted(((k, cls.__freeze(v)) for k, v in arg.items()),
+                                             key=lambda kv: repr(kv[0])))
+        elif isinstance(arg, (set, frozenset)):
+            return ('set',) + tuple(sorted((cls.__freeze(a) for a in arg), key=repr))
+        else:
+            hash(arg) # raise TypeError when not hashable
+            return arg
+    
+    #/************************************************************************/
+    def key(self, *args, **kwargs):
+        """Build the hashable key associated to the input arguments.
+        
+            >>> key = memo.key(*args, **kwargs)
+            
+        Returns
+        -------
+        key : tuple
+            a hashable key; :data:`None` is returned when any of the arguments 
+            cannot be hashed.
+        """
+        try:
+            return (self.__freeze(args), self.__freeze(kwargs))
+        except TypeError:
+            return None
 
+    #/************************************************************************/
     def __call__(self, *args, **kwargs):
-        key = str(args) + str(kwargs)
-        #key = args
-        #if not isinstance(args, collections.Hashable):
-        #    # uncacheable (a list, for instance): better to not cache than blow up.
-        #    return self.func(*args, **kwargs)
-        if not key in self.cache:
-            self.cache[key] = self.func(*args, **kwargs)
-        return self.cache[key]
+        if self.func is None: # used as @_Memoized(**kwargs)
+            try:
+                assert len(args) == 1 and callable(args[0]) and kwargs == {}
+            except:
+                raise happyError('wrong arguments for decorator')
+            return self.__wrap(args[0])
+        return self.__memoize(self.func, None, *args, **kwargs)
+
+    #/************************************************************************/
+    def __track(self, obj):
+        # register (once) the purge of the entries of the instance obj when it 
+        # is garbage collected; return False when obj cannot be weakly referenced
+        oid = id(obj)
+        with self.__lock:
+            if oid in self.__finalizers:
+                return True
+            try:
+                self.__finalizers[oid] = weakref.finalize(obj, self.__purge, oid)
+            except TypeError:
+                return False
+        return True
+
+    #/************************************************************************/
+    def __purge(self, oid):
+        with self.__lock:
+            self.__finalizers.pop(oid, None)
+            [self.__discard(k) for k in [k for k in self.cache if k[0] == oid]]
+
+    #/************************************************************************/
+    def __memoize(self, func, obj, *args, **kwargs):
+        # func is called with args only, while the key also accounts for the 
+        # identity of the instance obj func may be bound to
+        key = self.key(*args, **kwargs)
+        if key is None or (obj is not None and not self.__track(obj)):
+            # uncacheable (a DataFrame, for instance): better to not cache than blow up
+            return func(*args, **kwargs)
+        elif obj is not None:
+            key = (id(obj),) + key
+        value = self.get(key, self.__missing)
+        if value is not self.__missing:
+            return value
+        value = func(*args, **kwargs)
+        self.put(key, value)
+        return copy.deepcopy(value) if self.copy else value
+
+    #/************************************************************************/
+    __missing = object()
+
+    def get(self, key, default=None):
+        """Retrieve the value cached for a key.
+        
+            >>> value = memo.get(key, default=None)
+        """
+        with self.__lock:
+            try:
+                value, expiry, _ = self.cache[key]
+            except KeyError:
+                self.__stats['misses'] += 1
+                return default
+            if expiry is not None and expiry <= time.monotonic():
+                self.__discard(key)
+                self.__stats['expired'] += 1
+                self.__stats['misses'] += 1
+                return default
+            self.cache.move_to_end(key)
+            self.__stats['hits'] += 1
+        return copy.deepcopy(value) if self.copy else value
+
+    #/************************************************************************/
+    def put(self, key, value, size=1):
+        """Cache a value of given size for a key, evicting the least recently 
+        used entries when the cache is full.
+        
+            >>> stored = memo.put(key, value, size=1)
+        """
+        with self.__lock:
+            self.__discard(key)
+            self.cache[key] = (value, None if self.ttl is None else time.monotonic() + self.ttl, size)
+            self.__size += size
+            while self.maxsize is not None and self.__size > self.maxsize:
+                self.__discard(next(iter(self.cache)))
+                self.__stats['evictions'] += 1
+        return True
+
+    #/************************************************************************/
+    def __discard(self, key):
+        try:
+            _, _, size = self.cache.pop(key)
+        except KeyError:
+            pass
+        else:
+            self.__size -= size
+
+    #/************************************************************************/
+    def remove(self, *keys):
+        """Remove the values cached for the given keys, if any.
+        
+            >>> memo.remove(*keys)
+        """
+        with self.__lock:
+            [self.__discard(key) for key in keys]
+
+    #/************************************************************************/
+    def __contains__(self, key):
+        with self.__lock:
+            return key in self.cache
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.cache)
+
+    @property
+    def size(self):
+        """Total size of the cached values, *i.e.* their number unless sizes are 
+        given when storing them.
+        """
+        return self.__size
+
+    #/************************************************************************/
+    @property
+    def stats(self):
+        """Statistics of the cache (:data:`dict`): hits, misses, evictions and 
+        expired counters, as well as the current and maximum sizes.
+        """
+        with self.__lock:
+            stats = self.__stats.copy()
+            stats.update({'size': self.__size, 'maxsize': self.maxsize})
+        return stats
+
+    #/************************************************************************/
+    def clear(self):
+        """Empty the cache and reset its statistics.
+        
+            >>> memo.clear()
+        """
+        with self.__lock:
+            self.cache.clear()
+            self.__size = 0
+            self.__stats = dict.fromkeys(self.__stats.keys(), 0)
+            for finalizer in self.__finalizers.values():
+                finalizer.detach()
+            self.__finalizers.clear()
 
+    #/************************************************************************/
     def __repr__(self):
         """Return the function's docstring.
         """
         return self.func.__doc__
     
+    #/************************************************************************/
     def __get__(self, obj, objtype):
         """Support instance methods.
         """
-        return functools.partial(self.__call__, obj)
+        if obj is None:
+            return self
+        # bind the decorated function (possibly a decorator itself) to obj
+        return functools.partial(self.__memoize, self.func.__get__(obj, objtype), obj)
+
+#%%
+#==============================================================================
+# CLASS _MemoryCache
+#==============================================================================
+
+class _MemoryCache(_Memoized):
+    """Size-bounded in-memory store (LRU, TTL) of web-service responses, used in 
+    front of the disk cache for hot URLs.
+    
+        >>> memo = base._MemoryCache(max_size, ttl=None)
+        
+    Arguments
+    ---------
+    max_size : int
+        maximum total size (in bytes) of the stored values; when exceeded, the 
+        least recently used values are evicted; values larger than an eighth of
+        :data:`max_size` are not stored.
+        
+    Keyword arguments
+    -----------------
+    ttl : float
+        time-to-live (in seconds) of every value; default to :data:`settings.DEF_MEMORY_TTL`.
+        
+    Note
+    ----
+    The store relies on the cache of :class:`_Memoized`, whose :data:`maxsize` 
+    is the total size (in bytes) of the values. Values are not copied (copying
+    large parsed JSON data takes longer than parsing them again): they are shared
+    by all callers and shall be considered as read-only.
+    """
+    
+    #/************************************************************************/
+    def __init__(self, max_size, ttl=settings.DEF_MEMORY_TTL):
+        try:
+            assert happyType.isnumeric(max_size) and max_size > 0
+        except:
+            raise happyError('wrong value for %s parameter' % _Decorator.KW_MEMORY.upper())
+        super(_MemoryCache,self).__init__(maxsize=max_size, ttl=ttl, copy=False)
+
+    #/************************************************************************/
+    @property
+    def max_size(self):
+        """Maximum total size (in bytes) of the stored values.
+        """
+        return self.maxsize
 
+    #/************************************************************************/
+    def put(self, key, value, size):
+        """Store a value of given size (in bytes).
+        
+            >>> stored = memo.put(key, value, size)
+            
+        Returns
+        -------
+        stored : bool
+            :data:`False` when the value is too large to be stored.
+        """
+        if size > self.maxsize // 8:
+            return False
+        return super(_MemoryCache,self).put(key, value, size)
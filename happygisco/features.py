@@ -58,7 +58,7 @@ from happygisco import happyWarning, happyVerbose, happyError, happyType
 from happygisco import settings
 #from happygisco import base
 from happygisco.base import SERVICE_AVAILABLE, ASYNCIO_AVAILABLE, JSON_INSTALLED#analysis:ignore
-from happygisco.base import _Feature, _CachedResponse, _Decorator, _NestedDict
+from happygisco.base import _Feature, _CachedResponse, _Decorator, _NestedDict, _JSONBackend
 from happygisco import tools     
 from happygisco.tools import GDAL_TOOL, GEOPANDAS_TOOL, FOLIUM_TOOL, LEAFLET_TOOL, WIDGET_TOOL
 #from happygisco.tools import GDALTransform, LeafMap
@@ -873,14 +873,14 @@ class Location(_Feature):
         See also
         --------
         :meth:`~Location.geometry`, :meth:`~Location.isnuts`, 
-        :meth:`NUTS.contains`, :meth:`tools.GDALTransform.lay2fid`. 
+        :meth:`NUTS.contains`, :meth:`tools.GDALTransform.layer2fid`. 
         """
         #if not (GDAL_TOOL and isinstance(self.transform, tools.GDALTransform)):
         #    happyWarning('method available only with GDAL tool')
         #    return
         try:
             # geom = self.transform.coord2geom(self.coord, **kwargs)
-            fid = self.transform.lay2fid(layer, self.geometry)
+            fid = self.transform.layer2fid(layer, self.geometry)
         except:
             raise happyError('impossible to establish relationship')
         if fid in ((),[],None)  \
@@ -1224,9 +1224,21 @@ class NUTS(_Feature):
         if not happyType.issequence(resp):
             resp = [resp,]
         try:
-            return [r._cache_path for r in resp]
+            path = [(r._cache_path, getattr(r, '_cache_codec', None)) for r in resp]
         except:
             return []
+        for r in resp: # only the paths are used: do not keep the cached files open
+            try:
+                r.raw.close()
+            except AttributeError:
+                pass
+        try:
+            # gzip compressed files are read through GDAL virtual file system; 
+            # NUTS files are not cached with other codecs (see base._DiskCache.codec)
+            assert all([codec in (None, 'gzip') for _, codec in path])
+        except:
+            raise happyError('cached file(s) compressed with codec(s) not supported by GDAL - clean the cache')
+        return [p if codec is None else '/vsigzip/%s' % p for p, codec in path]
         
     #/************************************************************************/    
     @_Decorator.parse_file
@@ -1387,10 +1399,13 @@ class NUTS(_Feature):
             assert all([happyType.isstring(c) or happyType.ismapping(c) for c in content])
         except:
             raise happyError('wrong format/value for %s argument' % _Decorator.KW_CONTENT.upper())
-        if all([happyType.ismapping(c) for c in content]):
-            content = [happyType.jsonstringify(c) for c in content]
+        # strings are parsed once, while (already parsed) JSON dictionaries are used 
+        # as is: only those with non-string keys need be reformatted
+        content = [c if happyType.ismapping(c) and all([happyType.isstring(k) for k in c])  \
+                   else _JSONBackend.loads(happyType.jsonstringify(c) if happyType.ismapping(c) else c) \
+                   for c in content]
         func = lambda *a, **kw: kw.get(_Decorator.KW_CONTENT)
-        self.__content = [_Decorator.parse_nuts(func)(nuts=json.loads(c)) for c in content]
+        self.__content = [_Decorator.parse_nuts(func)(nuts=c) for c in content]
 
     #/************************************************************************/
     @property
@@ -2060,7 +2075,7 @@ class NUTS(_Feature):
 
         See also
         --------
-        :meth:`Location.iscontained`, :meth:`tools.GDALTransform.lay2fid`. 
+        :meth:`Location.iscontained`, :meth:`tools.GDALTransform.layer2fid`. 
         """
         if len(args)==1 and isinstance(args[0],Location):
             try:
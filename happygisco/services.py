@@ -52,7 +52,7 @@ Perform operations using online web-services, *e.g.*:
 
 *optional*:     :mod:`geopy`, :mod:`googlemaps`, :mod:`googleplaces`, :mod:`pandas`, :mod:`Levenshtein`
 
-*call*:         :mod:`settings`, :mod:`base`         
+*call*:         :mod:`settings`, :mod:`base`, :mod:`tools`         
 
 **Contents**
 """
@@ -64,14 +64,16 @@ __all__         = ['OSMService', 'GISCOService', 'APIService',
                    '_googleMapsAPI', '_googlePlacesAPI', '_geoCoderAPI']
 
 # generic import
-import io
+import os, io
 import collections, itertools
 
 # local (absolute) imports
 from happygisco import happyVerbose, happyWarning, happyError, happyType
 from happygisco import settings
 from happygisco.base import SERVICE_AVAILABLE, JSON_INSTALLED
-from happygisco.base import _Decorator, _CachedResponse, _Service, _NestedDict
+from happygisco.base import _Decorator, _CachedResponse, _Service, _NestedDict, _Memoized, _JSONBackend
+from happygisco.base import _NegativeCache, _DiskCache
+from happygisco.tools import CRSTransform
 
 # requirements
 try:                
@@ -311,16 +313,24 @@ class OSMService(_Service):
         place = ['+'.join(p.replace(',',' ').split()) for p in place]
         fmt = kwargs.pop('format', '')
         key = kwargs.pop('key',None)
+        batch = {_Decorator.KW_WORKERS: kwargs.pop(_Decorator.KW_WORKERS, None),
+                 _Decorator.KW_RPS: kwargs.pop(_Decorator.KW_RPS, None)}
         if fmt is not None:
             kwargs.update({'format':fmt or 'json'})
+        url = []
         for p in place:
             kwargs.update({'q': p})
             try:
-                url = self.url_geocode(**kwargs)
+                url.append(self.url_geocode(**kwargs))
             except:
                 raise happyError('error geolocation URL formatting')
+        # requests are issued concurrently, results come in input order; lookups
+        # with no result are remembered
+        batch.update({_Decorator.KW_OFORMAT: 'JSON'})
+        response = self.read_lookups(url, key=key, **batch)
+        for p in place:
             try:
-                data = self.read_url(url, **{_Decorator.KW_OFORMAT: 'JSON'})
+                data = next(response)
                 assert data not in({},None)
             except:
                 raise happyError('geolocation for place %s not loaded' % p)
@@ -391,6 +401,11 @@ class OSMService(_Service):
             :literal:`street, city, county, state, country, postalcode, countrycodes, viewbox,`
             :literal:`bounded, addressdetails, email, limit, dedupe, debug, polygon_geojson,`
             :literal:`polygon_kml, polygon_svg, polygon_text]` are accepted; see :meth:`~OSMService.url_geocode`.
+        workers, rps :
+            maximum number of concurrent requests and of requests per second used
+            when a batch of places is processed; see :meth:`base._Service.read_urls`.
+            Places that could not be geolocated are not looked up again before 
+            :data:`negative_ttl` (see :meth:`base._Service.read_lookups`).
         
         Returns
         -------
@@ -481,16 +496,24 @@ class OSMService(_Service):
             coord = [list(c) for c in coord]
         fmt = kwargs.pop('format','')
         key = kwargs.pop('key',None)
+        batch = {_Decorator.KW_WORKERS: kwargs.pop(_Decorator.KW_WORKERS, None),
+                 _Decorator.KW_RPS: kwargs.pop(_Decorator.KW_RPS, None)}
         if fmt not in ('', None):
             kwargs.update({'format': 'json'})
+        url = []
         for i in range(len(coord)):
             kwargs.update({'lat': coord[i][0], 'lon': coord[i][1]})
             try:
-                url = self.url_reverse(**kwargs)
+                url.append(self.url_reverse(**kwargs))
             except:
                 raise happyError('error geolocation reverse URL formatting')
+        # requests are issued concurrently, results come in input order; lookups
+        # with no result are remembered
+        batch.update({_Decorator.KW_OFORMAT: 'JSON'})
+        response = self.read_lookups(url, key=key, **batch)
+        for i in range(len(coord)):
             try:
-                data = self.read_url(url, **{_Decorator.KW_OFORMAT: 'JSON'})
+                data = next(response)
                 assert data not in ({},None)
             except:
                 raise happyError('place for geolocation %s not loaded' % coord[i])
@@ -767,6 +790,32 @@ class OSMService(_Service):
              for data in _Decorator.parse_geometry(func)(a, filter='place', unique=unique)]
         return place if place==[] or len(place)>1 else place[0]
 
+    #/************************************************************************/
+    async def aplace2coord(self, *args, **kwargs):
+        """Asynchronous counterpart of :meth:`place2coord`, run on the caller's 
+        event loop.
+        
+            >>> coord = await serv.aplace2coord(place, **kwargs)
+            
+        See also
+        --------
+        :meth:`~OSMService.place2coord`, :meth:`base._Service.aget_response`.
+        """
+        return await self._arun(self.place2coord, *args, **kwargs)
+
+    #/************************************************************************/
+    async def acoord2place(self, *args, **kwargs):
+        """Asynchronous counterpart of :meth:`coord2place`, run on the caller's 
+        event loop.
+        
+            >>> place = await serv.acoord2place(coord, **kwargs)
+            
+        See also
+        --------
+        :meth:`~OSMService.coord2place`, :meth:`base._Service.aget_response`.
+        """
+        return await self._arun(self.coord2place, *args, **kwargs)
+
 #%%
 #==============================================================================
 # CLASS GISCOService
@@ -786,6 +835,16 @@ class GISCOService(OSMService):
     arcgis : str
         domain of |ArcGIS| web-services hosted by |GISCO|; default is :data:`settings.GISCO_ARCGIS`,
         *e.g.* an URL domain like :literal:`'webgate.ec.europa.eu/estat/inspireec/gis/arcgis/rest/services/'`\ .
+    resolver : :class:`tools.NUTSResolver`
+        local resolver used to identify NUTS regions offline instead of running 
+        the online *findnuts* service, whenever the year and the projection of 
+        the query match those of the resolver; default to :data:`None`, *i.e.* 
+        the online service is always used.
+    transformer : :class:`tools.CRSTransform`
+        local transformer used to convert geolocations from one projection to
+        another instead of running the online |ArcGIS| projection service; default 
+        to an instance of :class:`tools.CRSTransform` with the first engine available; 
+        set it to :data:`None` for the online service to be always used.
  
     Attributes
     ----------     
@@ -815,6 +874,16 @@ class GISCOService(OSMService):
         self.__cache_url = kwargs.get(_Decorator.KW_CACHE_URL,  settings.GISCO_CACHEURL)
         self.__map_url = kwargs.get(_Decorator.KW_MAP_URL,      settings.GISCO_TILEURL)
         self.__arcgis = kwargs.get(_Decorator.KW_ARCGIS,        settings.GISCO_ARCGIS)
+        self.__resolver = None
+        self.resolver = kwargs.get(_Decorator.KW_RESOLVER,      None)
+        self.__transformer = None
+        if _Decorator.KW_TRANSFORMER in kwargs.keys():
+            self.transformer = kwargs.get(_Decorator.KW_TRANSFORMER)
+        else:
+            try:
+                self.transformer = CRSTransform()
+            except happyError:
+                happyVerbose('no local transformer available - online projection service used instead')
                  
     #/************************************************************************/
     def __getattr__(self, attr): 
@@ -887,6 +956,35 @@ class GISCOService(OSMService):
         if arcgis is not None and not happyType.isstring(arcgis):
             raise TypeError('wrong type for %s parameter' % _Decorator.KW_ARCGIS.upper())
         self.__arcgis = arcgis or ''
+
+    #/************************************************************************/
+    @property
+    def resolver(self):
+        """Resolver property (:data:`getter`/:data:`setter`) defining the local
+        NUTS resolver, *e.g.* an instance of :class:`tools.NUTSResolver`, used by
+        an instance of this class to identify NUTS regions offline. 
+        """
+        return self.__resolver
+    @resolver.setter#analysis:ignore
+    def resolver(self, resolver):
+        if resolver is not None and not callable(getattr(resolver, 'findnuts', None)):
+            raise TypeError('wrong type for %s parameter' % _Decorator.KW_RESOLVER.upper())
+        self.__resolver = resolver
+
+    #/************************************************************************/
+    @property
+    def transformer(self):
+        """Transformer property (:data:`getter`/:data:`setter`) defining the local
+        transformer, *e.g.* an instance of :class:`tools.CRSTransform`, used by an
+        instance of this class to convert geolocations from one projection to another
+        offline. 
+        """
+        return self.__transformer
+    @transformer.setter#analysis:ignore
+    def transformer(self, transformer):
+        if transformer is not None and not callable(getattr(transformer, 'transform', None)):
+            raise TypeError('wrong type for %s parameter' % _Decorator.KW_TRANSFORMER.upper())
+        self.__transformer = transformer
     
     #/************************************************************************/
     #@classmethod
@@ -1013,6 +1111,7 @@ class GISCOService(OSMService):
         # start...
         url = {}
         protocol = settings.PROTOCOL # 'https'
+        cache_protocol, cache_url = self.split_domain(self.cache_url, protocol)
         if source == 'NUTS2JSON':
             # the files can be retrieved on-the-fly from the base URL 
             #       https://raw.githubusercontent.com/eurostat/Nuts2json/gh-pages/ 
@@ -1032,7 +1131,7 @@ class GISCOService(OSMService):
             fmt = 'shp' if fmt=='shx' else fmt 
             fmt += '.' + settings.GISCO_PATTERNS['bulk']['compress']
             url = '{a}://{b}/{c}/{d}/{e}{f}-{g}.{h}'.format                           \
-                (a=protocol, b=self.cache_url, c=theme, d=domain,
+                (a=cache_protocol, b=cache_url, c=theme, d=domain,
                  e=basename, f=year, g=scale.lower(), h=fmt)
         elif source == 'INFO':
             domain = ''
@@ -1042,7 +1141,7 @@ class GISCOService(OSMService):
                 fmt = settings.GISCO_PATTERNS['nuts']['fmt']
             basename = settings.GISCO_PATTERNS['nuts']['info']
             url = '{a}://{b}/{c}/{d}.{e}'.format                                     \
-                (a=protocol, b=self.cache_url, c=theme, 
+                (a=cache_protocol, b=cache_url, c=theme, 
                  d=basename.format(year=year), e=fmt)
         elif source == 'NUTS': # unit == 'ALL'
             domain = {v:k for k,v in settings.GISCO_FORMATS.items()}[fmt]
@@ -1053,7 +1152,7 @@ class GISCOService(OSMService):
             scale = '' if vec == 'LB' else '_' + str(scale)
             level = '' if level == 'ALL' else '_LEVL_' + str(level)
             url = '{a}://{b}/{c}/{d}/{e}{f}{g}_{h}_{i}{j}.{k}'.format       \
-                (a=protocol, b=self.cache_url, c=theme, d=domain,
+                (a=cache_protocol, b=cache_url, c=theme, d=domain,
                  e=basename, f=vec.upper(), g=scale.upper(), h=year, i=proj, j=level,
                  k=fmt)
             # example: http://ec.europa.eu/eurostat/cache/GISCO/distribution/v2/nuts/topojson/NUTS_BN_01M_2016_3035_LEVL_3.json
@@ -1081,7 +1180,7 @@ class GISCOService(OSMService):
                     happyWarning('only GEOJSON is supported with single NUTS units distribution - %s argument ignored' % _Decorator.KW_IFORMAT.upper())
                 fmt = 'geojson'
             url = '{a}://{b}/{c}/{d}/{e}-{f}-{g}{h}-{i}.{j}'.format        \
-                (a=protocol, b=self.cache_url, c=theme, d=domain,
+                (a=cache_protocol, b=cache_url, c=theme, d=domain,
                  e=source, f=vec.lower(), g=scale, h=proj, i=year, 
                  j=fmt)
             # example: http://ec.europa.eu/eurostat/cache/GISCO/distribution/v2/nuts/distribution/AT-region-01m-3035-2016.geojson
@@ -1148,6 +1247,7 @@ class GISCOService(OSMService):
             vec = settings.GISCO_VECTORS[vec]
         theme = settings.GISCO_PATTERNS['country']['theme']
         protocol = settings.PROTOCOL # 'https'
+        cache_protocol, cache_url = self.split_domain(self.cache_url, protocol)
         if source == 'NUTS2JSON':
             # the files can be retrieved on-the-fly from the base URL 
             #       https://raw.githubusercontent.com/eurostat/Nuts2json/gh-pages/ 
@@ -1167,14 +1267,14 @@ class GISCOService(OSMService):
             fmt = 'shp' if fmt=='shx' else fmt 
             fmt += '.' + settings.GISCO_PATTERNS['bulk']['compress']
             url = '{a}://{b}/{c}/{d}/{e}{f}-{g}.{h}'.format                 \
-                (a=protocol, b=self.cache_url, c=theme, d=domain,
+                (a=cache_protocol, b=cache_url, c=theme, d=domain,
                  e=basename, f=year, g=scale.lower(), h=fmt)
         elif source == 'INFO':
             domain = ''
             fmt = settings.GISCO_PATTERNS['country']['fmt']
             basename = settings.GISCO_PATTERNS['country']['info']
             url = '{a}://{b}/{c}/{d}.{e}'.format                            \
-                (a=protocol, b=self.cache_url, c=theme,
+                (a=cache_protocol, b=cache_url, c=theme,
                  d=basename.format(year=year), e=fmt)
         else:
             domain = settings.GISCO_PATTERNS['country']['domain']
@@ -1191,7 +1291,7 @@ class GISCOService(OSMService):
                     scale = ''
             vecscale = vec if vec=='label' else 'region-%s' % scale.lower()            
             url = '{a}://{b}/{c}/{d}/{e}-{f}-{g}-{h}.{i}'.format        \
-                (a=protocol, b=self.cache_url, c=theme, d=domain,
+                (a=cache_protocol, b=cache_url, c=theme, d=domain,
                  e=source, f=vecscale, g=proj, h=year, i=fmt)             
         return url            
     
@@ -1291,7 +1391,7 @@ class GISCOService(OSMService):
         else:
             if all([o in set('xyz') for o in order]):
                 order = '/'.join(['{%s}' % o for o in order])
-        tile = '%s://%s/%s/%s%s' % (settings.PROTOCOL, self.map_url, 
+        tile = '%s://%s/%s/%s%s' % (*self.split_domain(self.map_url), 
                                     bckgrd, proj, order)
         return tile, attr            
 
@@ -1563,14 +1663,16 @@ class GISCOService(OSMService):
     #/************************************************************************/
     def _data_response(self, data, dimensions, **kwargs):
         # generic version of methods :meth:`~GISCOService.country_response` and
-        # :meth:`~GISCOService.nuts_response`.
+        # :meth:`~GISCOService.nuts_response`; when _dry_run_ is set, the list of
+        # URLs is returned and nothing is downloaded
+        dry_run = kwargs.pop(_Decorator.KW_DRY_RUN, False)
         __del_source = True
         source = dimensions.get('SOURCE')
         if len(source) == 1: source = source[0]
         dic = _NestedDict([(getattr(_Decorator,'KW_' + k), v) for k,v in dimensions.items() \
                                if __del_source is False or source not in ('NUTS2JSON','BULK','INFO') or k!='SOURCE'],
                            **{_Decorator.KW_ORDER: True}) # [getattr(_Decorator,'KW_' + k) for k in dimensions.keys()]
-        dim = {}
+        dim, urls = {}, []
         kwargs.update({_Decorator.KW_OFORMAT: 'response'})
         for prod in itertools.product(*list(dimensions.values())):
             dim.update(dict(zip([getattr(_Decorator,'KW_' + attr) for attr in dimensions.keys()], prod)))
@@ -1580,6 +1682,9 @@ class GISCOService(OSMService):
                 raise happyError('argument DATA not recognised - must be ''nuts'' or ''country''')
             else:
                 url = build_url(**dim)
+            if dry_run is True:
+                urls.append(url)
+                continue
             try:
                 response = self.read_url(url, **kwargs) 
             except happyError as e:
@@ -1591,7 +1696,67 @@ class GISCOService(OSMService):
                     dim.pop(_Decorator.KW_SOURCE)
                 dic.xupdate(response, **dim)
                 response = None
-        return dic 
+        return urls if dry_run is True else dic 
+
+    #/************************************************************************/
+    def prewarm(self, data='NUTS', **kwargs):
+        """Download into the cache all NUTS or country vector files available 
+        through |GISCO| Rest API for given dimensions, *e.g.* during the deployment
+        of an application rather than in the path of its first requests.
+            
+            >>> report = serv.prewarm(data='NUTS', **kwargs)
+            
+        Arguments
+        ---------
+        data : str
+            either :literal:`'NUTS'` or :literal:`'country'`; default: :literal:`'NUTS'`.
+            
+        Keyword arguments
+        -----------------
+        workers, rps, manifest, progress, cache_store, expire_after, _force_download_ :
+            see :meth:`base._Service.prefetch`.
+        kwargs :
+            dimensions of the datasets, *e.g.* :literal:`source, unit, year, proj, 
+            scale, vector, level, ifmt`, possibly as lists; they are expanded in 
+            the very same way as :meth:`~GISCOService.nuts_response` (*resp.* 
+            :meth:`~GISCOService.country_response`) does, so that later calls of
+            these methods with the same arguments are served from the cache.
+            
+        Returns
+        -------
+        report : dict
+            see :meth:`base._Service.prefetch`.
+            
+        Example
+        -------
+        Cache all NUTS regions at all levels for two years and two scales, resuming
+        a former (interrupted) run if any:
+            
+            >>> serv = services.GISCOService(workers=8)
+            >>> serv.prewarm(year=[2013,2016], scale=['20m','60m'], level=[0,1,2,3],
+                             manifest='prewarm.jsonl')
+                {'total': 16, 'downloaded': 16, 'skipped': 0, 'failed': {}}
+            
+        See also
+        --------
+        :meth:`~GISCOService.nuts_response`, :meth:`~GISCOService.country_response`,
+        :meth:`base._Service.prefetch`.
+        """
+        try:
+            assert happyType.isstring(data) and data.upper() in ('NUTS', 'COUNTRY')
+        except:
+            raise happyError('argument DATA not recognised - must be NUTS or COUNTRY')
+        options = {kw: kwargs.pop(kw) for kw in (_Decorator.KW_WORKERS, _Decorator.KW_RPS, _Decorator.KW_MANIFEST, 
+                                                 _Decorator.KW_PROGRESS, _Decorator.KW_CACHE, _Decorator.KW_EXPIRE, 
+                                                 _Decorator.KW_FORCE) if kw in kwargs}
+        kwargs.update({_Decorator.KW_DRY_RUN: True})
+        try:
+            url = getattr(self, data.lower() + '_response')(**kwargs)
+        except happyError as e:
+            raise happyError(errtype=e)
+        except:
+            raise happyError('error expanding %s dimensions' % data.upper())
+        return self.prefetch(url, **options)
 
     #/************************************************************************/
     def _data_geometry(self, data, **kwargs):
@@ -2123,7 +2288,7 @@ class GISCOService(OSMService):
                 raise happyError('error zip NUTS file reading')
         else:
             try:
-                data = self.read_response(resp, **{_Decorator.KW_OFORMAT: 'jsontext'})
+                data = self.read_response(resp, **{_Decorator.KW_OFORMAT: 'json'})
             except happyError as e:
                 raise happyError(errtype=e)
             except:
@@ -2410,7 +2575,7 @@ class GISCOService(OSMService):
                 data = pd.concat(data[data['NUTS_ID'].apply(lambda x: sum(c.isdigit() for c in x)==l)] for l in level)
         else: # if info == 'UNITS:
             try:
-                data = self.read_response(resp, **{_Decorator.KW_OFORMAT: 'jsontext'})
+                data = self.read_response(resp, **{_Decorator.KW_OFORMAT: 'json'})
             except happyError as e:
                 raise happyError(errtype=e)
             except:
@@ -2472,6 +2637,7 @@ class GISCOService(OSMService):
                 _Decorator.KW_ATTR:     attr if attr in (None,'') or len(attr)>1 else attr[0]}
         
         #/************************************************************************/
+    @_Memoized(copy=True)
     def nutsid2name(self, **kwargs):
         """
             
@@ -2522,6 +2688,13 @@ class GISCOService(OSMService):
             >>> serv.nutsid2name(id=['FR1', 'FR10', 'FR'])
                 ['ÎLE DE FRANCE', 'Île de France', 'FRANCE']
         
+        Note
+        ----
+        Results are memoized (see :class:`base._Memoized`), with the :data:`info` 
+        argument, when passed explicitly, part of the key; calls passing an 
+        :data:`info` table that cannot be hashed (*e.g.*, a :class:`pandas.DataFrame`)
+        bypass the cache.
+        
         See also
         --------
         :meth:`~GISCOService.nuts_info`.
@@ -2896,7 +3069,7 @@ class GISCOService(OSMService):
             raise happyError('wrong format/value for input geometry')
         if happyType.isstring(geom):
             try:
-                geom = json.loads(geom) 
+                geom = _JSONBackend.loads(geom) 
             except:
                 raise happyError('impossible to retrieve dictionary structure from input string')
         dimensions = collections.OrderedDict(zip([getattr(_Decorator, 'KW_' + k) for k in settings.GISCO_DATA_DIMENSIONS],
@@ -3037,6 +3210,7 @@ class GISCOService(OSMService):
     #    for g in super(GISCOService,self)._place2coord(place, **kwargs):
     #        yield g
     #/************************************************************************/
+    @_Memoized(copy=True)
     @_Decorator.parse_place
     def place2coord(self, place, **kwargs): # specific use
         """Retrieve the geographic coordinates of a given place provided by its 
@@ -3081,6 +3255,9 @@ class GISCOService(OSMService):
         Note
         ----
         This method simply overrides the method :meth:`OSMService.place2coord`.
+        Results are memoized (see :class:`base._Memoized`): the same query run 
+        twice within :data:`settings.DEF_MEMOIZE_TTL` seconds does not hit the 
+        service again.
            
         See also
         --------
@@ -3197,6 +3374,7 @@ class GISCOService(OSMService):
         return super(GISCOService,self).coord2geom(coord=coord, **kwargs)
       
     #/************************************************************************/
+    @_Memoized(copy=True)
     @_Decorator.parse_coordinate
     def coord2place(self, coord, **kwargs): # specific use
         """Retrieve the (topo)name of a given location provided by its geographic 
@@ -3252,7 +3430,7 @@ class GISCOService(OSMService):
         ----
         This method overrides :meth:`OSMService.coord2place` by further providing 
         the :literal:`features` key that will be extracted from the output geometry 
-        dictionary(ies).
+        dictionary(ies). Results are memoized (see :class:`base._Memoized`).
         
         See also
         --------
@@ -3273,25 +3451,44 @@ class GISCOService(OSMService):
             coord = [list(c) for c in coord]
         fmt = kwargs.pop('format','')
         key = kwargs.pop('key',None)
+        batch = {_Decorator.KW_WORKERS: kwargs.pop(_Decorator.KW_WORKERS, None),
+                 _Decorator.KW_RPS: kwargs.pop(_Decorator.KW_RPS, None)}
         if fmt is not None:
             kwargs.update({'f':fmt or 'JSON'})
         kwargs.update({#'year': kwargs.pop('year',2013), 
                        # 'proj': kwargs.pop('proj',4326),
                        'geometry': kwargs.pop('geometry','N')
                        })
+        # use the local resolver whenever it supports the query
+        resolver = self.resolver
+        if resolver is not None                                                 \
+                and (kwargs.get(_Decorator.KW_YEAR) not in (None, resolver.year)   \
+                     or kwargs.get(_Decorator.KW_PROJECTION) not in (None, resolver.proj)):
+            happyVerbose('local NUTS resolver ignored - year/projection not supported')
+            resolver = None
+        if resolver is None:
+            url = []
+            for i in range(len(coord)):
+                kwargs.update({'x': coord[i][1], 'y': coord[i][0]})
+                try:
+                    url.append(self.url_findnuts(**kwargs))
+                except:
+                    raise happyError('error findnuts URL formatting')
+            # requests are issued concurrently, results come in input order; 
+            # lookups with no result are remembered
+            batch.update({_Decorator.KW_OFORMAT: 'JSON'})
+            response = self.read_lookups(url, key=key, **batch)
         for i in range(len(coord)):
-            kwargs.update({'x': coord[i][1], 'y': coord[i][0]})
-            try:
-                url = self.url_findnuts(**kwargs)
-            except:
-                raise happyError('error findnuts URL formatting')
-            try:
-                data = self.read_url(url, **{_Decorator.KW_OFORMAT: 'JSON'})
-                assert data not in ({},None)
-            except happyError as e:
-                raise happyError(errtype=e)
-            except:
-                happyError('NUTS for location %s not loaded' % coord[i])
+            if resolver is not None:
+                data = resolver.findnuts(coord[i])
+            else:
+                try:
+                    data = next(response)
+                    assert data not in ({},None)
+                except happyError as e:
+                    raise happyError(errtype=e)
+                except:
+                    raise happyError('NUTS for location %s not loaded' % coord[i])
             try:
                 assert key is not None
             except AssertionError:
@@ -3334,6 +3531,11 @@ class GISCOService(OSMService):
         level : int
             integer in [0,3] defining the classification level of the NUTS geometry 
             to return, if not all (default when :data:`level` is :data:`None`).
+        workers, rps :
+            maximum number of concurrent requests and of requests per second used
+            when a batch of geolocations is processed; see :meth:`base._Service.read_urls`.
+            Geolocations with no NUTS are not looked up again before :data:`negative_ttl`
+            (see :meth:`base._Service.read_lookups`).
         
         Returns
         -------
@@ -3392,6 +3594,12 @@ class GISCOService(OSMService):
                  'layerId': 2, 'layerName': 'NUTS_2013',
                  'value': 'ITI4'}        
         
+        Note
+        ----
+        When a local :data:`resolver` is set (see :class:`tools.NUTSResolver`), 
+        the NUTS regions are identified offline, with no request sent to the online 
+        service.
+        
         See also
         --------
         :meth:`~GISCOService.place2geom`, :meth:`~GISCOService.place2coord`, 
@@ -3590,6 +3798,41 @@ class GISCOService(OSMService):
             waypoints = data.get(_Decorator.parse_route.KW_WAYPOITNS)
         return routes[0], waypoints
 
+    #/************************************************************************/
+    async def acoord2nuts(self, *args, **kwargs):
+        """Asynchronous counterpart of :meth:`coord2nuts`, run on the caller's 
+        event loop.
+        
+            >>> nuts = await serv.acoord2nuts(coord, **kwargs)
+            
+        Example
+        -------
+        Several geolocations can be identified concurrently from within a running 
+        event loop (*e.g.*, an |aiohttp| server or a notebook):
+            
+            >>> async with services.GISCOService() as serv:
+                    nuts = await asyncio.gather(serv.acoord2nuts([41.8933203,12.4829321], level=2),
+                                                serv.acoord2nuts([52.5170365,13.3888599], level=2))
+            
+        See also
+        --------
+        :meth:`~GISCOService.coord2nuts`, :meth:`base._Service.aget_response`.
+        """
+        return await self._arun(self.coord2nuts, *args, **kwargs)
+
+    #/************************************************************************/
+    async def acoord2route(self, *args, **kwargs):
+        """Asynchronous counterpart of :meth:`coord2route`, run on the caller's 
+        event loop.
+        
+            >>> route, waypoints = await serv.acoord2route(coord, **kwargs)
+            
+        See also
+        --------
+        :meth:`~GISCOService.coord2route`, :meth:`base._Service.aget_response`.
+        """
+        return await self._arun(self.coord2route, *args, **kwargs)
+
     #/************************************************************************/
     @_Decorator.parse_place
     def place2route(self, place, **kwargs):
@@ -3684,14 +3927,22 @@ class GISCOService(OSMService):
             >>> [2664895.0682282075, 1953237.726974148]
             
             
+        Whole lists of geolocations are transformed at once by the local transformer
+        of the service (see :class:`tools.CRSTransform`), *e.g.* a million points:
+            
+            >>> serv.coordconvert(coord=coords, iproj='WGS84', oproj='LAEA')
+            
         Notes
         -----
-        See also this service: https://epsg.io/transform.
+        * When no :data:`transformer` is set, or when it does not support the 
+          projections, the |GISCO| |ArcGIS| projection service is run instead, with 
+          (at most) :data:`settings.DEF_CONVERSION_BATCH` geolocations per query.
+        * See also this service: https://epsg.io/transform.
             
         See also
         --------
         :meth:`features.Location.convert`, :meth:`~GISCOService.url_conversion`, 
-        :meth:`base._Service.read_url`.
+        :meth:`tools.CRSTransform.transform`, :meth:`base._Service.read_url`.
         """
         icrs, ocrs = kwargs.pop('iproj', None), kwargs.pop('oproj', None)
         try:
@@ -3707,28 +3958,42 @@ class GISCOService(OSMService):
             ocrs = _Decorator.parse_projection(func)(**{_Decorator.KW_PROJECTION: ocrs})
         except:
             raise happyError('wrong OPROJ projection argument(s)')
-        geometries = ['%s,%s' % (c[0],c[1]) for c in coord]        
+        # use the local transformer whenever it supports the projections
+        transformer = self.transformer
+        if transformer is not None and callable(getattr(transformer, 'supports', None)) \
+                and not transformer.supports(icrs, ocrs):
+            happyVerbose('local transformer ignored - projections not supported')
+            transformer = None
+        if transformer is not None:
+            try:
+                coord_proj = transformer.transform(coord, iproj=icrs, oproj=ocrs).tolist()
+            except happyError as e:
+                raise happyError(errtype=e)
+            return coord_proj if len(coord_proj)>1 else coord_proj[0]
         _kwargs = {'inSR':          icrs,
                    'outSR':         ocrs,
                    'f':             'json'}
         coord_proj = []
-        # hum, we should set some asynchronous process here...
-        for g in geometries:
-            _kwargs.update({'geometries':    g})            
+        # the service accepts a list of points, let us send them by batches
+        for i in range(0, len(coord), settings.DEF_CONVERSION_BATCH):
+            geometries = ','.join(['%s,%s' % (c[0],c[1]) for c in coord[i:i+settings.DEF_CONVERSION_BATCH]])
+            _kwargs.update({'geometries':    geometries})            
             try:
                 url = self.url_conversion(**_kwargs)
             except:
-                raise happyError('error tranform URL formatting for %s coordinates' % g)
+                raise happyError('error tranform URL formatting for %s coordinates' % geometries)
             try:
                 response = self.read_url(url, **{_Decorator.KW_OFORMAT: 'json'}) 
             except happyError as e:
                 raise happyError(errtype=e)
-            c = [[g['x'],g['y']] for g in response['geometries']]
+            try:
+                coord_proj.extend([[g['x'],g['y']] for g in response['geometries']])
+            except:
+                raise happyError('unexpected response of the transform service for %s coordinates' % geometries)
             # example
             # input is: '-9.1630,38.7775'
             # url is: 'https://webgate.ec.europa.eu/estat/inspireec/gis/arcgis/rest/services/Utilities/Geometry/GeometryServer/project?inSR=4326&outSR=3035&geometries=-9.1630,38.7775&f=json'
             # output is: {"geometries":[{"x":2664895.0682282075,"y":1953237.7269741481}]}
-            coord_proj.append(c[0] if len(c)==1 else c)
         return coord_proj if len(coord_proj)>1 else coord_proj[0]
         
     
@@ -3952,6 +4217,13 @@ class APIService(_Service):
     key/token/username : str
         key (depending on the :data:`coder` actually chosen) used to connect 
         to the geolocation API.
+    negative_ttl : float
+        time (in seconds) during which places (*resp.* geolocations) that could
+        not be geolocated (*resp.* named) are not looked up again; default to 
+        :data:`settings.DEF_NEGATIVE_TTL`; set to 0 to disable negative caching.
+    cache_store : str
+        directory where unresolved lookups are recorded, so that they are remembered
+        across runs; default: they are recorded in memory only.
  
     Attributes
     ----------     
@@ -3976,6 +4248,18 @@ class APIService(_Service):
             assert API_SERVICE is not False
         except:
             raise happyError('external API service not available')
+        # unresolved lookups: note that no web-session is used by this service
+        negative_ttl = kwargs.pop(_Decorator.KW_NEGATIVE, settings.DEF_NEGATIVE_TTL)
+        cache_store = kwargs.pop(_Decorator.KW_CACHE, None)
+        if negative_ttl in (None, 0):
+            self.__negative = None
+        else:
+            if happyType.isstring(cache_store):
+                os.makedirs(cache_store, exist_ok=True)
+                cache_store = os.path.join(cache_store, _DiskCache.INDEX)
+            else:
+                cache_store = None
+            self.__negative = _NegativeCache(cache_store, ttl=negative_ttl)
         # read the arguments              
         self.__coder = kwargs.pop('coder', settings.CODER_GOOGLE_MAPS)
         if self.__coder not in self.CODER.keys():
@@ -4013,6 +4297,19 @@ class APIService(_Service):
         """
         return self.__coder
             
+    @property
+    def negative_cache(self):
+        """Store (:data:`getter`) of the unresolved lookups of a :class:`APIService`
+        instance (see :class:`base._NegativeCache`), or :data:`None` when negative
+        caching is disabled.
+        """
+        return self.__negative
+            
+    #/************************************************************************/
+    def __lookup(self, method, query):
+        # identify a lookup run by the geocoder, in the negative cache
+        return '%s:%s?q=%s' % (self.coder.__class__.__name__, method, query)
+            
     @property
     def coder_key(self):
         """Key property (:data:`getter`/:data:`setter`) of a :class:`APIService` 
@@ -4056,8 +4353,15 @@ class APIService(_Service):
         """
         coord = [] 
         for p in place:   
+            lookup = self.__lookup('geocode', p)
+            if self.negative_cache is not None and self.negative_cache.get(lookup) is not None:
+                coord.append(None)
+                happyVerbose('\ngeolocation of %s known as unresolved' % p)
+                continue
             try:
                 res = self.coder.geocode(p)
+                if res in ([], None) and self.negative_cache is not None:
+                    self.negative_cache.put(lookup)
                 try:
                     lat, lon = res.latitude, res.longitude
                 except:
@@ -4106,8 +4410,15 @@ class APIService(_Service):
         """
         place = [] 
         for i in range(len(coord)):   
+            lookup = self.__lookup('reverse', '%s,%s' % tuple(coord[i][:2]))
+            if self.negative_cache is not None and self.negative_cache.get(lookup) is not None:
+                place.append(None)
+                happyVerbose('\nplace name for geolocation %s known as unresolved' % coord[i])
+                continue
             try:
                 p = self.coder.reverse(coord[i][0],coord[i][1])
+                if p in ('',None) and self.negative_cache is not None:
+                    self.negative_cache.put(lookup)
                 assert p not in ('',None)
                 place.append(p)
             except:
@@ -495,6 +495,161 @@ EU_AGGREGATES       = { 'EU28':             ['BE', 'BG', 'CZ', 'DK', 'DE', 'EE',
 see `this page <https://ec.europa.eu/eurostat/statistics-explained/index.php/Tutorial:Country_codes_and_protocol_order>`_.
 """
 
+DEF_POOL_LIMIT      = 100
+"""Default total number of simultaneous connections kept open by the connection 
+pool of a web-service (see :class:`base._Service`).
+"""
+DEF_POOL_PER_HOST   = 10
+"""Default number of simultaneous connections kept open to the same host by the 
+connection pool of a web-service (see :class:`base._Service`).
+"""
+
+DEF_BATCH_WORKERS   = 1
+"""Default maximum number of requests run concurrently when a web-service processes
+a batch of places/geolocations (see :meth:`base._Service.read_urls`); the default
+value keeps requests sequential.
+"""
+DEF_BATCH_RPS       = None
+"""Default maximum number of requests per second issued when a web-service processes 
+a batch of places/geolocations (see :meth:`base._Service.read_urls`); set to 
+:data:`None` for no throttling. Note that the |Nominatim| usage policy of |OSM|
+requires an absolute maximum of 1 request per second.
+"""
+
+DEF_RATE_LIMITS     = {'nominatim.openstreetmap.org': 1.}
+"""Default maximum number of requests per second issued to given hosts by a 
+web-service, whatever the method used (see :class:`base._RateLimiter`); requests
+to other hosts are not rate limited, but their concurrency still adapts to the
+responses of the servers. The limit for |Nominatim| follows the usage policy of 
+|OSM|.
+"""
+
+DEF_RATE_BURST      = 1
+"""Number of requests that can be issued at once to a rate limited host (*i.e.* 
+capacity of its token bucket, see :class:`base._RateLimiter`).
+"""
+
+DEF_RETRIES         = 3
+"""Default maximum number of times a request is retried by a web-service after
+it failed to connect or was throttled by the server (see :data:`DEF_RETRY_STATUS`).
+"""
+
+DEF_RETRY_STATUS    = (429, 502, 503, 504)
+"""HTTP status of the responses upon which a request is retried.
+"""
+
+DEF_BACKOFF         = (0.5, 60) # in seconds
+"""Base and maximum delays (in seconds) of the exponential backoff between the 
+retries of a request: the :literal:`n`-th retry is delayed by a random time 
+between 0 and :literal:`min(base * 2**n, max)`, unless the server states how 
+long to wait in a :literal:`Retry-After` header.
+"""
+
+DEF_AIMD            = (0.5, 3.)
+"""Parameters of the adaptive (AIMD) concurrency of the requests issued to a 
+host (see :class:`base._RateLimiter`): the factor applied to the number of 
+concurrent requests when the server throttles (429/503 status) or does not 
+respond, and the factor of the lowest observed latency above which a response
+is considered as a sign of congestion.
+"""
+
+DEF_CACHE_SIZE      = 2 * 1024**3 # in bytes
+"""Default maximum total size (in bytes) of the responses stored in the disk cache 
+of a web-service (see :class:`base._DiskCache`) before the least recently used 
+ones are evicted; set to :data:`None` for an unbounded cache.
+"""
+
+DEF_CHUNK_SIZE      = 1024**2 # in bytes
+"""Default size (in bytes) of the chunks in which responses are streamed to the 
+disk cache, so that large (*e.g.*, bulk) files are never fully loaded in memory.
+"""
+
+DEF_CACHE_COMPRESS  = ('json', 'javascript', 'xml', 'csv', 'text/')
+"""Fragments of the content types of the responses that are compressed when stored
+in the disk cache (see :class:`base._DiskCache`); binary (*e.g.*, zipped) responses
+are stored as is.
+"""
+
+DEF_CACHE_CODECS    = ('zstd', 'gzip')
+"""Codecs used to compress the responses stored in the disk cache, in order of 
+preference: the first available one is used; set to an empty tuple to store all
+responses uncompressed.
+"""
+
+DEF_CACHE_VSI_FORMATS = ('.geojson', '.topojson', '.json', '.gml', '.kml', '.csv')
+"""Extensions of the files read directly from the disk cache by GDAL (see 
+:meth:`features.NUTS.file`), which are compressed with :literal:`gzip` only, if
+at all, so as to remain readable through GDAL virtual file system (:literal:`/vsigzip/`).
+"""
+
+DEF_CACHE_PRECISION = 7 # number of decimals
+"""Number of decimals to which the numeric (floating point) parameters of the 
+queries, *e.g.* coordinates, are rounded when computing the key of a URL in the
+disk cache (see :meth:`base._DiskCache.canonical`); 7 decimals of a degree make
+about 1 cm; set to :data:`None` to keep the parameters as is.
+"""
+
+DEF_CACHE_SCHEMES   = ('https', 'http')
+"""Web protocols considered as equivalent when computing the key of a URL in the
+disk cache, *i.e.* the same resource served through any of them is cached once.
+"""
+
+DEF_MEMORY_SIZE     = None # in bytes
+"""Default maximum total size (in bytes) of the responses kept in memory, in front 
+of the disk cache, by a web-service (see :class:`base._MemoryCache`); default to 
+:data:`None`, *i.e.* no memory cache is used.
+"""
+
+DEF_MEMORY_TTL      = 300 # in seconds
+"""Default time-to-live (in seconds) of the responses kept in memory by a web-service
+(see :class:`base._MemoryCache`); set to :data:`None` for entries to expire with 
+the disk cache only.
+"""
+
+DEF_CACHE_FAMILIES  = (('findnuts',       r'find-nuts'),
+                       ('routing',        r'/route/'),
+                       ('tiles',          r'/tiles/'),
+                       ('bulk',           r'/download/|\.zip$'),
+                       ('distribution',   r'/distribution/'),
+                       ('reverse',        r'/reverse(\.php)?/?$'),
+                       ('geocode',        r'/(api|search)(\.php)?/?$'))
+"""Families of endpoints of the web-services, defined by a regular expression 
+matched against the path of the URLs, and used to break down the statistics of
+the caches (see :class:`base._CacheStats`); the first matching family is used,
+URLs matching none belong to the :literal:`'other'` family.
+"""
+
+DEF_NEGATIVE_TTL    = 24 * 3600 # in seconds
+"""Default time (in seconds) during which a lookup (*e.g.*, geocoding, NUTS 
+identification) that returned no result is remembered, and not run again, by a
+web-service (see :class:`base._NegativeCache`); set to :data:`None` or 0 to 
+disable negative caching.
+"""
+
+DEF_NEGATIVE_STATUS = (404, 410)
+"""HTTP error status of the responses to lookups that are remembered as unresolved,
+likewise empty results, by the negative cache (see :class:`base._NegativeCache`).
+"""
+
+DEF_JSON_BACKENDS   = ('orjson', 'ujson', 'json')
+"""JSON decoders used to parse the responses of the web-services (see :class:`base._JSONBackend`),
+in order of preference: the first available one is used.
+"""
+
+DEF_MEMOIZE_MAXSIZE = 1024
+"""Default maximum number of entries kept in memory by the memoization layer 
+(see :class:`base._Memoized`) before the least recently used ones are evicted.
+"""
+DEF_MEMOIZE_TTL     = 3600 # in seconds
+"""Default time-to-live (in seconds) of the entries kept in memory by the memoization 
+layer (see :class:`base._Memoized`); set to :data:`None` for entries never to expire.
+"""
+
+DEF_CONVERSION_BATCH = 100
+"""Default maximum number of geolocations sent at once to the |GISCO| |ArcGIS| projection 
+service when no local transformer is available (see :meth:`services.GISCOService.coordconvert`).
+"""
+
 POLYLINE            = False
 """
 Boolean flag set to import the package :mod:`polylines` that will enable you to 
@@ -0,0 +1,701 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. _mod_stubs
+
+.. Links
+
+.. _Eurostat: http://ec.europa.eu/eurostat/web/main
+.. |Eurostat| replace:: `Eurostat <Eurostat_>`_
+.. _GISCO: http://ec.europa.eu/eurostat/web/gisco
+.. |GISCO| replace:: `GISCO <GISCO_>`_
+.. _OSM: https://www.openstreetmap.org
+.. |OSM| replace:: `OpenStreetMap <OSM_>`_
+.. _Nominatim: https://wiki.openstreetmap.org/wiki/Nominatim
+.. |Nominatim| replace:: `Nominatim <Nominatim_>`_
+.. _ArcGIS: https://developers.arcgis.com/rest/
+.. |ArcGIS| replace:: `ArcGIS <ArcGIS_>`_
+
+Local stand-in for the web-services of |GISCO|, |OSM| (|Nominatim|) and |ArcGIS|
+used for load testing, benchmarking and (offline) regression testing.
+
+**Description**
+
+The server mimics the endpoints queried by :class:`services.GISCOService` and
+:class:`services.OSMService`, *i.e.* geocoding, reverse geocoding, NUTS identification,
+routing, coordinate conversion, distribution/bulk vector files and map tiles.
+Answers are built from small recorded fixtures (a few European capitals and the
+NUTS regions that contain them, whose geometries are simplified to bounding boxes)
+and have the same structure as those of the actual services. Latency, error rate
+and throttling can be set so as to exercise the concurrency, caching and retry
+behaviour of the services.
+
+**Dependencies**
+
+*require*:      :mod:`io`, :mod:`re`, :mod:`math`, :mod:`json`, :mod:`time`, :mod:`random`,
+                :mod:`hashlib`, :mod:`struct`, :mod:`zlib`, :mod:`zipfile`, :mod:`threading`, :mod:`collections`,
+                :mod:`urllib`, :mod:`http.server`
+
+*call*:         :mod:`settings`
+
+**Contents**
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Fri Oct 16 10:12:31 2026
+
+__all__         = ['StubServer']
+
+# generic import
+import io, re
+import math
+import json
+import time, random
+import hashlib
+import struct, zlib
+import zipfile
+import threading
+import collections
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# local imports
+from happygisco import happyVerbose, happyError, happyType
+from happygisco import settings
+from happygisco.tools import CRSTransform
+
+
+#%%
+#==============================================================================
+# FIXTURES
+#==============================================================================
+
+FIXTURES        = {'places':
+                        [{'name': 'Berlin', 'country': 'Germany', 'country_code': 'de', 'state': 'Berlin',
+                          'alias': ['Deutschland'], 'postcode': '10117', 'lat': 52.5170365, 'lon': 13.3888599,
+                          'extent': [13.0883476, 52.6755087, 13.7611609, 52.3382448],
+                          'osm_id': 240109189, 'osm_type': 'N', 'osm_key': 'place', 'osm_value': 'city'},
+                         {'name': 'Madrid', 'country': 'Spain', 'country_code': 'es', 'state': 'Community of Madrid',
+                          'alias': ['España', 'Espana'], 'postcode': '28001', 'lat': 40.4167047, 'lon': -3.7035825,
+                          'extent': [-3.8889539, 40.6437293, -3.5179163, 40.3119774],
+                          'osm_id': 5326784, 'osm_type': 'R', 'osm_key': 'place', 'osm_value': 'city'},
+                         {'name': 'Roma', 'country': 'Italy', 'country_code': 'it', 'state': 'Lazio',
+                          'alias': ['Rome', 'Italia'], 'postcode': '00186', 'lat': 41.8933203, 'lon': 12.4829321,
+                          'extent': [12.2344266, 42.1410026, 12.8557759, 41.6556417],
+                          'osm_id': 41485, 'osm_type': 'R', 'osm_key': 'place', 'osm_value': 'city'},
+                         {'name': 'Paris', 'country': 'France', 'country_code': 'fr', 'state': 'Ile-de-France',
+                          'alias': [], 'postcode': '75004', 'lat': 48.8566969, 'lon': 2.3514616,
+                          'extent': [2.224122, 48.902156, 2.4697602, 48.8155755],
+                          'osm_id': 7444, 'osm_type': 'R', 'osm_key': 'place', 'osm_value': 'city'},
+                         {'name': 'Vilnius', 'country': 'Lithuania', 'country_code': 'lt', 'state': 'Vilnius County',
+                          'alias': ['Lietuva'], 'postcode': '01100', 'lat': 54.6870458, 'lon': 25.2829111,
+                          'extent': [25.0245351, 54.8325574, 25.4814574, 54.567796],
+                          'osm_id': 1529146, 'osm_type': 'R', 'osm_key': 'place', 'osm_value': 'city'},
+                         {'name': 'Lisboa', 'country': 'Portugal', 'country_code': 'pt', 'state': 'Lisboa',
+                          'alias': ['Lisbon'], 'postcode': '1100-148', 'lat': 38.7077507, 'lon': -9.1365919,
+                          'extent': [-9.2298356, 38.7958538, -9.0863328, 38.6913994],
+                          'osm_id': 5400890, 'osm_type': 'R', 'osm_key': 'place', 'osm_value': 'city'}
+                         ],
+                   'nuts':
+                        [{'NUTS_ID': 'DE',    'NUTS_NAME': 'DEUTSCHLAND', 'bbox': [5.87, 47.27, 15.04, 55.06]},
+                         {'NUTS_ID': 'DE3',   'NUTS_NAME': 'BERLIN',      'bbox': [13.09, 52.34, 13.76, 52.68]},
+                         {'NUTS_ID': 'DE30',  'NUTS_NAME': 'Berlin',      'bbox': [13.09, 52.34, 13.76, 52.68]},
+                         {'NUTS_ID': 'DE300', 'NUTS_NAME': 'Berlin',      'bbox': [13.09, 52.34, 13.76, 52.68]},
+                         {'NUTS_ID': 'ES',    'NUTS_NAME': 'ESPAÑA',      'bbox': [-9.30, 35.95, 3.33, 43.80]},
+                         {'NUTS_ID': 'ES3',   'NUTS_NAME': 'COMUNIDAD DE MADRID', 'bbox': [-4.58, 39.88, -3.05, 41.17]},
+                         {'NUTS_ID': 'ES30',  'NUTS_NAME': 'Comunidad de Madrid', 'bbox': [-4.58, 39.88, -3.05, 41.17]},
+                         {'NUTS_ID': 'ES300', 'NUTS_NAME': 'Madrid',      'bbox': [-4.58, 39.88, -3.05, 41.17]},
+                         {'NUTS_ID': 'FR',    'NUTS_NAME': 'FRANCE',      'bbox': [-4.80, 42.33, 8.23, 51.09]},
+                         {'NUTS_ID': 'FR1',   'NUTS_NAME': 'ÎLE DE FRANCE', 'bbox': [1.45, 48.12, 3.56, 49.24]},
+                         {'NUTS_ID': 'FR10',  'NUTS_NAME': 'Île de France', 'bbox': [1.45, 48.12, 3.56, 49.24]},
+                         {'NUTS_ID': 'FR101', 'NUTS_NAME': 'Paris',       'bbox': [2.22, 48.81, 2.47, 48.91]},
+                         {'NUTS_ID': 'IT',    'NUTS_NAME': 'ITALIA',      'bbox': [6.63, 35.49, 18.52, 47.09]},
+                         {'NUTS_ID': 'ITI',   'NUTS_NAME': 'CENTRO (IT)', 'bbox': [9.69, 40.78, 14.03, 44.47]},
+                         {'NUTS_ID': 'ITI4',  'NUTS_NAME': 'Lazio',       'bbox': [11.45, 40.78, 14.03, 42.84]},
+                         {'NUTS_ID': 'ITI43', 'NUTS_NAME': 'Roma',        'bbox': [11.73, 41.45, 13.30, 42.29]},
+                         {'NUTS_ID': 'LT',    'NUTS_NAME': 'LIETUVA',     'bbox': [20.93, 53.89, 26.84, 56.45]},
+                         {'NUTS_ID': 'LT0',   'NUTS_NAME': 'LIETUVA',     'bbox': [20.93, 53.89, 26.84, 56.45]},
+                         {'NUTS_ID': 'LT01',  'NUTS_NAME': 'Sostinės regionas', 'bbox': [24.38, 54.13, 26.84, 55.43]},
+                         {'NUTS_ID': 'LT011', 'NUTS_NAME': 'Vilniaus apskritis', 'bbox': [24.38, 54.13, 26.84, 55.43]},
+                         {'NUTS_ID': 'PT',    'NUTS_NAME': 'PORTUGAL',    'bbox': [-9.53, 36.96, -6.19, 42.15]},
+                         {'NUTS_ID': 'PT1',   'NUTS_NAME': 'CONTINENTE',  'bbox': [-9.53, 36.96, -6.19, 42.15]},
+                         {'NUTS_ID': 'PT17',  'NUTS_NAME': 'Área Metropolitana de Lisboa', 'bbox': [-9.50, 38.41, -8.78, 39.06]},
+                         {'NUTS_ID': 'PT170', 'NUTS_NAME': 'Área Metropolitana de Lisboa', 'bbox': [-9.50, 38.41, -8.78, 39.06]}
+                         ]
+                   }
+"""Recorded fixtures the answers of :class:`StubServer` are built from:
+
+    * :literal:`places`: toponames and geocoordinates, as returned by the |GISCO|
+      and |Nominatim| geocoding services; a place is matched by a query when all
+      the words of the query appear in its name, country or aliases,
+    * :literal:`nuts`: NUTS regions (at all levels) containing the places above;
+      their geometries are simplified to the bounding boxes :literal:`bbox` (in
+      :literal:`EPSG:4326`, as :literal:`[xmin, ymin, xmax, ymax]`).
+"""
+
+STUB_ENDPOINTS  = collections.OrderedDict(
+                  [('findnuts',     r'^/gisco/nuts/find-nuts\.py$'),
+                   ('routing',      r'^/gisco/route/v1/(?P<profile>[\w-]+)/(?P<coordinates>[^/]+)$'),
+                   ('geocode',      r'^/(?:gisco/api|gisco/nominatim/search\.php|osm/search(?:\.php)?)$'),
+                   ('reverse',      r'^/(?:gisco/reverse|gisco/nominatim/reverse\.php|osm/reverse(?:\.php)?)$'),
+                   ('conversion',   r'^/arcgis/Utilities/Geometry/GeometryServer/project$'),
+                   ('bulk',         r'^/cache/(?P<theme>nuts|countries)/download/(?P<file>[^/]+)\.zip$'),
+                   ('distribution', r'^/cache/(?P<theme>nuts|countries)/(?:[^/]+/)*(?P<file>[^/]+\.(?:geo)?json)$'),
+                   ('tiles',        r'^/tiles/(?P<tile>.+)$')
+                   ])
+"""Endpoints served by :class:`StubServer`, with the regular expressions matching
+their paths; the domains of the services are mounted on the prefixes
+:literal:`/gisco` (*resp.* :literal:`/cache`, :literal:`/tiles`, :literal:`/arcgis`
+and :literal:`/osm`) of the server.
+"""
+
+def _png(width=1, height=1):
+    # transparent RGBA PNG image
+    chunk = lambda tag, data: struct.pack('>I', len(data)) + tag + data        \
+        + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    raw = b''.join([b'\x00' + b'\x00' * 4 * width for _ in range(height)])
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)) \
+        + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
+
+STUB_TILE       = _png(256, 256)
+"""Map tile returned by :class:`StubServer`: a transparent 256x256 PNG image.
+"""
+
+
+#%%
+#==============================================================================
+# CLASS StubServer
+#==============================================================================
+
+class StubServer(object):
+    """Local stand-in for the |GISCO|, |OSM| and |ArcGIS| web-services, so that
+    the services can be benchmarked and regression-tested offline.
+
+        >>> server = StubServer(host='127.0.0.1', port=0, **kwargs)
+
+    Keyword arguments
+    -----------------
+    host : str
+        address the server listens to; default: :literal:`'127.0.0.1'`.
+    port : int
+        port the server listens to; default: :literal:`0`, *i.e.* a free port is
+        picked when the server starts.
+    latency : float, dict
+        delay (in seconds) added to every answer, possibly as a dictionary indexed
+        by endpoint (see :data:`STUB_ENDPOINTS`); default: :literal:`0`.
+    jitter : float
+        upper bound of a random delay (in seconds) added to :data:`latency`;
+        default: :literal:`0`.
+    error_rate : float, dict
+        probability of answering with an error status, possibly as a dictionary
+        indexed by endpoint; default: :literal:`0`.
+    error_status : int, list[int]
+        status(es) returned when an error is simulated; default: :literal:`503`.
+    rate : float, dict
+        maximum number of requests per second accepted (per endpoint when a
+        dictionary is passed) before answering :literal:`429 Too Many Requests`
+        with a :literal:`Retry-After` header; default: :data:`None`, *i.e.* no
+        throttling.
+    burst : int
+        number of requests accepted at once when :data:`rate` is set; default:
+        :literal:`1`.
+    max_age : int
+        value of the :literal:`Cache-Control: max-age` header of the answers;
+        default: :data:`None`, *i.e.* no header. An :literal:`ETag` header is
+        always set, and conditional requests are answered with :literal:`304`.
+    seed : int
+        seed of the random generator used for the jitter and the errors; default:
+        :data:`None`.
+    fixtures : dict, str
+        fixtures (or path to a JSON file storing them) that update :data:`FIXTURES`.
+
+    Example
+    -------
+    Point a service to the server and query it as usual, *e.g.* with some latency
+    and a few transient errors:
+
+        >>> with StubServer(latency=0.05, error_rate=0.1, seed=0) as server:
+                serv = services.GISCOService(**server.domains(settings.CODER_GISCO))
+                serv.place2coord('Berlin, Germany', unique=True)
+                [52.5170365, 13.3888599]
+                server.hits
+                Counter({'geocode': 1})
+    """
+
+    #/************************************************************************/
+    def __init__(self, host='127.0.0.1', port=0, **kwargs):
+        self.host, self.port = host, port
+        self.latency = kwargs.pop('latency', 0.)
+        self.jitter = kwargs.pop('jitter', 0.)
+        self.error_rate = kwargs.pop('error_rate', 0.)
+        self.error_status = kwargs.pop('error_status', 503)
+        self.rate = kwargs.pop('rate', None)
+        self.burst = kwargs.pop('burst', 1)
+        self.max_age = kwargs.pop('max_age', None)
+        self.__random = random.Random(kwargs.pop('seed', None))
+        fixtures = kwargs.pop('fixtures', None)
+        if kwargs != {}:
+            raise happyError('keyword argument(s) %s not recognised' % ', '.join(kwargs.keys()))
+        self.fixtures = {k: list(v) for k, v in FIXTURES.items()}
+        if happyType.isstring(fixtures):
+            try:
+                with open(fixtures, 'r') as f:
+                    fixtures = json.load(f)
+            except (IOError, OSError, ValueError):
+                raise happyError('fixtures file %s not loaded' % fixtures)
+        if fixtures is not None:
+            self.fixtures.update(fixtures)
+        self.__lock = threading.Lock()
+        self.__buckets = {}
+        self.__httpd, self.__thread = None, None
+        self.hits, self.status = collections.Counter(), collections.Counter()
+
+    #/************************************************************************/
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    #/************************************************************************/
+    @property
+    def url(self):
+        """Base URL (:data:`getter`) of the server, once started.
+        """
+        return 'http://%s:%s' % (self.host, self.port)
+
+    #/************************************************************************/
+    def domains(self, coder=settings.CODER_GISCO):
+        """Keyword arguments pointing a service to the server.
+
+            >>> kwargs = server.domains(coder=settings.CODER_GISCO)
+
+        Arguments
+        ---------
+        coder : str
+            either :data:`settings.CODER_GISCO` or :data:`settings.CODER_OSM`.
+
+        Returns
+        -------
+        kwargs : dict
+            :literal:`rest_url, cache_url, map_url, arcgis` domains for a
+            :class:`services.GISCOService` instance, :literal:`domain` for an
+            :class:`services.OSMService` instance.
+        """
+        if coder == settings.CODER_GISCO:
+            return {'rest_url':     '%s/gisco' % self.url,
+                    'cache_url':    '%s/cache' % self.url,
+                    'map_url':      '%s/tiles' % self.url,
+                    'arcgis':       '%s/arcgis' % self.url}
+        elif coder == settings.CODER_OSM:
+            return {'domain':       '%s/osm' % self.url}
+        raise happyError('coder %s not supported' % coder)
+
+    #/************************************************************************/
+    def start(self):
+        """Start the server in a background thread.
+
+            >>> server.start()
+        """
+        if self.__httpd is not None:
+            return self
+        handler = type('_StubHandler', (_StubHandler,), {'stub': self})
+        try:
+            self.__httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            raise happyError('stub server not started on %s:%s' % (self.host, self.port), errtype=e)
+        self.__httpd.daemon_threads = True
+        self.port = self.__httpd.server_address[1]
+        self.__thread = threading.Thread(target=self.__httpd.serve_forever,
+                                         kwargs={'poll_interval': 0.1}, daemon=True)
+        self.__thread.start()
+        happyVerbose('stub server listening on %s' % self.url)
+        return self
+
+    #/************************************************************************/
+    def stop(self):
+        """Stop the server.
+
+            >>> server.stop()
+        """
+        if self.__httpd is None:
+            return
+        self.__httpd.shutdown()
+        self.__httpd.server_close()
+        self.__thread.join()
+        self.__httpd, self.__thread = None, None
+
+    #/************************************************************************/
+    def serve_forever(self):
+        """Run the server in the current thread until it is interrupted.
+
+            >>> server.serve_forever()
+        """
+        self.start()
+        try:
+            while self.__thread.is_alive():
+                self.__thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    #/************************************************************************/
+    def reset(self):
+        """Reset the counters of requests (:data:`hits`, per endpoint) and of
+        answers (:data:`status`, per status code), as well as the throttling state.
+
+            >>> server.reset()
+        """
+        with self.__lock:
+            self.hits.clear()
+            self.status.clear()
+            self.__buckets.clear()
+
+    #/************************************************************************/
+    @staticmethod
+    def _option(value, endpoint):
+        # value of an option possibly set per endpoint
+        return value.get(endpoint) if happyType.ismapping(value) else value
+
+    #/************************************************************************/
+    def _throttle(self, endpoint):
+        # count the request and run the token bucket: returns the delay before
+        # a request is accepted again, or None when it is accepted
+        rate = self._option(self.rate, endpoint)
+        key = endpoint if happyType.ismapping(self.rate) else None
+        with self.__lock:
+            self.hits[endpoint] += 1
+            if rate in (None, 0):
+                return None
+            now = time.monotonic()
+            tokens, last = self.__buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * rate)
+            if tokens >= 1.:
+                self.__buckets[key] = (tokens - 1., now)
+                return None
+            self.__buckets[key] = (tokens, now)
+            return (1. - tokens) / rate
+
+    #/************************************************************************/
+    def _simulate(self, endpoint):
+        # apply latency and errors; returns an error status, if any
+        with self.__lock:
+            delay = (self._option(self.latency, endpoint) or 0.)                \
+                + (self.__random.uniform(0, self.jitter) if self.jitter else 0.)
+            failed = self.__random.random() < (self._option(self.error_rate, endpoint) or 0.)
+            status = self.error_status
+            if failed and happyType.issequence(status):
+                status = self.__random.choice(status)
+        if delay > 0:
+            time.sleep(delay)
+        return status if failed else None
+
+    #/************************************************************************/
+    def _count(self, status):
+        with self.__lock:
+            self.status[status] += 1
+
+    #/************************************************************************/
+    def _places(self, query):
+        # places matching all the words of the query
+        words = set(re.findall(r'\w+', (query or '').lower()))
+        if words == set():
+            return []
+        places = []
+        for place in self.fixtures['places']:
+            names = set(re.findall(r'\w+', ' '.join([place['name'], place['country']] \
+                                                    + place.get('alias', [])).lower()))
+            if words <= names:
+                places.append(place)
+        return places
+
+    #/************************************************************************/
+    def _nearest(self, lat, lon, radius=None):
+        # place closest to a geocoordinate, within a radius (in km)
+        places = [(_haversine((lat, lon), (p['lat'], p['lon'])), p) for p in self.fixtures['places']]
+        places = sorted([d_p for d_p in places if radius is None or d_p[0] <= radius],
+                        key=lambda d_p: d_p[0])
+        return places[0][1] if places != [] else None
+
+    #/************************************************************************/
+    def _regions(self, level=None, unit=None, lat=None, lon=None):
+        # NUTS regions with given level/identifier/location
+        regions = []
+        for i, n in enumerate(self.fixtures['nuts']):
+            l = len(n['NUTS_ID']) - 2
+            if level not in (None, 'ALL') and l != int(level):
+                continue
+            elif unit is not None and n['NUTS_ID'] != unit:
+                continue
+            elif lat is not None and not (n['bbox'][0] <= lon <= n['bbox'][2]      \
+                                          and n['bbox'][1] <= lat <= n['bbox'][3]):
+                continue
+            regions.append(dict(n, LEVL_CODE=l, CNTR_CODE=n['NUTS_ID'][:2], OBJECTID=i + 1))
+        return regions
+
+    #/************************************************************************/
+    def geocode(self, path, query):
+        """Answer of the geocoding services.
+        """
+        places = self._places(query.get('q'))
+        try:
+            limit = int(query.get('limit'))
+        except (TypeError, ValueError):
+            pass
+        else:
+            places = places[:limit]
+        if path.startswith('/gisco/api'):
+            return _collection([_photon(p) for p in places])
+        return [_nominatim(p) for p in places]
+
+    #/************************************************************************/
+    def reverse(self, path, query):
+        """Answer of the reverse geocoding services.
+        """
+        try:
+            lat, lon = float(query['lat']), float(query['lon'])
+        except (KeyError, ValueError):
+            return 400, {'error': 'Parameters lat and lon required'}
+        place = self._nearest(lat, lon, radius=50.)
+        if path.startswith('/gisco/reverse'):
+            return _collection([] if place is None else [_photon(place)])
+        elif place is None:
+            return {'error': 'Unable to geocode'}
+        return _nominatim(place)
+
+    #/************************************************************************/
+    def findnuts(self, path, query):
+        """Answer of the NUTS identification service.
+        """
+        try:
+            x, y = float(query['x']), float(query['y'])
+        except (KeyError, ValueError):
+            return 400, {'error': 'Parameters x and y required'}
+        layer = 'NUTS_%s' % query.get('year', settings.DEF_GISCO_YEAR)
+        return {'results': [{'attributes':      {'CNTR_CODE': n['CNTR_CODE'],
+                                                 'LEVL_CODE': str(n['LEVL_CODE']),
+                                                 'NAME_LATN': n['NUTS_NAME'],
+                                                 'NUTS_ID': n['NUTS_ID'],
+                                                 'NUTS_NAME': n['NUTS_NAME'],
+                                                 'OBJECTID': str(n['OBJECTID'])},
+                             'displayFieldName': 'NUTS_ID',
+                             'layerId': 2,
+                             'layerName': layer,
+                             'value': n['NUTS_ID']}
+                            for n in self._regions(lat=y, lon=x)]}
+
+    #/************************************************************************/
+    def routing(self, path, query, coordinates='', **kwargs):
+        """Answer of the routing service.
+        """
+        try:
+            coordinates = [[float(c) for c in p.split(',')]
+                            for p in urllib.parse.unquote(coordinates).split(';')]
+            assert len(coordinates) >= 2 and all([len(c) == 2 for c in coordinates])
+        except (ValueError, AssertionError):
+            return 400, {'code': 'InvalidQuery', 'message': 'Query string malformed'}
+        # straight lines at 50km/h
+        legs = [_haversine(a[::-1], b[::-1]) * 1000. for a, b in zip(coordinates[:-1], coordinates[1:])]
+        legs = [{'distance': d, 'duration': d / 13.9, 'weight': d / 13.9, 'summary': '', 'steps': []}
+                for d in legs]
+        distance = sum([l['distance'] for l in legs])
+        return {'code': 'Ok',
+                'routes': [{'geometry': _polyline(coordinates), 'legs': legs,
+                            'distance': distance, 'duration': distance / 13.9,
+                            'weight_name': 'routability', 'weight': distance / 13.9}],
+                'waypoints': [{'hint': '', 'distance': 0., 'name': '', 'location': c}
+                              for c in coordinates]}
+
+    #/************************************************************************/
+    def conversion(self, path, query):
+        """Answer of the coordinate conversion service; supported projections
+        are those of the builtin engine of :class:`tools.CRSTransform`, *i.e.* 
+        :literal:`EPSG:4326`, :literal:`EPSG:4258`, :literal:`EPSG:3857` and
+        :literal:`EPSG:3035`.
+        """
+        try:
+            isr, osr = int(query['inSR']), int(query['outSR'])
+            geometries = [float(g) for g in query['geometries'].split(',')]
+            assert len(geometries) % 2 == 0
+            geometries = CRSTransform(engine='builtin').transform(list(zip(geometries[::2], geometries[1::2])),
+                                                                 iproj=isr, oproj=osr)
+        except (KeyError, ValueError, AssertionError, happyError):
+            # as the actual service, errors are returned with status 200
+            return {'error': {'code': 400, 'message': 'Unable to complete operation.',
+                              'details': ['Invalid or unsupported parameters']}}
+        return {'geometries': [{'x': x, 'y': y} for x, y in geometries.tolist()]}
+
+    #/************************************************************************/
+    def distribution(self, path, query, theme='nuts', file=''):
+        """Answer of the distribution (vector files) service; whatever the
+        projection requested, the geometries are returned in :literal:`EPSG:4326`.
+        """
+        year = (re.findall(r'(?:^|[_-])((?:19|20)\d{2})(?=[_.-])', file) or [settings.DEF_GISCO_YEAR])[-1]
+        units = re.match(r'^(?:nuts|countries)-\d{4}-units\.json$', file)
+        single = re.match(r'^(?P<unit>[A-Z0-9]+)-(?:region|label)-', file)
+        whole = re.match(r'^(?:NUTS|CNTR)_[A-Z]{2}.*?(?:_LEVL_(?P<level>\d))?\.(?:geo)?json$', file)
+        if units:
+            regions = self._regions(level=0 if theme == 'countries' else None)
+            return {n['NUTS_ID']: ['%s-region-01m-3035-%s.geojson' % (n['NUTS_ID'], year)]
+                    for n in regions}
+        elif single:
+            regions = self._regions(unit=single.group('unit'))
+        elif whole:
+            regions = self._regions(level=0 if theme == 'countries' else whole.group('level'))
+        else:
+            regions = []
+        if regions == []:
+            return 404, None
+        return _collection([_region(n, theme) for n in regions])
+
+    #/************************************************************************/
+    def bulk(self, path, query, theme='nuts', file=''):
+        """Answer of the bulk download service: a zip archive storing a GeoJSON
+        file with all regions.
+        """
+        basename = re.sub(r'\.[^.\d]+$', '', file)
+        regions = self._regions(level=0 if theme == 'countries' else None)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('%s.geojson' % basename,
+                       json.dumps(_collection([_region(n, theme) for n in regions])))
+        return buffer.getvalue()
+
+    #/************************************************************************/
+    def tiles(self, path, query, tile=''):
+        """Answer of the map tiles service: the image :data:`STUB_TILE`.
+        """
+        return STUB_TILE
+
+
+#%%
+#==============================================================================
+# CLASS _StubHandler
+#==============================================================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # request handler of StubServer: the instance of the server is set as the
+    # class attribute stub
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    stub = None
+
+    def log_message(self, fmt, *args):
+        happyVerbose('stub server: %s' % (fmt % args))
+
+    def do_HEAD(self):
+        self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        query = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        for endpoint, pattern in STUB_ENDPOINTS.items():
+            match = re.match(pattern, path)
+            if match is not None:
+                break
+        else:
+            return self._send(404, b'', body=body)
+        wait = self.stub._throttle(endpoint)
+        if wait is not None:
+            return self._send(429, b'', body=body,
+                              headers={'Retry-After': '%.3f' % wait})
+        status = self.stub._simulate(endpoint)
+        if status is not None:
+            return self._send(status, b'', body=body)
+        try:
+            answer = getattr(self.stub, endpoint)(path, query, **match.groupdict())
+        except Exception as e:
+            return self._send(500, str(e).encode('utf-8'), body=body)
+        status = 200
+        if isinstance(answer, tuple):
+            status, answer = answer
+        if answer is None:
+            return self._send(status, b'', body=body)
+        elif isinstance(answer, bytes):
+            ctype = 'image/png' if endpoint == 'tiles' else 'application/zip'
+        else:
+            answer, ctype = json.dumps(answer).encode('utf-8'), 'application/json; charset=utf-8'
+        headers = {'Content-Type': ctype, 'ETag': '"%s"' % hashlib.md5(answer).hexdigest()}
+        if self.stub.max_age is not None:
+            headers.update({'Cache-Control': 'max-age=%s' % self.stub.max_age})
+        if status == 200 and self.headers.get('If-None-Match') == headers['ETag']:
+            status, answer = 304, b''
+        self._send(status, answer, body=body, headers=headers)
+
+    def _send(self, status, content, body=True, headers=None):
+        self.stub._count(status)
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if body and content:
+            self.wfile.write(content)
+
+
+#%%
+#==============================================================================
+# FORMATTING/PROJECTION METHODS
+#==============================================================================
+
+def _collection(features):
+    return {'type': 'FeatureCollection', 'features': features}
+
+def _photon(place):
+    # feature as returned by GISCO geocoding service
+    return {'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [place['lon'], place['lat']]},
+            'properties': {k: place[k] for k in ('name', 'country', 'state', 'postcode', 'extent',
+                                                 'osm_id', 'osm_type', 'osm_key', 'osm_value')
+                           if k in place}}
+
+def _nominatim(place):
+    # place as returned by Nominatim geocoding service
+    xmin, ymax, xmax, ymin = place['extent']
+    return {'place_id': str(place['osm_id']),
+            'licence': 'Data © OpenStreetMap contributors, ODbL 1.0. https://osm.org/copyright',
+            'osm_type': {'N': 'node', 'W': 'way', 'R': 'relation'}.get(place['osm_type']),
+            'osm_id': str(place['osm_id']),
+            'boundingbox': [str(ymin), str(ymax), str(xmin), str(xmax)],
+            'lat': str(place['lat']), 'lon': str(place['lon']),
+            'display_name': ', '.join([place['name'], place['postcode'], place['country']]),
+            'class': place['osm_key'], 'type': place['osm_value'], 'importance': 0.5,
+            'address': {'city': place['name'], 'state': place['state'], 'postcode': place['postcode'],
+                        'country': place['country'], 'country_code': place['country_code']}}
+
+def _region(nuts, theme='nuts'):
+    # region as a GeoJSON feature
+    xmin, ymin, xmax, ymax = nuts['bbox']
+    if theme == 'countries':
+        properties = {'CNTR_ID': nuts['CNTR_CODE'], 'CNTR_NAME': nuts['NUTS_NAME'],
+                      'NAME_ENGL': nuts['NUTS_NAME'], 'FID': nuts['CNTR_CODE']}
+    else:
+        properties = {k: nuts[k] for k in ('NUTS_ID', 'LEVL_CODE', 'CNTR_CODE', 'NUTS_NAME')}
+        properties.update({'NAME_LATN': nuts['NUTS_NAME'], 'FID': nuts['NUTS_ID']})
+    return {'type': 'Feature', 'id': nuts['NUTS_ID'], 'properties': properties,
+            'geometry': {'type': 'Polygon',
+                         'coordinates': [[[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]]]}}
+
+def _haversine(a, b):
+    # great circle distance (in km) between two (lat, lon) geocoordinates
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+    return 2 * 6371.0088 * math.asin(math.sqrt(h))
+
+def _polyline(coordinates, precision=5):
+    # encoded polyline (Google algorithm) of a list of (lon, lat) coordinates
+    encoded, previous = [], (0, 0)
+    for lon, lat in coordinates:
+        point = (int(round(lat * 10**precision)), int(round(lon * 10**precision)))
+        for value in (point[0] - previous[0], point[1] - previous[1]):
+            value = ~(value << 1) if value < 0 else value << 1
+            while value >= 0x20:
+                encoded.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            encoded.append(chr(value + 63))
+        previous = point
+    return ''.join(encoded)
@@ -16,6 +16,10 @@
 .. |ipyleaflet| replace:: `ipyleaflet <ipyleaflet_>`_
 .. _folium: https://github.com/python-visualization/folium
 .. |folium| replace:: `folium <folium_>`_
+.. _pyproj: https://github.com/pyproj4/pyproj
+.. |pyproj| replace:: `pyproj <pyproj_>`_
+.. _ArcGIS: http://arcgis.com
+.. |ArcGIS| replace:: `ArcGIS <ArcGIS_>`_
 
 Library of simple tools for simple geographical data (geolocations and geocoordinates)
 handling and processin.
@@ -32,9 +36,9 @@ so as to represent equivalently and (almost...) uniquely locations.
 
 **Dependencies**
 
-*require*:      :mod:`os`, :mod:`math`, :mod:`functools`, :mod:`inspect`
+*require*:      :mod:`os`, :mod:`io`, :mod:`re`, :mod:`math`, :mod:`zipfile`, :mod:`functools`, :mod:`inspect`
 
-*optional*:     :mod:`osgeo`, :mod:`numpy`, :mod:`multiprocessing`, :mod:`ipyleaflet`, :mod:`folium`
+*optional*:     :mod:`osgeo`, :mod:`numpy`, :mod:`pyproj`, :mod:`multiprocessing`, :mod:`ipyleaflet`, :mod:`folium`
 
 *call*:         :mod:`settings`, :mod:`base`        
 
@@ -45,11 +49,13 @@ so as to represent equivalently and (almost...) uniquely locations.
 # *since*:        Sat Apr 14 20:23:34 2018
 
 __all__         = ['GeoLocation', 'GeoDistance', 'GeoAngle', 'GeoCoordinate', 
-                   'GDALTransform', 'LeafMap'] # '_Pools'
+                   'SpatialIndex', 'GDALTransform', 'NUTSResolver', 'CRSTransform', 
+                   'LeafMap'] # '_Pools'
 
 # generic import
-import os
+import os, io, re
 import math
+import zipfile
 
 import functools
 import inspect
@@ -63,7 +69,7 @@ except ImportError:
 from happygisco import happyVerbose, happyWarning, happyError, happyType
 from happygisco import settings
 from happygisco.base import JSON_INSTALLED
-from happygisco.base import _Decorator, _Tool
+from happygisco.base import _Decorator, _Tool, _JSONBackend
 
 try:    
     assert JSON_INSTALLED
@@ -88,7 +94,7 @@ else:
     NCPUS = multiprocessing.cpu_count()              
 
 try:
-    from osgeo import ogr, gdal
+    from osgeo import ogr, gdal, osr
 except ImportError:
     GDAL_TOOL = False
     happyWarning('GDAL package (https://pypi.python.org/pypi/GDAL) not loaded - Inline resources not available')
@@ -97,6 +103,15 @@ else:
     happyVerbose('GDAL help: https://pcjericks.github.io/py-gdalogr-cookbook/index.html')
     gdal.UseExceptions() # so that GDAL raises an exception instead of returning None when it cannot open something
 
+try:
+    import pyproj
+except ImportError:
+    PYPROJ_TOOL = False
+    happyWarning('PYPROJ package (https://github.com/pyproj4/pyproj) not loaded - Builtin projections used instead')
+else:
+    PYPROJ_TOOL = True
+    happyVerbose('PYPROJ help: https://pyproj4.github.io/pyproj/stable/')
+
 try:
     import geopandas#analysis:ignore
 except ImportError:
@@ -1458,7 +1473,8 @@ class GeoCoordinate(GeoLocation):
             
         See also
         --------
-        :meth:`~GeoCoordinate.distance_to`, :meth:`~GeoCoordinate.distance_to_from`.
+        :meth:`~GeoCoordinate.distance_to`, :meth:`~GeoCoordinate.distance_to_from`,
+        :meth:`~GeoCoordinate.pairwise_distance`.
         """
         if args in (None,()):           return
         else:                           locs = list(args)    
@@ -1480,20 +1496,265 @@ class GeoCoordinate(GeoLocation):
             if code is not None and code!='great_circle':
                 code = 'great_circle'
                 happyWarning('great_circle distance is considered')
-            distance = lambda x,y:  cls.distance_to_from(x,y) 
-            cunit = lambda d: d * GeoDistance.KM_TO[unit]
+            try:
+                assert np
+            except (NameError,AssertionError):
+                # scalar computation of the great circle distances
+                distance = lambda x,y:  cls.distance_to_from(x,y) 
+                cunit = lambda d: d * GeoDistance.KM_TO[unit]
+            else:
+                # vectorised computation of all pairwise great circle distances
+                dist = cls.pairwise_distance(locs, unit=unit)
+                return dist[1][0] if nlocs==2 else dist
         else:   
             code = code or 'great_circle'
             distance = getattr(geopy.distance, GeoDistance.DIST_FUNCS[code]) 
             cunit = lambda d: getattr(d, GeoDistance.DIST_UNITS[unit])
-        dist = np.zeros([nlocs,nlocs])
-        np.fill_diagonal(dist, 0.)
+        try:
+            assert np
+        except (NameError,AssertionError):
+            dist = [[0.] * nlocs for _ in range(nlocs)]
+        else:
+            dist = np.zeros([nlocs,nlocs])
         for i in range(nlocs):
             for j in range(i+1,nlocs):
                 dist[i][j] = dist[j][i] = cunit(distance(locs[i],locs[j]))
         if nlocs==2:        dist = dist[1][0]
         return dist
             
+    #/************************************************************************/
+    @classmethod
+    def __array2radians(cls, locs, unit_angle):
+        # convert, once for all, an array of (lat,Lon) coordinates into arrays of
+        # latitudes and longitudes expressed in radians
+        try:
+            assert np
+        except (NameError,AssertionError):
+            raise happyError('NUMPY package not available')
+        if unit_angle not in (GeoAngle.DEG_ANG_UNIT, GeoAngle.RAD_ANG_UNIT, GeoAngle.DPS_ANG_UNIT):
+            raise happyError('unit angle {} not implemented'.format(unit_angle))
+        if not isinstance(locs, np.ndarray) and happyType.issequence(locs)        \
+                and all([isinstance(l, GeoCoordinate) for l in locs]):
+            locs, unit_angle = [l.coordinates for l in locs], GeoAngle.DEG_ANG_UNIT
+        try:
+            locs = np.asarray(locs, dtype=float)
+            if unit_angle == GeoAngle.DPS_ANG_UNIT:
+                # (N,2,3) array of (degrees, primes, seconds)
+                locs = locs[...,0] + locs[...,1]/60. + locs[...,2]/3600.
+                unit_angle = GeoAngle.DEG_ANG_UNIT
+            locs = np.atleast_2d(locs)
+            assert locs.ndim == 2 and locs.shape[1] == 2
+        except:
+            raise happyError('unexpected array of lat/long coordinates')
+        if unit_angle == GeoAngle.DEG_ANG_UNIT:
+            locs = np.radians(locs)
+        return locs[:,0], locs[:,1]
+        
+    #/************************************************************************/
+    @classmethod
+    def __distance_factor(cls, **kwargs):
+        # conversion factor from angular distance (in radians) to distance in 
+        # the desired unit
+        radius = kwargs.pop('radius', GeoDistance.EARTH_RADIUS_EQUATOR) 
+        unit = kwargs.pop('unit', GeoDistance.KM_DIST_UNIT)
+        try:    return radius * GeoDistance.KM_TO[unit] 
+        except: raise happyError('unit {} not implemented'.format(unit))
+        
+    #/************************************************************************/
+    @classmethod
+    def pairwise_distance(cls, locs1, locs2=None, **kwargs):
+        """Compute (vectorised) the great circle distances between all pairs of
+        geolocations taken from two arrays of geographic coordinates.
+        
+            >>> D = GeoCoordinate.pairwise_distance(locs1, locs2=None, **kwargs)
+            
+        Arguments
+        ---------
+        locs1 : :class:`np.array`, list
+            :math:`N \\times 2` array (or list) of :literal:`(lat,Lon)` geographic 
+            coordinates; a list of :class:`GeoCoordinate` instances is also accepted.
+        locs2 : :class:`np.array`, list
+            ibid, :math:`M \\times 2` array of coordinates; when :data:`None`, the
+            distances are computed between all pairs of geolocations in :data:`locs1`. 
+            
+        Keyword arguments
+        -----------------
+        unit_angle : str
+            angle measurement unit of the coordinates in :data:`locs1` and :data:`locs2`;
+            it can be any string in :literal:`['deg','rad','dps']` (in the latter 
+            case, arrays of shape :math:`N \\times 2 \\times 3` are expected); 
+            default is :literal:`'deg'`.
+        unit, radius : 
+            see :meth:`~GeoCoordinate.bounding_locations`.
+        chunk : int
+            number of rows of :data:`locs1` processed at once, so as to bound the
+            size of temporary arrays; default to 1024.
+            
+        Returns
+        -------
+        D : :class:`np.array`
+            :math:`N \\times M` matrix of pairwise distances computed in :data:`unit` 
+            unit.
+            
+        Example
+        -------
+        
+            >>> paris, bee = [48.85693, 2.3412], [45.9611, 8.5809]
+            >>> GeoCoordinate.pairwise_distance([paris, bee], [bee])
+                array([[569.70001789],
+                       [  0.        ]])
+               
+        Note
+        ----
+        The same formula as the one used in :meth:`~GeoCoordinate.distance_to_from` 
+        is applied, so that both methods return the same values.
+        
+        See also
+        --------
+        :meth:`~GeoCoordinate.rowwise_distance`, :meth:`~GeoCoordinate.distance`, 
+        :meth:`~GeoCoordinate.distance_to_from`.
+        """
+        unit_angle = kwargs.pop('unit_angle', GeoAngle.DEG_ANG_UNIT)
+        chunk = kwargs.pop('chunk', 1024)
+        factor = cls.__distance_factor(**kwargs)
+        lat1, Lon1 = cls.__array2radians(locs1, unit_angle)
+        if locs2 is None:
+            lat2, Lon2 = lat1, Lon1
+        else:
+            lat2, Lon2 = cls.__array2radians(locs2, unit_angle)
+        # cos(Lon1 - Lon2) is expanded so that no trigonometric function is ever 
+        # evaluated on the full NxM matrix
+        slat1, clat1, sLon1, cLon1 = np.sin(lat1), np.cos(lat1), np.sin(Lon1), np.cos(Lon1)
+        slat2, clat2, sLon2, cLon2 = np.sin(lat2), np.cos(lat2), np.sin(Lon2), np.cos(Lon2)
+        dist = np.empty((len(lat1), len(lat2)))
+        for i in range(0, len(lat1), chunk):
+            s = slice(i, i+chunk)
+            a = np.multiply.outer(cLon1[s], cLon2)
+            a += np.multiply.outer(sLon1[s], sLon2)
+            a *= np.multiply.outer(clat1[s], clat2)
+            a += np.multiply.outer(slat1[s], slat2)
+            np.clip(a, -1., 1., out=a)
+            np.arccos(a, out=dist[s])
+        dist *= factor
+        if locs2 is None:
+            np.fill_diagonal(dist, 0.)
+        return dist
+        
+    #/************************************************************************/
+    @classmethod
+    def rowwise_distance(cls, locs1, locs2, **kwargs):
+        """Compute (vectorised) the great circle distances between the geolocations
+        of two arrays of geographic coordinates, row by row.
+        
+            >>> d = GeoCoordinate.rowwise_distance(locs1, locs2, **kwargs)
+            
+        Arguments
+        ---------
+        locs1, locs2 : :class:`np.array`, list
+            :math:`N \\times 2` arrays (or lists) of :literal:`(lat,Lon)` geographic 
+            coordinates; one of them may also be a single geolocation, *i.e.* a 
+            :math:`1 \\times 2` array.
+            
+        Keyword arguments
+        -----------------
+        unit_angle, unit, radius : 
+            see :meth:`~GeoCoordinate.pairwise_distance`.
+            
+        Returns
+        -------
+        d : :class:`np.array`
+            vector of length :math:`N` whose :math:`i`-th element is the distance
+            between the :math:`i`-th geolocations of :data:`locs1` and :data:`locs2`.
+            
+        Example
+        -------
+        
+            >>> paris, bee = [48.85693, 2.3412], [45.9611, 8.5809]
+            >>> GeoCoordinate.rowwise_distance([paris, bee], [bee, paris], unit='m')
+                array([569700.01789306, 569700.01789306])
+               
+        See also
+        --------
+        :meth:`~GeoCoordinate.pairwise_distance`, :meth:`~GeoCoordinate.distance_to_from`.
+        """
+        unit_angle = kwargs.pop('unit_angle', GeoAngle.DEG_ANG_UNIT)
+        factor = cls.__distance_factor(**kwargs)
+        lat1, Lon1 = cls.__array2radians(locs1, unit_angle)
+        lat2, Lon2 = cls.__array2radians(locs2, unit_angle)
+        try:
+            assert len(lat1) == len(lat2) or 1 in (len(lat1), len(lat2))
+        except:
+            raise happyError('incompatible shapes of input arrays')
+        a = np.sin(lat1) * np.sin(lat2) + np.cos(lat1) * np.cos(lat2) * np.cos(Lon2 - Lon1)
+        return np.arccos(np.clip(a, -1., 1.)) * factor
+    
+    #/************************************************************************/
+    @classmethod
+    def bounding_locations_array(cls, locs, distance, **kwargs):
+        """Compute (vectorised) the bounding coordinates of all points on the surface 
+        of a sphere that have a great circle distance to the geolocations of an 
+        array that is less or equal to the distance argument.
+        
+            >>> bbox = GeoCoordinate.bounding_locations_array(locs, distance, **kwargs)
+            
+        Arguments
+        ---------
+        locs : :class:`np.array`, list
+            :math:`N \\times 2` array (or list) of :literal:`(lat,Lon)` geographic 
+            coordinates.
+        distance : float, :class:`np.array`
+            distance(s) to the geolocations, either a single value or a vector of
+            length :math:`N`.
+            
+        Keyword arguments
+        -----------------
+        unit_angle, unit, radius : 
+            see :meth:`~GeoCoordinate.pairwise_distance`; note that :data:`unit_angle` 
+            is both the unit of input and output coordinates, and it is restricted 
+            to :literal:`['deg','rad']` for the latter.
+            
+        Returns
+        -------
+        bbox : :class:`np.array`
+            :math:`N \\times 2 \\times 2` array whose :math:`i`-th element represents
+            the SW corner and the NE corner (in this order) of the bounding box of
+            the :math:`i`-th geolocation in :data:`locs`, *i.e.* the same output 
+            as :meth:`~GeoCoordinate.bounding_locations_from`.
+            
+        Example
+        -------
+        
+            >>> paris = GeoCoordinate(48.85693, 2.3412)
+            >>> GeoCoordinate.bounding_locations_array([paris.coordinates], 1)
+                array([[[48.84794685,  2.32754658],
+                        [48.86591315,  2.35485342]]])
+               
+        See also
+        --------
+        :meth:`~GeoCoordinate.bounding_locations`, :meth:`~GeoCoordinate.bounding_locations_from`.
+        """
+        unit_angle = kwargs.pop('unit_angle', GeoAngle.DEG_ANG_UNIT)
+        factor = cls.__distance_factor(**kwargs)
+        lat, Lon = cls.__array2radians(locs, unit_angle)
+        rad_dist = np.asarray(distance, dtype=float) / factor
+        if np.any(rad_dist < 0) or factor < 0:
+            raise happyError('illegal arguments')
+        rad_dist = np.broadcast_to(rad_dist, lat.shape)
+        min_lat, max_lat = lat - rad_dist, lat + rad_dist
+        # where a pole is within the distance, all longitudes are considered
+        nopole = (min_lat > GeoLocation.MIN_LAT) & (max_lat < GeoLocation.MAX_LAT)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta_Lon = np.arcsin(np.sin(rad_dist) / np.cos(lat))
+        min_Lon = np.where(nopole, Lon - delta_Lon, GeoLocation.MIN_LON)
+        min_Lon = np.where(nopole & (min_Lon < GeoLocation.MIN_LON), min_Lon + 2 * math.pi, min_Lon)
+        max_Lon = np.where(nopole, Lon + delta_Lon, GeoLocation.MAX_LON)
+        max_Lon = np.where(nopole & (max_Lon > GeoLocation.MAX_LON), max_Lon - 2 * math.pi, max_Lon)
+        min_lat = np.maximum(min_lat, GeoLocation.MIN_LAT)
+        max_lat = np.minimum(max_lat, GeoLocation.MAX_LAT)
+        bbox = np.stack([np.stack([min_lat, min_Lon], axis=-1), 
+                         np.stack([max_lat, max_Lon], axis=-1)], axis=1)
+        return bbox if unit_angle == GeoAngle.RAD_ANG_UNIT else np.degrees(bbox)
+            
     #/************************************************************************/
     @classmethod      
     def round(cls, coordinates):
@@ -1814,6 +2075,165 @@ class GeoCoordinate(GeoLocation):
         return [min(bbox1[0],bbox2[0]), min(bbox1[1],bbox2[1]),
                 max(bbox1[2],bbox2[2]), max(bbox1[3],bbox2[3])]
 
+#%%
+#==============================================================================
+# CLASS SpatialIndex
+#==============================================================================
+
+class SpatialIndex(object):
+    """Class implementing a static spatial index over a collection of bounding 
+    boxes (envelopes), built once with the Sort-Tile-Recursive (STR) packing 
+    algorithm of an R-tree.
+    
+        >>> index = tools.SpatialIndex(envelopes, ids=None, capacity=16)
+        
+    Arguments
+    ---------
+    envelopes : list[tuple]
+        list of bounding boxes, each one expressed as a tuple/list 
+        :literal:`(minX, maxX, minY, maxY)`, *i.e.* in the order returned by
+        :meth:`osgeo.ogr.Geometry.GetEnvelope`.
+        
+    Keyword arguments
+    -----------------
+    ids : list
+        list of identifiers associated to the envelopes in :data:`envelopes`, 
+        *e.g.* the feature identifiers of a vector layer; default to 
+        :literal:`range(len(envelopes))`.
+    capacity : int
+        maximum number of entries stored in any node of the tree; default to
+        :data:`SpatialIndex.CAPACITY`.
+
+    Example
+    -------
+    The index is used to prune the candidates of a point-in-polygon query before
+    any exact (and costly) geometric test is run:
+        
+        >>> index = tools.SpatialIndex([(0,2,0,2), (1,3,1,3), (5,6,5,6)])
+        >>> index.query(1.5, 1.5)
+            [0, 1]
+        >>> index.query(4, 4)
+            []
+
+    Note
+    ----
+    See *Leutenegger, Lopez and Edgington*: 
+    `STR: A simple and efficient algorithm for R-tree packing <https://ieeexplore.ieee.org/document/582015>`_.
+    
+    See also
+    --------
+    :meth:`GDALTransform.layer2index`, :meth:`GDALTransform.layer2fid`.
+    """
+    
+    CAPACITY = 16
+    
+    #/************************************************************************/
+    def __init__(self, envelopes, ids=None, capacity=None):
+        if capacity is None:
+            capacity = self.CAPACITY
+        try:
+            assert isinstance(capacity, int) and capacity > 1
+        except:
+            raise happyError('wrong format for CAPACITY argument')
+        if ids is None:
+            ids = list(range(len(envelopes)))
+        try:
+            assert len(ids) == len(envelopes)
+        except:
+            raise happyError('incompatible ENVELOPES and IDS arguments')
+        self.__capacity = capacity
+        self.__size = len(envelopes)
+        # leaf entries are stored as (minX, maxX, minY, maxY, id)
+        nodes = [tuple(e[:4]) + (i,) for (e, i) in zip(envelopes, ids) if e is not None]
+        self.__height = 0 # number of packed levels above the leaf entries
+        while len(nodes) > capacity:
+            nodes = self.__pack(nodes, capacity)
+            self.__height += 1
+        self.__root = nodes
+        
+    #/************************************************************************/
+    @staticmethod
+    def __pack(nodes, capacity):
+        # one level of STR packing: sort by X centre, cut into vertical slices,
+        # then sort each slice by Y centre and group into nodes of given capacity
+        nparents = int(math.ceil(len(nodes) / float(capacity)))
+        nslices = int(math.ceil(math.sqrt(nparents)))
+        slice_size = nslices * capacity
+        nodes = sorted(nodes, key=lambda n: n[0] + n[1])
+        parents = []
+        for s in range(0, len(nodes), slice_size):
+            vslice = sorted(nodes[s:s+slice_size], key=lambda n: n[2] + n[3])
+            for g in range(0, len(vslice), capacity):
+                group = vslice[g:g+capacity]
+                parents.append((min([n[0] for n in group]), max([n[1] for n in group]),
+                                min([n[2] for n in group]), max([n[3] for n in group]),
+                                group))
+        return parents
+    
+    #/************************************************************************/
+    def __len__(self):
+        return self.__size
+    
+    #/************************************************************************/
+    @property
+    def capacity(self):
+        """Capacity property (:data:`getter`) of a :class:`SpatialIndex` instance, 
+        *i.e.* the maximum number of entries per node.
+        """
+        return self.__capacity
+    
+    #/************************************************************************/
+    def intersects(self, envelope):
+        """Retrieve the identifiers of all indexed envelopes that intersect a 
+        given bounding box.
+        
+            >>> ids = index.intersects(envelope)
+            
+        Arguments
+        ---------
+        envelope : tuple
+            query bounding box expressed as :literal:`(minX, maxX, minY, maxY)`.
+            
+        Returns
+        -------
+        ids : list
+            list of identifiers (sorted) whose envelopes intersect :data:`envelope`.
+        """
+        xmin, xmax, ymin, ymax = envelope[:4]
+        ids, stack = [], [(self.__root, self.__height)]
+        while stack:
+            nodes, level = stack.pop()
+            for n in nodes:
+                if n[0] > xmax or n[1] < xmin or n[2] > ymax or n[3] < ymin:
+                    continue
+                elif level == 0:
+                    ids.append(n[4])
+                else:
+                    stack.append((n[4], level-1))
+        return sorted(ids)
+    
+    #/************************************************************************/
+    def query(self, x, y):
+        """Retrieve the identifiers of all indexed envelopes that contain a given
+        point.
+        
+            >>> ids = index.query(x, y)
+            
+        Arguments
+        ---------
+        x, y : float
+            coordinates of the query point, expressed in the same reference system
+            as the indexed envelopes (*e.g.*, :literal:`(Lon,lat)` for geographic
+            layers).
+            
+        Returns
+        -------
+        ids : list
+            list of identifiers (sorted) of the candidate envelopes containing 
+            the point :literal:`(x,y)`.
+        """
+        return self.intersects((x, x, y, y))
+
 #%%
 #/****************************************************************************/
 # CLASS __Layer AND __Feature   
@@ -1911,6 +2331,7 @@ class GDALTransform(_Tool):
         except:
             raise IOError('GDAL service not available')
         self.__driver, self.__driver_name = None, ''
+        self.__indexes = {} # spatial indexes of the layers already processed
         self.__driver_name = kwargs.pop('driver_name', settings.DEF_DRIVER_NAME)
         try:
             self.__driver = ogr.GetDriverByName(self.__driver_name)
@@ -2429,11 +2850,73 @@ class GDALTransform(_Tool):
         return geom        
     
     #/************************************************************************/
-    def layer2fid(self, layer, geom):
+    def layer2index(self, layer, **kwargs):
+        """Build (or retrieve, when already built) the spatial index of the features 
+        of a vector layer.
+        
+            >>> index = tool.layer2index(layer, **kwargs)
+
+        Arguments
+        ---------
+        layer : :obj:`osgeo.ogr.Layer`
+            input single vector layer.
+            
+        Keyword arguments
+        -----------------
+        force : bool
+            flag set to force the (re)building of the index, even when it has already
+            been built for the same layer; default to :data:`False`.
+        capacity : int
+            maximum number of entries per node of the index; see :class:`SpatialIndex`.
+            
+        Returns
+        -------
+        index : :class:`SpatialIndex`
+            a spatial index over the envelopes of the features of :data:`layer`, 
+            whose identifiers are the features identifiers (see 
+            :meth:`osgeo.ogr.Feature.GetFID`).
+            
+        Note
+        ----
+        The index is built once and cached in the current instance: it is identified
+        by the name, the number of features and the extent of the layer, so that the 
+        same layer is not scanned again in later calls to :meth:`layer2fid`. 
+            
+        See also
+        --------
+        :meth:`~tools.GDALTransform.layer2fid`, :class:`SpatialIndex`,
+        :meth:`osgeo.ogr.Geometry.GetEnvelope`.
+        """
+        if not isinstance(layer, ogr.Layer):
+            raise happyError('wrong layer type')  
+        force = kwargs.pop('force', False)
+        try:
+            key = (layer.GetName(), layer.GetFeatureCount(), tuple(layer.GetExtent()))
+        except:
+            key = None
+        if force is False and key is not None and key in self.__indexes:
+            return self.__indexes[key]
+        envelopes, fids = [], []
+        layer.ResetReading()
+        for feature in layer:
+            ft = feature.GetGeometryRef()
+            if ft is None:
+                continue
+            envelopes.append(ft.GetEnvelope())
+            fids.append(feature.GetFID())
+        layer.ResetReading()
+        happyVerbose('\nspatial index built over %d features of %s' % (len(fids), layer))
+        index = SpatialIndex(envelopes, ids=fids, capacity=kwargs.pop('capacity', None))
+        if key is not None:
+            self.__indexes[key] = index
+        return index
+
+    #/************************************************************************/
+    def layer2fid(self, layer, geom, **kwargs):
         """Identify the feature(s) of a layer that contain(s) the point(s) of a given 
         geometry.
         
-           >>> idfeat = tool.layer2fid(layer, geom)
+           >>> idfeat = tool.layer2fid(layer, geom, **kwargs)
 
         Arguments
         ---------
@@ -2443,6 +2926,14 @@ class GDALTransform(_Tool):
             input vector geometry, *e.g.* storing :literal:`(lat,Lon)` geographical
             coordinates.
             
+        Keyword arguments
+        -----------------
+        index : bool,:class:`SpatialIndex`
+            spatial index used to prune the features of :data:`layer` before any
+            exact point-in-polygon test is run; when :data:`True`, the index is 
+            built (once) through :meth:`layer2index`; when :data:`False`, all 
+            features are tested exhaustively; default to :data:`True`.
+            
         Returns
         -------
         idfeat : list[int]
@@ -2484,35 +2975,48 @@ class GDALTransform(_Tool):
                     
         Note
         ----
-        The features of interest can be retrieved from the indices in :data:`id` 
-        using the method :meth:`osgeo.ogr.Layer.GetFeature`.
+        * The features of interest can be retrieved from the indices in :data:`id` 
+          using the method :meth:`osgeo.ogr.Layer.GetFeature`.
+        * Only the first feature (in the order of the feature identifiers) found
+          to contain a point is retained, so that :data:`idfeat` holds exactly one
+          entry per point; when features overlap (*e.g.*, regions at different
+          levels stored in the same layer), the other containing features are
+          ignored.
             
         See also
         --------
         :meth:`~tools.GDALTransform.coord2feat`, :meth:`~tools.GDALTransform.coord2geom`,
-        :meth:`features.Location.iscontained`, 
+        :meth:`~tools.GDALTransform.layer2index`, :meth:`features.Location.iscontained`, 
         :meth:`osgeo.ogr.Layer.GetFeatureCount`, :meth:`osgeo.ogr.Layer.GetGeometryCount`, 
         :meth:`osgeo.ogr.Layer.GetFeature`, :meth:`osgeo.ogr.Geometry.GetGeometryRef`.
         """        
         if not isinstance(layer, ogr.Layer):
             raise happyError('wrong layer type')            
+        index = kwargs.pop('index', True)
+        if index is True:
+            index = self.layer2index(layer)
+        elif not (index in (False,None) or isinstance(index, SpatialIndex)):
+            raise happyError('wrong format for INDEX argument')
         answer = [] # will be same lenght as self.vector
         featureCount = layer.GetFeatureCount()
         happyVerbose('\nnumber of features in %s: %d' % (layer,featureCount))
         # iterate through points
         for i in range(0, geom.GetGeometryCount()): # because it is a MULTIPOINT
             pt = geom.GetGeometryRef(i)
-            #print(pt.ExportToWkt())
-            # iterate through polygons in layer
-            for j in range(0, featureCount):
+            # select the candidate polygons in layer: only those whose envelope 
+            # contain the point when an index is available
+            if index in (False,None):
+                candidates = range(0, featureCount)
+            else:
+                candidates = index.query(pt.GetX(), pt.GetY())
+            for j in candidates:
                 feature = layer.GetFeature(j)
                 if feature is None:
                     continue    
-                #elif feature.geometry() and feature.geometry().Contains(pt):
-                #    Regions.append(feature)
                 ft = feature.GetGeometryRef()
                 if ft is not None and ft.Contains(pt):
                     answer.append(j)  # answer.append(feature)
+                    break
             if len(answer)<i+1:    
                 answer.append(None)
         return answer
@@ -2539,6 +3043,9 @@ class GDALTransform(_Tool):
             the predefined driver; incompatible with :data:`data` below.
         data : :class:`osgeo.ogr.Layer`
             formatted vector data; incompatible with :data:`file` above.
+        index : bool,:class:`SpatialIndex`
+            spatial index used to speed up the search of the features; see 
+            :meth:`~tools.GDALTransform.layer2fid`; default to :data:`True`.
             
         Returns
         -------
@@ -2582,7 +3089,7 @@ class GDALTransform(_Tool):
                 raise happyError('input vector data file not found')
             try:
                 # layer = self.file2layer(**kwargs)
-                data = self.get_dataset(fname)
+                data = self.get_dataset(**{_Decorator.KW_FILE: fname})[0]
             except:
                 raise happyError('could not load vector data')
         try:
@@ -2597,11 +3104,683 @@ class GDALTransform(_Tool):
         except:
             raise IOError('could not load geolocation vector')
         try:
-            fid = self.layer2fid(layer, geom)
+            fid = self.layer2fid(layer, geom, index=kwargs.pop('index', True))
             assert fid not in (None,[])
         except:
             raise IOError('could not identify feature')
-        return [layer.GetFeature(i) for i in fid]
+        return [layer.GetFeature(i) if i is not None else None for i in fid]
+
+#%%
+#==============================================================================
+# CLASS NUTSResolver
+#==============================================================================
+
+class NUTSResolver(_Tool):
+    """Class implementing an offline (local) identification of the |NUTS| regions
+    that contain given geolocations, emulating the |GISCO| *findnuts* service.
+
+        >>> resolver = tools.NUTSResolver(**kwargs)
+
+    Keyword arguments
+    -----------------
+    file : str, list[str]
+        name(s) of the vector file(s) storing NUTS regions; can be either |GeoJSON| 
+        files, bulk (zipped) archives downloaded from |GISCO| (*e.g.*, 
+        :literal:`ref-nuts-2013-01m.geojson.zip`), or any vector file supported 
+        by |GDAL| when available (*e.g.*, the shapefiles 
+        :literal:`NUTS_RG_01M_2013_4326_LEVL_*.shp`).
+    geom : dict, str, list
+        (list of) |GeoJSON| feature collection(s) of NUTS regions, as dictionary(ies)
+        or JSON string(s); incompatible with :data:`file` above.
+    year : int
+        reference year of the NUTS regions; when not passed, it is guessed from the 
+        names of the files, or set to :data:`settings.DEF_GISCO_YEAR` otherwise.
+    proj : int
+        projection (EPSG code) of the NUTS regions, and hence of the geolocations
+        to query; default to :data:`settings.DEF_GISCO_PROJECTION`.
+        
+    Example
+    -------
+    The regions are loaded (and indexed) once, then all four levels are answered
+    locally, with the same output as :meth:`services.GISCOService.coord2nuts`:
+        
+        >>> resolver = tools.NUTSResolver(file='ref-nuts-2013-01m.geojson.zip')
+        >>> resolver.coord2nuts([41.8933203,12.4829321], level=2)
+            {'attributes': {'CNTR_CODE': 'IT', 'LEVL_CODE': '2',
+              'NUTS_ID': 'ITI4', 'NUTS_NAME': 'Lazio', ...},
+             'displayFieldName': 'NUTS_ID',
+             'layerId': 2, 'layerName': 'NUTS_2013',
+             'value': 'ITI4'}
+             
+    The resolver can also be plugged into a service so that its methods 
+    :meth:`~services.GISCOService.coord2nuts` and :meth:`~services.GISCOService.place2nuts` 
+    run offline whenever possible:
+        
+        >>> serv = services.GISCOService(resolver=resolver)
+        
+    Note
+    ----
+    Since NUTS regions are hierarchical, the regions of levels 0 to 2 are inferred
+    from the identifier of the finest region found (when loaded), so that a single 
+    point-in-polygon test is usually run per geolocation.
+        
+    See also
+    --------
+    :class:`SpatialIndex`, :meth:`services.GISCOService.coord2nuts`, 
+    :meth:`services.GISCOService.url_findnuts`.
+    """
+    
+    LAYER_ID = 2 # as returned by GISCO findnuts service
+    
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self.__year = kwargs.pop(_Decorator.KW_YEAR, None)
+        self.__proj = kwargs.pop(_Decorator.KW_PROJECTION, settings.DEF_GISCO_PROJECTION)
+        if self.__proj in settings.GISCO_PROJECTIONS.keys():
+            self.__proj = settings.GISCO_PROJECTIONS[self.__proj]
+        try:
+            assert self.__year is None or self.__year in settings.GISCO_YEARS
+        except:
+            raise happyError('wrong format/value for %s argument' % _Decorator.KW_YEAR.upper())
+        try:
+            assert self.__proj in settings.GISCO_PROJECTIONS.values()
+        except:
+            raise happyError('wrong format/value for %s argument' % _Decorator.KW_PROJECTION.upper())
+        file = kwargs.pop(_Decorator.KW_FILE, None)
+        geom = kwargs.pop(_Decorator.KW_GEOMETRY, None)
+        try:
+            assert not(file is None and geom is None)
+        except:
+            raise happyError('missing input vector data (%s or %s)' % (_Decorator.KW_FILE.upper(),_Decorator.KW_GEOMETRY.upper()))
+        try:
+            assert file is None or geom is None
+        except:
+            raise happyError('incompatible parameters %s and %s' % (_Decorator.KW_FILE.upper(),_Decorator.KW_GEOMETRY.upper()))
+        self.__parts = {}   # polygons (list of rings) per level
+        self.__nuts = {}    # attributes per NUTS identifier
+        if file is not None:
+            if not happyType.issequence(file): 
+                file = [file,]
+            [self.__load_file(f) for f in file]
+        else:
+            if happyType.ismapping(geom) or happyType.isstring(geom) or isinstance(geom, bytes): 
+                geom = [geom,]
+            [self.__load_geom(g) for g in geom]
+        if self.__nuts == {}:
+            raise happyError('no NUTS region loaded')
+        if self.__year is None:
+            self.__year = settings.DEF_GISCO_YEAR
+        self.__index = dict([(level, SpatialIndex([p[0] for p in parts]))  \
+                             for (level, parts) in self.__parts.items()])
+        happyVerbose('%s NUTS regions loaded for levels %s' % (len(self.__nuts), sorted(self.levels)))
+
+    #/************************************************************************/
+    @property
+    def year(self):
+        """Year property (:data:`getter`) of a :class:`NUTSResolver` instance, 
+        *i.e.* the reference year of the NUTS regions loaded.
+        """
+        return self.__year
+    
+    @property
+    def proj(self):
+        """Projection property (:data:`getter`) of a :class:`NUTSResolver` instance,
+        *i.e.* the EPSG code of the NUTS regions loaded.
+        """
+        return self.__proj
+    
+    @property
+    def levels(self):
+        """Levels property (:data:`getter`) of a :class:`NUTSResolver` instance, 
+        *i.e.* the list of NUTS levels loaded.
+        """
+        return list(self.__parts.keys())
+    
+    #/************************************************************************/
+    def __guess_year(self, name):
+        if self.__year is not None:
+            return
+        match = re.search(r'(?:_|ref-nuts-)(\d{4})(?:_|-|\.)', os.path.basename(name))
+        if match is not None and int(match.group(1)) in settings.GISCO_YEARS:
+            self.__year = int(match.group(1))
+
+    #/************************************************************************/
+    def __load_file(self, file):
+        try:
+            assert os.path.exists(file)
+        except:
+            raise happyError('input file %s not found' % file)
+        self.__guess_year(file)
+        if zipfile.is_zipfile(file):
+            with zipfile.ZipFile(file) as zf:
+                self.__load_zip(zf)
+        elif os.path.splitext(file)[-1].lower() in ('.geojson', '.json'):
+            with open(file, 'rb') as f:
+                self.__load_geom(f.read())
+        else:
+            try:
+                assert GDAL_TOOL
+                ds = ogr.Open(file, 0)
+                assert ds is not None
+            except:
+                raise happyError('data not retrieved from file %s' % file)
+            layer = ds.GetLayer()
+            self.__load_geom({'features': [feat.ExportToJson(as_object=True) for feat in layer]})
+            layer, ds = None, None
+   
+    #/************************************************************************/
+    def __load_zip(self, zf):
+        names = self.__zipnames(zf, self.__proj)
+        if names == []:
+            raise happyError('no NUTS region file found in bulk archive')
+        for n in names:
+            self.__guess_year(n)
+            self.__load_geom(zf.read(n))
+
+    #/************************************************************************/
+    def __load_geom(self, geom):
+        if isinstance(geom, bytes) or happyType.isstring(geom):
+            try:
+                geom = _JSONBackend.loads(geom)
+            except:
+                raise happyError('GEOMETRY argument not recognised')
+        features = geom.get(_Decorator.parse_nuts.KW_FEATURES, [geom,])
+        for feat in features:
+            props = feat.get(_Decorator.parse_nuts.KW_PROPERTIES) or {}
+            geometry = feat.get(_Decorator.parse_nuts.KW_GEOMETRY) or {}
+            nid = props.get(_Decorator.parse_nuts.KW_NUTS_ID, props.get(_Decorator.parse_nuts.KW_FID))
+            if nid in (None,''):
+                continue
+            level = props.get(_Decorator.parse_nuts.KW_LEVEL)
+            level = int(level) if level not in (None,'') else len(nid) - 2
+            gtype = geometry.get(_Decorator.parse_nuts.KW_TYPE)
+            coords = geometry.get(_Decorator.parse_nuts.KW_COORDINATES) or []
+            if gtype == 'Polygon':
+                polygons = [coords,]
+            elif gtype == 'MultiPolygon':
+                polygons = coords
+            else:
+                continue
+            parts = self.__parts.setdefault(level, [])
+            for poly in polygons:
+                rings = [([float(p[0]) for p in ring], [float(p[1]) for p in ring]) \
+                         for ring in poly if len(ring) > 2]
+                if rings == []:
+                    continue
+                envelope = (min(rings[0][0]), max(rings[0][0]), min(rings[0][1]), max(rings[0][1]))
+                parts.append((envelope, nid, rings))
+            attributes = dict([(k, str(v)) for (k,v) in props.items() if v is not None])
+            attributes.update({_Decorator.parse_nuts.KW_NUTS_ID: nid, 
+                               _Decorator.parse_nuts.KW_LEVEL: str(level)})
+            self.__nuts[nid] = attributes
+        
+    #/************************************************************************/
+    @staticmethod
+    def __inpolygon(x, y, rings):
+        # even-odd ray casting over all rings (outer boundary and holes) 
+        inside = False
+        for (xs, ys) in rings:
+            j = len(xs) - 1
+            for i in range(len(xs)):
+                if (ys[i] > y) != (ys[j] > y) \
+                        and x < (xs[j] - xs[i]) * (y - ys[i]) / (ys[j] - ys[i]) + xs[i]:
+                    inside = not inside
+                j = i
+        return inside
+        
+    #/************************************************************************/
+    def __locate(self, x, y, level):
+        parts = self.__parts[level]
+        for k in self.__index[level].query(x, y):
+            if self.__inpolygon(x, y, parts[k][2]):
+                return parts[k][1]
+        return None
+
+    #/************************************************************************/
+    def __record(self, nid):
+        return {_Decorator.parse_nuts.KW_ATTRIBUTES:   self.__nuts[nid].copy(),
+                _Decorator.parse_nuts.KW_FIELDNAME:    _Decorator.parse_nuts.KW_NUTS_ID,
+                _Decorator.parse_nuts.KW_LAYERID:      self.LAYER_ID,
+                _Decorator.parse_nuts.KW_LAYERNAME:    'NUTS_%s' % self.__year,
+                _Decorator.parse_nuts.KW_VALUE:        nid}
+
+    #/************************************************************************/
+    def findnuts(self, coord, level=None):
+        """Identify the NUTS regions (all levels) that contain a single geolocation, 
+        and format them like the JSON response of the |GISCO| *findnuts* service.
+        
+            >>> data = resolver.findnuts(coord, level=None)
+            
+        Arguments
+        ---------
+        coord : list[float]
+            geolocation expressed as a :literal:`(lat,Lon)` tuple/list of geographic 
+            coordinates.
+            
+        Keyword arguments
+        -----------------
+        level : int, list[int]
+            NUTS level(s) to identify; default to :data:`None`, *i.e.* all levels
+            loaded.
+            
+        Returns
+        -------
+        data : dict
+            a dictionary with the single key :literal:`'results'` whose value is the 
+            list of NUTS records (sorted by level) containing :data:`coord`.
+            
+        See also
+        --------
+        :meth:`~NUTSResolver.coord2nuts`, :meth:`services.GISCOService.url_findnuts`.
+        """
+        y, x = float(coord[0]), float(coord[1])
+        levels = self.levels if level is None                                   \
+            else [int(l) for l in (level if happyType.issequence(level) else [level,])]
+        found = {}
+        # start from the finest level and infer the coarser ones from the NUTS 
+        # identifier (e.g., ITI43 => ITI4 => ITI => IT)
+        for l in sorted(self.__parts.keys(), reverse=True):
+            if l in found:
+                continue
+            nid = self.__locate(x, y, l)
+            if nid is None:
+                continue
+            found[l] = nid
+            for pl in range(l):
+                if pl not in found and nid[:pl+2] in self.__nuts:
+                    found[pl] = nid[:pl+2]
+        return {_Decorator.parse_nuts.KW_RESULTS: 
+                [self.__record(found[l]) for l in sorted(found.keys()) if l in levels]}
+        
+    #/************************************************************************/
+    @_Decorator.parse_coordinate
+    def coord2nuts(self, coord, **kwargs):
+        """Identify the various |NUTS| regions (all levels) associated to given 
+        geolocation(s) provided as geographic coordinates, without any call to 
+        the online service.
+        
+            >>> nuts = resolver.coord2nuts(coord, **kwargs)
+            
+        Arguments
+        ---------
+        coord : list[float], list[list]
+            geolocation(s) expressed as tuple/list of :literal:`(lat,Lon)` geographic
+            coordinates.
+        
+        Keyword arguments
+        -----------------
+        level : int
+            integer in [0,3] defining the classification level of the NUTS region 
+            to return, if not all (default when :data:`level` is :data:`None`).
+        
+        Returns
+        -------
+        nuts : dict, list[dict]
+            see :meth:`services.GISCOService.coord2nuts`.
+            
+        See also
+        --------
+        :meth:`~NUTSResolver.findnuts`, :meth:`services.GISCOService.coord2nuts`.
+        """
+        level = kwargs.pop(_Decorator.KW_LEVEL, None)
+        nuts = []
+        for c in coord:
+            data = self.findnuts(c, level=level).get(_Decorator.parse_nuts.KW_RESULTS)
+            nuts.append(None if data in ([],None) else data if len(data)>1 else data[0])
+        return nuts[0] if len(nuts)==1 else nuts
+    
+    #/************************************************************************/
+    @classmethod
+    def from_bulk(cls, service, **kwargs):
+        """Create a resolver from the bulk NUTS archive downloaded (and cached) by
+        a |GISCO| service.
+        
+            >>> resolver = NUTSResolver.from_bulk(service, **kwargs)
+            
+        Arguments
+        ---------
+        service : :class:`services.GISCOService`
+            service used to download the bulk archive.
+            
+        Keyword arguments
+        -----------------
+        year : int
+            reference year of the NUTS regions; default to :data:`settings.DEF_GISCO_YEAR`.
+        scale : str
+            scale of the NUTS regions; default to :data:`settings.DEF_GISCO_SCALE`.
+        proj : int,str
+            projection of the NUTS regions, *e.g.* either an EPSG code or a name like
+            :literal:`'WGS84'` (see :meth:`~base._Decorator.parse_projection`); default 
+            to :data:`settings.DEF_GISCO_PROJECTION`.
+            
+        Returns
+        -------
+        resolver : :class:`NUTSResolver`
+            
+        See also
+        --------
+        :meth:`services.GISCOService.url_nuts`, :meth:`services.GISCOService.nuts_response`.
+        """
+        year = kwargs.pop(_Decorator.KW_YEAR, settings.DEF_GISCO_YEAR)
+        proj = kwargs.pop(_Decorator.KW_PROJECTION, settings.DEF_GISCO_PROJECTION)
+        func = lambda *a, **kw: kw.get(_Decorator.KW_PROJECTION)
+        try:
+            proj = _Decorator.parse_projection(func)(**{_Decorator.KW_PROJECTION: proj})
+        except:
+            raise happyError('wrong format/value for %s argument' % _Decorator.KW_PROJECTION.upper())
+        scale = kwargs.pop(_Decorator.KW_SCALE, settings.DEF_GISCO_SCALE)
+        url = service.url_nuts('BULK', **{_Decorator.KW_YEAR: year, 
+                                          _Decorator.KW_SCALE: scale,
+                                          _Decorator.KW_IFORMAT: 'geojson'})
+        try:
+            response = service.get_response(url, **kwargs)
+        except:
+            raise happyError('bulk NUTS archive %s not loaded' % url)
+        path = getattr(response, '_cache_path', None) or ''
+        try:
+            # read the layers straight from the cached archive rather than loading
+            # it in memory, unless it is compressed (see base._DiskCache.codec)
+            if os.path.isfile(path) and getattr(response, '_cache_codec', None) is None:
+                archive = path
+            else:
+                archive = io.BytesIO(response.content)
+            with zipfile.ZipFile(archive) as zf:
+                geom = [zf.read(n) for n in cls.__zipnames(zf, proj)]
+        except:
+            raise happyError('bulk NUTS archive %s not loaded' % url)
+        finally:
+            try: # do not keep the cached file open
+                response.raw.close()
+            except AttributeError:
+                pass
+        if geom == []:
+            raise happyError('no NUTS region file found in bulk archive %s' % url)
+        return cls(**{_Decorator.KW_YEAR: year, _Decorator.KW_PROJECTION: proj, 
+                      _Decorator.KW_GEOMETRY: geom})
+
+    #/************************************************************************/
+    @staticmethod
+    def __zipnames(zf, proj):
+        # select the region layers of a bulk archive in the right projection,
+        # preferably those with distinct levels
+        pattern = re.compile(r'NUTS_RG_\w+_(\d{4})_%s(_LEVL_\d)?\.geojson$' % proj)
+        names = [n for n in zf.namelist() if pattern.search(n) is not None]
+        if any(['_LEVL_' in n for n in names]):
+            names = [n for n in names if '_LEVL_' in n]
+        return names
+
+#%%
+#==============================================================================
+# CLASS CRSTransform
+#==============================================================================
+
+class CRSTransform(_Tool):
+    """Class implementing a local (offline) transformation of geographical 
+    coordinates from one spatial reference system (projection) to another, 
+    emulating the |ArcGIS| *project* service run by 
+    :meth:`services.GISCOService.coordconvert`.
+
+        >>> tool = tools.CRSTransform(**kwargs)
+
+    Keyword arguments
+    -----------------
+    engine : str
+        name of the engine used to transform the coordinates, either :literal:`'pyproj'` 
+        (when |pyproj| is available), :literal:`'osr'` (when |GDAL| is available) or
+        :literal:`'builtin'`; default 
+        to the first engine available in this order.
+        
+    Example
+    -------
+    Transformers are created once per pair of projections, then applied to whole 
+    arrays of :literal:`(x,y)` coordinates (*i.e.*, :literal:`(Lon,lat)` for
+    geographic projections) at once:
+        
+        >>> tool = tools.CRSTransform()
+        >>> tool.transform([[-9.1630,38.7775], [2.3412,48.85693]], iproj='WGS84', oproj='LAEA')
+            array([[2664895.06820522, 1953237.72687472],
+                   [3759973.14563918, 2889605.09123142]])
+        
+    Notes
+    -----
+    * The :literal:`'builtin'` engine only supports the projections in 
+      :data:`settings.GISCO_PROJECTIONS`; *EPSG:4258* (ETRS89) and *EPSG:4326* 
+      (WGS84) are then considered as identical, as done by the |ArcGIS| service 
+      when no datum transformation is passed.
+    * The transformers are shared by all instances of the class.
+        
+    See also
+    --------
+    :meth:`services.GISCOService.coordconvert`, :meth:`services.GISCOService.url_conversion`.
+    """
+    
+    ENGINES = ['pyproj', 'osr', 'builtin'] # by order of preference
+    
+    # GRS80 ellipsoid and LAEA Europe (EPSG:3035) parameters
+    A, F        = 6378137., 1. / 298.257222101
+    LAT0, LON0  = math.radians(52.), math.radians(10.)
+    FE, FN      = 4321000., 3210000.
+
+    __transformers = {}
+    
+    #/************************************************************************/
+    def __init__(self, **kwargs):
+        self.__engine = kwargs.pop('engine', None)
+        if self.__engine is None:
+            try:
+                self.__engine = [e for e in self.ENGINES if self.isavailable(e)][0]
+            except IndexError:
+                raise happyError('no transformation engine available - install any of pyproj/GDAL/numpy')
+        try:
+            assert self.__engine in self.ENGINES
+        except:
+            raise happyError('wrong value for ENGINE argument - must be any of %s' % self.ENGINES)
+        if not self.isavailable(self.__engine):
+            raise happyError('engine %s not available' % self.__engine)
+        
+    #/************************************************************************/
+    @property
+    def engine(self):
+        """Engine property (:data:`getter`) of a :class:`CRSTransform` instance,
+        *i.e.* the name of the engine used to transform the coordinates.
+        """
+        return self.__engine
+
+    #/************************************************************************/
+    @classmethod
+    def isavailable(cls, engine):
+        """Check whether a given transformation engine is available.
+        """
+        if engine == 'pyproj':
+            return PYPROJ_TOOL
+        elif engine == 'osr':
+            return GDAL_TOOL
+        try:
+            assert np
+        except (NameError,AssertionError):
+            return False
+        return engine == 'builtin'
+
+    #/************************************************************************/
+    def supports(self, iproj, oproj):
+        """Check whether a transformation between two projections is supported 
+        by the engine of a :class:`CRSTransform` instance.
+        """
+        try:
+            self.transformer(iproj, oproj)
+        except happyError:
+            return False
+        return True
+
+    #/************************************************************************/
+    def transformer(self, iproj, oproj):
+        """Retrieve the transformer between two projections, creating it when 
+        it is first requested.
+        
+            >>> func = tool.transformer(iproj, oproj)
+            
+        Arguments
+        ---------
+        iproj, oproj : str,int
+            input and output spatial reference systems (projections), as names
+            of :data:`settings.GISCO_PROJECTIONS` or EPSG codes.
+            
+        Returns
+        -------
+        func : callable
+            a function :literal:`func(x, y)` transforming the arrays :data:`x` 
+            and :data:`y` of coordinates expressed in :data:`iproj` and returning
+            the arrays of their equivalent coordinates in :data:`oproj`.
+        """
+        iproj, oproj = self.__parse_projection(iproj), self.__parse_projection(oproj)
+        key = (self.__engine, iproj, oproj)
+        if key not in self.__transformers:
+            happyVerbose('create %s transformer from EPSG:%s to EPSG:%s' % key)
+            try:
+                func = getattr(self, '_%s__%s_transformer' % (self.__class__.__name__, self.__engine))(iproj, oproj)
+            except happyError:
+                raise
+            except:
+                raise happyError('transformation from EPSG:%s to EPSG:%s not supported by %s engine' % (iproj, oproj, self.__engine))
+            self.__transformers[key] = func
+        return self.__transformers[key]
+
+    #/************************************************************************/
+    def transform(self, coord, **kwargs):
+        """Transform geographical coordinates from one spatial reference system 
+        (projection) to another.
+        
+            >>> new_coord = tool.transform(coord, **kwargs)
+            
+        Arguments
+        ---------
+        coord : list[float], list[list], :class:`np.array`
+            :literal:`(x,y)` coordinates expressed in spatial reference system 
+            :data:`iproj` (see below).
+            
+        Keyword arguments
+        -----------------
+        iproj : str,int
+            input spatial reference system (projection).
+        oproj : str,int
+            output spatial reference system (projection).
+            
+        Returns
+        -------
+        new_coord : :class:`np.array`
+            :literal:`(N,2)` array of coordinates expressed in spatial reference
+            system :data:`oproj`, with :literal:`N` the number of input coordinates.
+        """
+        iproj, oproj = kwargs.pop('iproj', None), kwargs.pop('oproj', None)
+        try:
+            assert not(iproj in ('',None) or oproj in ('',None))
+        except AssertionError:
+            raise happyError('missing IPROJ/OPROJ projection argument(s)') 
+        func = self.transformer(iproj, oproj)
+        try:
+            coord = np.atleast_2d(np.asarray(coord, dtype=float))
+            assert coord.ndim == 2 and coord.shape[1] == 2
+        except:
+            raise happyError('unexpected array of (x,y) coordinates')
+        x, y = func(coord[:,0], coord[:,1])
+        return np.column_stack([x, y])
+
+    #/************************************************************************/
+    @classmethod
+    def __parse_projection(cls, proj):
+        if proj in settings.GISCO_PROJECTIONS.keys():
+            proj = settings.GISCO_PROJECTIONS[proj]
+        elif happyType.isstring(proj) and re.match(r'^(?i:EPSG):?\d+$', proj):
+            proj = re.sub(r'^(?i:EPSG):?', '', proj)
+        try:
+            return int(proj)
+        except:
+            raise happyError('wrong format/value for projection %s' % proj)
+    
+    #/************************************************************************/
+    @classmethod
+    def __pyproj_transformer(cls, iproj, oproj):
+        # always_xy ensures the traditional GIS order (Lon,lat), as used by ArcGIS
+        transformer = pyproj.Transformer.from_crs('EPSG:%s' % iproj, 'EPSG:%s' % oproj, always_xy=True)
+        return transformer.transform
+
+    #/************************************************************************/
+    @classmethod
+    def __osr_transformer(cls, iproj, oproj):
+        srs = []
+        for proj in (iproj, oproj):
+            srs.append(osr.SpatialReference())
+            if srs[-1].ImportFromEPSG(proj) != 0:
+                raise happyError('projection EPSG:%s not recognised' % proj)
+            try:    # GDAL >= 3: ensure the traditional GIS order (Lon,lat) 
+                srs[-1].SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+            except AttributeError:
+                pass
+        transformer = osr.CoordinateTransformation(*srs)
+        def func(x, y):
+            xy = np.asarray(transformer.TransformPoints(np.column_stack([x, y]).tolist()))
+            return xy[:,0], xy[:,1]
+        return func
+
+    #/************************************************************************/
+    @classmethod
+    def __builtin_transformer(cls, iproj, oproj):
+        projections = {4326: None, 4258: None, 3857: cls.__mercator, 3035: cls.__laea}
+        if not(iproj in projections and oproj in projections):
+            raise happyError('transformation from EPSG:%s to EPSG:%s not supported by builtin engine' % (iproj, oproj))
+        inverse, forward = projections[iproj], projections[oproj]
+        def func(x, y):
+            # convert coordinates through geographic coordinates
+            if inverse is not None:
+                x, y = inverse(x, y, inverse=True)
+            if forward is not None:
+                x, y = forward(x, y)
+            return x, y
+        return func
+
+    #/************************************************************************/
+    @classmethod
+    def __mercator(cls, x, y, inverse=False):
+        # Web Mercator projection (EPSG:3857), spherical
+        if inverse is False:
+            return (np.radians(x) * cls.A,
+                    np.log(np.tan(np.pi / 4 + np.radians(y) / 2)) * cls.A)
+        return (np.degrees(x / cls.A),
+                np.degrees(2 * np.arctan(np.exp(y / cls.A)) - np.pi / 2))
+
+    #/************************************************************************/
+    @classmethod
+    def __laea(cls, x, y, inverse=False):
+        # LAEA Europe projection (EPSG:3035), ellipsoidal; see EPSG guidance note 7-2
+        e2 = 2 * cls.F - cls.F**2
+        e = math.sqrt(e2)
+        q = lambda s: (1 - e2) * (s / (1 - e2 * s**2) - np.log((1 - e * s) / (1 + e * s)) / (2 * e))
+        qp = q(1.)
+        rq = cls.A * math.sqrt(qp / 2)
+        beta0 = math.asin(q(math.sin(cls.LAT0)) / qp)
+        d = cls.A * math.cos(cls.LAT0) / math.sqrt(1 - e2 * math.sin(cls.LAT0)**2) / (rq * math.cos(beta0))
+        if inverse is False:
+            lon, lat = np.radians(x), np.radians(y)
+            beta = np.arcsin(q(np.sin(lat)) / qp)
+            b = rq * np.sqrt(2 / (1 + math.sin(beta0) * np.sin(beta)                      \
+                                  + math.cos(beta0) * np.cos(beta) * np.cos(lon - cls.LON0)))
+            return (cls.FE + b * d * np.cos(beta) * np.sin(lon - cls.LON0),
+                    cls.FN + b / d * (math.cos(beta0) * np.sin(beta)
+                                      - math.sin(beta0) * np.cos(beta) * np.cos(lon - cls.LON0)))
+        x, y = x - cls.FE, y - cls.FN
+        rho = np.sqrt((x / d)**2 + (d * y)**2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = 2 * np.arcsin(rho / (2 * rq))
+            beta = np.arcsin(np.cos(c) * math.sin(beta0) + d * y * np.sin(c) * math.cos(beta0) / rho)
+            lon = cls.LON0 + np.arctan2(x * np.sin(c),
+                                        d * rho * math.cos(beta0) * np.cos(c) - d**2 * y * math.sin(beta0) * np.sin(c))
+        # the projection centre is mapped onto the origin of the projection
+        beta, lon = np.where(rho == 0, beta0, beta), np.where(rho == 0, cls.LON0, lon)
+        lat = beta + (e2 / 3 + 31 * e2**2 / 180 + 517 * e2**3 / 5040) * np.sin(2 * beta)     \
+            + (23 * e2**2 / 360 + 251 * e2**3 / 3780) * np.sin(4 * beta)                      \
+            + (761 * e2**3 / 45360) * np.sin(6 * beta)
+        lat = np.where(rho == 0, cls.LAT0, lat)
+        return np.degrees(lon), np.degrees(lat)
 
 #%%
 #==============================================================================
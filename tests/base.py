@@ -13,9 +13,10 @@ Unit test of module :mod:`happygisco.base`
     
 **Dependencies**
 
-*call*:         :mod:`happygisco.tests.base`, :mod:`happygisco.settings`
+*call*:         :mod:`happygisco.tests.base`, :mod:`happygisco.settings`, :mod:`happygisco.services`
                 
-*require*:      :mod:`unittest`, :mod:`warnings`
+*require*:      :mod:`unittest`, :mod:`warnings`, :mod:`os`, :mod:`io`, :mod:`time`, :mod:`json`, :mod:`tempfile`, :mod:`zipfile`, :mod:`gc`, :mod:`weakref`,
+                :mod:`threading`, :mod:`http.server`
 """
 
 # *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_ 
@@ -39,9 +40,18 @@ metadata.update({
 #==============================================================================
 
 import unittest
+import os, io, time, json, gzip, asyncio, threading, tempfile, zipfile
+import collections, email.utils
+import gc, weakref, hashlib, sqlite3
+from unittest import mock
+import concurrent.futures
+from http.server import HTTPServer, BaseHTTPRequestHandler
 
+from happygisco import settings, base
 from happygisco.settings import happyError
-from happygisco.base import _Decorator
+from happygisco.base import _Decorator, _Memoized, _Service, _DiskCache, _SingleFlight, _MemoryCache
+from happygisco.base import _JSONBackend, _NegativeCache, _CacheStats, _RateLimiter
+from happygisco.services import GISCOService
 
 #==============================================================================
 # GLOBAL VARIABLES/METHODS
@@ -201,12 +211,629 @@ class _DecoratorTestCase(unittest.TestCase):
         self.assertRaises(happyError,
                           new_func(year=2000))
 
+#/****************************************************************************/
+# _MemoizedTestCase
+#/****************************************************************************/
+class _MemoizedTestCase(unittest.TestCase):
+    """Class of tests for class :class:`_Memoized`
+    """    
+    module = 'base'
+
+    #/************************************************************************/
+    def test_1_keys(self):
+        calls = []
+        @_Memoized
+        def func(*args, **kwargs):
+            calls.append(args)
+            return len(calls)
+        self.assertEqual(func([1, -1]), 1)
+        self.assertEqual(func([1, -1]), 1)
+        self.assertEqual(func((1, -1)), 2) # list and tuple differ
+        self.assertEqual(func(a={'x': [1, 2]}, b=1), 3)
+        self.assertEqual(func(b=1, a={'x': [1, 2]}), 3)
+        self.assertEqual(func(object), 4)
+        self.assertEqual(func.stats['hits'], 2)
+        self.assertEqual(func.stats['misses'], 4)
+        class unhashable(object):
+            __hash__ = None
+        self.assertEqual(func(unhashable()), 5)
+        self.assertEqual(func.stats['size'], 4)
+
+    #/************************************************************************/
+    def test_2_eviction(self):
+        func = _Memoized(maxsize=2, ttl=None)(lambda x: [x])
+        func(1), func(2), func(1), func(3)
+        self.assertEqual(list(func.cache.keys()), [func.key(1), func.key(3)])
+        self.assertEqual(func.stats['evictions'], 1)
+        func = _Memoized(ttl=0.01, copy=True)(lambda x: [x])
+        res = func(1)
+        res.append(2)
+        self.assertEqual(func(1), [1])
+        time.sleep(0.02)
+        func(1)
+        self.assertEqual(func.stats['expired'], 1)
+        func.clear()
+        self.assertEqual(func.stats['size'], 0)
+        self.assertRaises(happyError, _Memoized, maxsize=0)
+
+    #/************************************************************************/
+    def test_3_method(self):
+        data = {'type': 'FeatureCollection',
+                'features': [{'type': 'Feature', 'properties': {'name': 'Paris'},
+                              'geometry': {'type': 'Point', 'coordinates': [2.35, 48.85]}},
+                             {'type': 'Feature', 'properties': {'name': 'Paris'},
+                              'geometry': {'type': 'Point', 'coordinates': [-95.55, 33.66]}}]}
+        GISCOService.place2coord.clear()
+        with mock.patch.object(_Service, 'read_urls', side_effect=lambda url, **kw: iter([data for u in url])) as read:
+            serv1, serv2 = GISCOService(), GISCOService()
+            self.assertEqual(serv1.place2coord('Paris', unique=True), [48.85, 2.35])
+            self.assertEqual(serv1.place2coord('Paris', unique=True), [48.85, 2.35])
+            self.assertEqual(read.call_count, 1)
+            coord = serv1.place2coord('Paris')
+            self.assertEqual(coord, [[48.85, 2.35], [33.66, -95.55]])
+            coord.append(None) # outputs are copies of the cached values
+            self.assertEqual(len(serv1.place2coord('Paris')), 2)
+            self.assertEqual(serv2.place2coord(place='Paris', unique=True), [48.85, 2.35])
+            self.assertEqual(read.call_count, 3)
+        self.assertEqual(GISCOService.place2coord.stats['size'], 3)
+        # the cache holds no reference to the services: their entries go with them
+        ref = weakref.ref(serv1)
+        del serv1
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(GISCOService.place2coord.stats['size'], 1)
+        GISCOService.place2coord.clear()
+
+#/****************************************************************************/
+# _DiskCacheTestCase
+#/****************************************************************************/
+class _DiskCacheTestCase(unittest.TestCase):
+    """Class of tests for class :class:`_DiskCache`
+    """    
+    module = 'base'
+
+    #/************************************************************************/
+    def test_1_store(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = _DiskCache(root, max_size=25)
+            path = cache.put('http://a', b'0123456789', etag='"x"')
+            self.assertEqual(path, os.path.join(root, cache.key('http://a')[:2], 
+                                                cache.key('http://a')[2:4], cache.key('http://a')))
+            self.assertEqual(cache.get('http://a'), b'0123456789')
+            self.assertEqual(cache.lookup('http://a')['etag'], '"x"')
+            self.assertTrue(cache.is_fresh('http://a') and not cache.is_fresh('http://a', 0))
+            self.assertEqual(cache.get('http://b'), None)
+            cache.put('http://b', b'0123456789')
+            cache.get('http://a') # http://b becomes the least recently used
+            cache.put('http://c', b'0123456789')
+            self.assertEqual((len(cache), cache.size), (2, 20))
+            self.assertTrue('http://a' in cache and 'http://b' not in cache)
+            self.assertEqual(cache.clean(), 2)
+            self.assertEqual(len(cache), 0)
+            # flat files from former versions are adopted
+            with open(os.path.join(root, cache.key('http://d')), 'wb') as f:
+                f.write(b'd')
+            self.assertEqual(cache.get('http://d'), b'd')
+            self.assertFalse(os.path.exists(os.path.join(root, cache.key('http://d'))))
+            cache.close()
+            self.assertEqual(_DiskCache(root).size, 1) # the index persists
+            
+    #/************************************************************************/
+    def test_2_compression(self):
+        self.assertEqual(_DiskCache.codec('application/zip'), None)
+        self.assertIn(_DiskCache.codec('application/json; charset=utf-8'), ('zstd', 'gzip'))
+        # files read by GDAL from the cache are never compressed with zstd
+        with mock.patch.object(_DiskCache, 'CODECS', ('gzip', 'zstd')):
+            self.assertEqual(_DiskCache.codec('application/json', 'http://h/api?q=x'), 'zstd')
+            self.assertEqual(_DiskCache.codec('application/geo+json', 'http://h/NUTS_RG_20M_2013_4326_LEVL_0.geojson'), 'gzip')
+            with mock.patch.object(settings, 'DEF_CACHE_CODECS', ('zstd',)):
+                self.assertEqual(_DiskCache.codec('application/json', 'http://h/NUTS_RG_20M_2013_4326.geojson'), None)
+        content = b'{"type": "Feature", "geometry": {"coordinates": [0.0, 0.0]}}' * 1000
+        with tempfile.TemporaryDirectory() as root:
+            cache = _DiskCache(root)
+            path = cache.put('http://a.geojson', content, codec='gzip')
+            self.assertEqual(cache.get('http://a.geojson'), content)
+            self.assertEqual(cache.lookup('http://a.geojson')['codec'], 'gzip')
+            self.assertTrue(cache.size < len(content) / 10)
+            with open(path, 'rb') as f: # a standard gzip file
+                self.assertEqual(gzip.decompress(f.read()), content)
+            self.assertRaises(happyError, cache.put, 'http://b', content, codec='lzma')
+            cache.close()
+
+    def test_3_bundle(self):
+        content = b'{"NUTS_ID": "IT"}' * 100
+        with tempfile.TemporaryDirectory() as root:
+            cache = _DiskCache(os.path.join(root, 'a'))
+            cache.put('http://a.json', content, codec='gzip', etag='"v1"')
+            cache.put('http://b.zip', b'PK\x05\x06' + b'\x00' * 18)
+            bundle = os.path.join(root, 'bundle.zip')
+            self.assertEqual(cache.export_bundle(bundle), 2)
+            other = _DiskCache(os.path.join(root, 'b'))
+            self.assertEqual(other.import_bundle(bundle), 2)
+            self.assertEqual(other.get('http://a.json'), content)
+            entry, orig = other.lookup('http://a.json'), cache.lookup('http://a.json')
+            self.assertEqual([entry[k] for k in ('fetched', 'etag', 'codec', 'size')],
+                             [orig[k] for k in ('fetched', 'etag', 'codec', 'size')])
+            self.assertEqual((len(other), other.size), (2, cache.size))
+            self.assertEqual(other.import_bundle(bundle), 0) # nothing newer
+            # a corrupted bundle is rejected as a whole
+            corrupted = os.path.join(root, 'corrupted.zip')
+            with zipfile.ZipFile(bundle) as zin, zipfile.ZipFile(corrupted, 'w') as zout:
+                for info in zin.infolist():
+                    data = zin.read(info.filename)
+                    zout.writestr(info, data if info.filename.endswith('.json') or not data.startswith(b'PK') 
+                                  else data[:-1] + b'\x01')
+            third = _DiskCache(os.path.join(root, 'c'))
+            self.assertRaises(happyError, third.import_bundle, corrupted)
+            self.assertEqual(len(third), 0)
+            self.assertFalse(any(f.startswith('.tmp') for _, _, files in os.walk(third.root) for f in files))
+            # files are located after the bundle index, not after the settings of the importer
+            with mock.patch.object(_DiskCache, 'key', staticmethod(lambda url: hashlib.sha1(url.encode()).hexdigest())):
+                fourth = _DiskCache(os.path.join(root, 'd'))
+                self.assertEqual(fourth.import_bundle(bundle), 2)
+                self.assertEqual(fourth.get('http://a.json'), content)
+            # cached files are left untouched when the index cannot be committed
+            cache.put('http://a.json', b'{}', etag='"v2"')
+            cache.export_bundle(bundle)
+            with mock.patch.object(other, '_DiskCache__index', side_effect=sqlite3.OperationalError):
+                self.assertRaises(sqlite3.OperationalError, other.import_bundle, bundle)
+            self.assertEqual((other.get('http://a.json'), other.lookup('http://a.json')['etag']), (content, '"v1"'))
+            self.assertFalse(any(f.startswith('.tmp') for _, _, files in os.walk(other.root) for f in files))
+            [c.close() for c in (cache, other, third, fourth)]
+
+    def test_4_canonical(self):
+        url = 'https://europa.eu/webtools/rest/gisco/nuts/find-nuts.py?f=JSON&x=13.3888599&y=52.5170365'
+        for variant in ('HTTP://Europa.EU:80/webtools/rest/gisco/nuts/find-nuts.py?y=52.51703650&x=13.3888599&f=JSON',
+                        'https://europa.eu//webtools/rest/gisco/nuts/find-nuts.py?x=13.38885990001&f=JSON&y=52.5170365#top'):
+            self.assertEqual(_DiskCache.canonical(variant), url)
+            self.assertEqual(_DiskCache.key(variant), _DiskCache.key(url))
+        self.assertEqual(_DiskCache.canonical('https://ec.europa.eu/a/b/'), 'https://ec.europa.eu/a/b')
+        # codes and repeated parameters are preserved
+        self.assertEqual(_DiskCache.canonical('https://h/x?unit=01&v=2&v=1'), 'https://h/x?unit=01&v=2&v=1')
+        self.assertNotEqual(_DiskCache.key('https://h/x?y=1.5'), _DiskCache.key('https://h/x?y=1.6'))
+        with tempfile.TemporaryDirectory() as root:
+            cache = _DiskCache(root)
+            cache.put(url, b'{}')
+            self.assertEqual(cache.get('http://europa.eu/webtools/rest/gisco/nuts/find-nuts.py?y=52.5170365&f=JSON&x=13.3888599'), b'{}')
+            cache.close()
+
+#/****************************************************************************/
+# _JSONBackendTestCase
+#/****************************************************************************/
+class _JSONBackendTestCase(unittest.TestCase):
+    """Class of tests for class :class:`_JSONBackend`
+    """    
+    module = 'base'
+
+    #/************************************************************************/
+    def test_1_loads(self):
+        default = _JSONBackend.backend
+        try:
+            for backend in _JSONBackend.BACKENDS:
+                self.assertEqual(_JSONBackend.use(backend), backend)
+                self.assertEqual(_JSONBackend.loads(b'{"NUTS_ID": "BE", "LEVL_CODE": 0}'), 
+                                 {'NUTS_ID': 'BE', 'LEVL_CODE': 0})
+                self.assertEqual(_JSONBackend.loads('["BE"]'), ['BE'])
+                # non UTF-8 contents are decoded as a last resort
+                self.assertEqual(_JSONBackend.loads('{"n": "Liège"}'.encode('latin-1'), encoding='latin-1'), 
+                                 {'n': 'Liège'})
+                self.assertEqual(_JSONBackend.loads(b'\xef\xbb\xbf{"n": 1}'), {'n': 1}) # BOM
+                self.assertRaises(happyError, _JSONBackend.loads, b'{"n": ')
+        finally:
+            _JSONBackend.use(default)
+        self.assertRaises(happyError, _JSONBackend.use, 'yaml')
+
+#/****************************************************************************/
+# _ServiceTestCase
+#/****************************************************************************/
+class _ServiceTestCase(unittest.TestCase):
+    """Class of tests for class :class:`_Service`
+    """    
+    module = 'base'
+
+    #/************************************************************************/
+    def serve(self, do_GET, **attrs):
+        """Start a local HTTP server answering GET requests with :data:`do_GET`, 
+        and return its base URL; the server is shut down at the end of the test.
+        """
+        attrs.update({'do_GET': do_GET, 'log_message': lambda handler, *args: None})
+        self.server = HTTPServer(('127.0.0.1', 0), type('handler', (BaseHTTPRequestHandler,), attrs))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        return 'http://127.0.0.1:%s' % self.server.server_port
+
+    #/************************************************************************/
+    @staticmethod
+    def reply(handler, body=b'', status=200, headers=None):
+        """Send a complete response from a request handler.
+        """
+        handler.send_response(status)
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    #/************************************************************************/
+    def test_1_pool(self):
+        with _Service(cache_store=False, pool_limit=20, pool_per_host=4) as serv:
+            self.assertEqual((serv.pool_limit, serv.pool_per_host), (20, 4))
+            if serv.session is not None: # sequential case
+                for adapter in serv.session.adapters.values():
+                    # pool_limit is split into 20 // 4 host pools of 4 connections
+                    self.assertEqual((adapter._pool_connections, adapter._pool_maxsize), (5, 4))
+                    self.assertEqual(adapter.poolmanager.pools._maxsize, 5)
+                    self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 4)
+        serv.close() # closing twice does no harm
+        self.assertRaises(happyError, _Service, pool_per_host=0)
+
+    #/************************************************************************/
+    def test_2_read_urls(self):
+        def do_GET(handler):
+            i = int(handler.path.strip('/'))
+            time.sleep(0.01 * (i % 3)) # answers come out of order
+            self.reply(handler, json.dumps({'i': i}).encode(), status=200 if i >= 0 else 404,
+                       headers={'Content-Type': 'application/json'})
+        base = self.serve(do_GET)
+        url = ['%s/%s' % (base, i) for i in range(12)]
+        with _Service(cache_store=False, workers=4) as serv:
+            data = list(serv.read_urls(url, ofmt='json'))
+            self.assertEqual([d['i'] for d in data], list(range(12)))
+            self.assertRaises(happyError, list, serv.read_urls(url[:1] + [url[0][:-1] + '-1'], ofmt='json'))
+            self.assertRaises(happyError, serv.read_url, url[0][:-1] + '-1', ofmt='json')
+            self.assertEqual(serv.read_url(url[5], ofmt='json'), {'i': 5}) # no HEAD handler
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root) as serv:
+                self.assertEqual(serv.read_url(url[3], ofmt='json'), {'i': 3})
+                self.server.shutdown() # the cache is now the only source
+                self.assertEqual(serv.read_url(url[3], ofmt='json'), {'i': 3})
+                self.assertTrue(serv.is_cached(url[3]))
+                self.assertEqual(serv.disk_cache.lookup(url[3])['codec'], _DiskCache.codec('application/json'))
+                serv.clean_cache(url[3])
+                self.assertFalse(serv.is_cached(url[3]))
+        throttle, start = _RateLimiter(rps=50), time.monotonic()
+        [throttle.wait() for _ in range(6)]
+        self.assertTrue(time.monotonic() - start >= 0.09)
+
+    #/************************************************************************/
+    def test_3_revalidation(self):
+        sent = []
+        def do_GET(handler):
+            if handler.headers.get('If-None-Match') == '"v1"':
+                self.reply(handler, status=304)
+                return
+            sent.append(handler.path)
+            self.reply(handler, b'{"v": 1}', headers={'ETag': '"v1"'})
+        url = self.serve(do_GET) + '/bulk.zip'
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, expire_after=0) as serv: # always expired
+                fetched = [serv.read_url(url, ofmt='json') for _ in range(3)]
+                self.assertEqual(fetched, [{'v': 1}] * 3)
+                self.assertEqual(len(sent), 1) # the body was transferred once
+                self.assertEqual(serv.disk_cache.lookup(url)['etag'], '"v1"')
+
+    #/************************************************************************/
+    def test_4_streaming(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            zf.writestr('nuts.geojson', '{"type": "FeatureCollection", "features": []}')
+        url = self.serve(lambda handler: self.reply(handler, buf.getvalue())) + '/ref-nuts-2016-60m.geojson.zip'
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, pool_limit=1, pool_per_host=1) as serv:
+                self.assertEqual(serv.read_url(url, ofmt='zip', namelist=True), ['nuts.geojson'])
+                self.assertEqual(serv.read_url(url, ofmt='zip', read='nuts.geojson'), 
+                                 b'{"type": "FeatureCollection", "features": []}')
+                self.assertEqual(serv.get_response(url).content, buf.getvalue())
+                for fmt in ('bytes', 'text'): # the cached file is closed once read
+                    resp = serv.get_response(url)
+                    self.assertFalse(resp.raw.closed)
+                    serv.read_response(resp, ofmt=fmt)
+                    self.assertTrue(resp.raw.closed)
+                async def fetch():
+                    resp = await serv.aget_response(url)
+                    await serv.aclose()
+                    return resp
+                resp = asyncio.run(fetch()) # the archive is left on disk as well
+                self.assertFalse(isinstance(resp.raw, bytes) or resp.raw.closed)
+                self.assertEqual(serv.read_response(resp, ofmt='zip', namelist=True), ['nuts.geojson'])
+                self.assertTrue(resp.raw.closed)
+                self.assertEqual(serv.disk_cache.lookup(url)['codec'], None) # binary
+                self.assertEqual([f for _, _, files in os.walk(root) for f in files if f.startswith('.tmp')], [])
+
+    #/************************************************************************/
+    def test_5_async(self):
+        base = self.serve(lambda handler: self.reply(handler, json.dumps({'i': int(handler.path.strip('/'))}).encode()))
+        url = ['%s/%s' % (base, i) for i in range(6)]
+        async def main(serv):
+            single = await serv.aread_url(url[0], ofmt='json')
+            many = await serv.aget_response(*url, workers=3)
+            bridged = await serv._arun(lambda: list(serv.read_urls(url, ofmt='json')))
+            await serv.aclose()
+            return single, [json.loads(r.content) for r in many], bridged
+        with _Service(cache_store=False) as serv:
+            single, many, bridged = asyncio.run(main(serv))
+            self.assertEqual(single, {'i': 0})
+            self.assertEqual(many, [{'i': i} for i in range(6)])
+            self.assertEqual(bridged, many)
+
+    #/************************************************************************/
+    def test_6_coalescing(self):
+        sent = []
+        def do_GET(handler):
+            sent.append(handler.path)
+            time.sleep(0.2) # long enough for the requests to overlap
+            self.reply(handler, b'{"city": "Roma"}')
+        url = self.serve(do_GET) + '/roma'
+        with _Service(cache_store=False, workers=8) as serv:
+            self.assertEqual(list(serv.read_urls([url] * 8, ofmt='json')), [{'city': 'Roma'}] * 8)
+            self.assertEqual(len(sent), 1)
+            self.assertEqual(len(serv.get_response(url, url, url)), 3)
+            self.assertEqual(len(sent), 2) # repeated within a single call
+            async def main():
+                resp = await serv.aget_response(*[url] * 5)
+                await serv.aclose()
+                return resp
+            self.assertEqual(len(asyncio.run(main())), 5)
+            self.assertEqual(len(sent), 3)
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, workers=8) as serv:
+                self.assertEqual(list(serv.read_urls([url] * 8, ofmt='json')), [{'city': 'Roma'}] * 8)
+                self.assertEqual(len(sent), 4)
+        flight, calls = _SingleFlight(), []
+        def slow(x):
+            calls.append(x)
+            time.sleep(0.1)
+            return x
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            res = list(executor.map(lambda _: flight.do('k', slow, 1), range(4)))
+        self.assertEqual((res, calls, flight.coalesced), ([1] * 4, [1], 3))
+
+    #/************************************************************************/
+    def test_7_memory(self):
+        memo = _MemoryCache(80, ttl=0.05)
+        self.assertTrue(memo.put('a', b'0123456789', 10) and memo.put('b', b'0123456789', 10))
+        self.assertFalse(memo.put('c', b'0' * 20, 20)) # too large
+        memo.get('a') # 'b' becomes the least recently used
+        [memo.put(k, b'0123456789', 10) for k in 'defghij']
+        self.assertTrue('a' in memo and 'b' not in memo)
+        self.assertEqual((len(memo), memo.size, memo.stats['evictions']), (8, 80, 1))
+        time.sleep(0.06)
+        self.assertEqual(memo.get('a'), None)
+        self.assertEqual(memo.stats['expired'], 1)
+        url = self.serve(lambda handler: self.reply(handler, b'{"NUTS_ID": "IT"}', 
+                                                    headers={'Content-Type': 'application/json'})) + '/nuts.json'
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, memory_size=1024**2) as serv:
+                data = serv.read_url(url, ofmt='json')
+                os.remove(serv.disk_cache.path(url)) # hot responses do not hit the disk
+                self.assertTrue(serv.read_url(url, ofmt='json') is data) # shared, not copied
+                copied = serv.read_url(url, ofmt='json', _copy_=True)
+                copied['NUTS_ID'] = 'FR' # a copy can be altered
+                self.assertEqual(serv.read_url(url, ofmt='json'), {'NUTS_ID': 'IT'})
+                self.assertEqual(serv.get_response(url).content, b'{"NUTS_ID": "IT"}')
+                self.assertEqual(serv.memory_cache.stats['hits'], 7)
+                serv.clean_cache(url, expire_after=0)
+                self.assertEqual(len(serv.memory_cache), 0)
+                self.assertEqual(serv.read_url(url, ofmt='json'), data)
+                self.assertTrue(os.path.exists(serv.disk_cache.path(url)))
+
+    #/************************************************************************/
+    def test_8_prefetch(self):
+        hits = []
+        def do_GET(handler):
+            hits.append(handler.path)
+            if handler.path.startswith('/missing'):
+                handler.send_error(404)
+            else:
+                self.reply(handler, handler.path.encode())
+        base = self.serve(do_GET)
+        urls = ['%s/%s' % (base, p) for p in ('a', 'b', 'c', 'missing')]
+        with tempfile.TemporaryDirectory() as root:
+            manifest, events = os.path.join(root, 'manifest.jsonl'), []
+            with _Service(cache_store=root) as serv:
+                report = serv.prefetch(urls, workers=3, manifest=manifest, 
+                                       progress=lambda *args: events.append(args))
+                self.assertEqual((report['total'], report['downloaded'], report['skipped']), (4, 3, 0))
+                self.assertEqual(list(report['failed'].keys()), [urls[-1]])
+                self.assertEqual(sorted(e[0] for e in events), [1, 2, 3, 4])
+                self.assertTrue(all(serv.is_cached(u) for u in urls[:-1]))
+                with open(manifest) as f:
+                    entries = [json.loads(line) for line in f]
+                self.assertEqual(sorted(e['status'] for e in entries), ['failed', 'ok', 'ok', 'ok'])
+                del hits[:]
+                report = serv.prefetch(urls, manifest=manifest) # resume: only failures are retried
+                self.assertEqual((report['downloaded'], report['skipped'], len(report['failed'])), (0, 3, 1))
+                self.assertEqual(hits, ['/missing'])
+
+    #/************************************************************************/
+    def test_9_negative(self):
+        negative = _NegativeCache(ttl=0.05)
+        negative.put('https://h/find?y=1.0&x=2', status=404)
+        self.assertEqual(negative.get('https://h/find?x=2&y=1')['status'], 404) # canonical form
+        time.sleep(0.06)
+        self.assertEqual((negative.get('https://h/find?x=2&y=1'), len(negative)), (None, 0))
+        self.assertEqual(_NegativeCache.status(happyError(errtype=happyError('', errcode=410))), 410)
+        hits = []
+        def do_GET(handler):
+            hits.append(handler.path)
+            if handler.path.startswith('/missing'):
+                handler.send_error(404)
+            elif handler.path.startswith('/broken'):
+                handler.send_error(500)
+            else:
+                self.reply(handler, b'{"features": [1]}' if handler.path.startswith('/found') else b'{"features": []}',
+                           headers={'Content-Type': 'application/json'})
+        base = self.serve(do_GET)
+        urls = ['%s/%s' % (base, p) for p in ('found', 'empty', 'missing')]
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, workers=2) as serv:
+                data = list(serv.read_lookups(urls, key='features'))
+                self.assertEqual(data, [{'features': [1]}, {'features': []}, []])
+                self.assertEqual(sorted(hits), ['/empty', '/found', '/missing'])
+                self.assertRaises(happyError, list, serv.read_lookups([urls[0].replace('found', 'broken')]))
+                self.assertEqual(len(serv.negative_cache), 2)
+            del hits[:]
+            with _Service(cache_store=root) as serv: # remembered across runs
+                self.assertFalse(serv.is_cached(urls[1]))
+                self.assertEqual(list(serv.read_lookups(urls, key='features')), [{'features': [1]}, [], []])
+                self.assertEqual(hits, []) # found in the disk cache, unresolved in the negative one
+            with _Service(cache_store=root, negative_ttl=0) as serv: 
+                self.assertEqual(serv.negative_cache, None)
+                self.assertEqual(len(list(serv.read_lookups(urls[:2]))), 2)
+                self.assertEqual(hits, ['/empty'])
+
+    #/************************************************************************/
+    def test_10_stats(self):
+        stats = _CacheStats()
+        self.assertEqual([stats.family(u) for u in ('https://europa.eu/webtools/rest/gisco/nuts/find-nuts.py?x=1&y=2',
+                                                    'https://europa.eu/webtools/rest/gisco/api?q=Berlin',
+                                                    'https://nominatim.openstreetmap.org/reverse?lat=1&lon=2',
+                                                    'https://ec.europa.eu/eurostat/cache/GISCO/distribution/v2/nuts/download/ref-nuts-2013-01m.geojson.zip',
+                                                    'https://ec.europa.eu/eurostat/cache/GISCO/distribution/v2/nuts/geojson/NUTS_RG_20M_2013_4326_LEVL_0.geojson',
+                                                    'https://h/elsewhere')],
+                         ['findnuts', 'geocode', 'reverse', 'bulk', 'distribution', 'other'])
+        def do_GET(handler):
+            if handler.headers.get('If-None-Match') == '"v1"':
+                self.reply(handler, status=304)
+            else:
+                self.reply(handler, b'{"type": "FeatureCollection", "features": []}',
+                           headers={'Content-Type': 'application/json', 'ETag': '"v1"'})
+        base = self.serve(do_GET)
+        urls = [base + '/distribution/v2/nuts/a.geojson', base + '/distribution/v2/nuts/b.geojson', base + '/api?q=x']
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root, negative_ttl=0) as serv:
+                [serv.read_url(u, ofmt='json') for u in urls + urls[:1]]
+                report = serv.cache_stats.report()
+                self.assertEqual([report['distribution'][k] for k in ('hits', 'misses')], [1, 2])
+                self.assertEqual(report['distribution']['hit_rate'], 1/3)
+                self.assertEqual(report['geocode']['misses'], 1)
+                self.assertEqual(report['total']['bytes_written'], serv.disk_cache.size)
+                self.assertTrue(report['total']['network_time'] > 0 and report['total']['disk_time'] > 0)
+                time.sleep(0.01)
+                serv.read_url(urls[0], ofmt='json', expire_after=0.005) # revalidated, not downloaded
+                self.assertEqual([serv.cache_stats.report('distribution')[k] for k in ('revalidations', 'misses')], 
+                                 [1, 2])
+                entries = serv.cache_entries(sort='url')
+                self.assertEqual([e['url'] for e in entries], sorted(urls))
+                self.assertTrue(all(e['age'] >= 0 and e['size'] > 0 for e in entries))
+                self.assertEqual([e['url'] for e in serv.cache_entries(family='geocode')], [urls[2]])
+                self.assertEqual(serv.cache_entries(urls[1])[0]['family'], 'distribution')
+                serv.cache_stats.reset()
+                self.assertEqual(serv.cache_stats.report()['total']['hits'], 0)
+
+    #/************************************************************************/
+    def test_11_hooks(self):
+        base = self.serve(lambda handler: self.reply(handler, b'{"features": [{"NUTS_ID": "DE3"}]}',
+                                                     headers={'Content-Type': 'application/json'}),
+                          protocol_version='HTTP/1.1') # keep-alive
+        urls = ['%s/nuts/find-nuts.py?x=%s&y=52.5' % (base, x) for x in (13.3, 13.4)]
+        with tempfile.TemporaryDirectory() as root:
+            with _Service(cache_store=root) as serv:
+                events, requests = [], []
+                serv.add_hook(events.append)
+                serv.add_hook(requests.append, events='request')
+                self.assertRaises(happyError, serv.add_hook, events.append, events='dns')
+                [serv.read_url(u, ofmt='json') for u in urls + urls[:1]]
+                self.assertEqual([e['event'] for e in events], ['request', 'cache', 'decode'] * 2 + ['cache', 'decode'])
+                self.assertEqual(set(e['family'] for e in events), {'findnuts'})
+                self.assertEqual([e['lookup'] for e in events if e['event'] == 'cache'], ['downloaded'] * 2 + ['fresh'])
+                self.assertEqual(len(requests), 2)
+                first, second = requests
+                self.assertEqual((first['status'], first['size'], first['retries']), (200, 34, 0))
+                self.assertTrue(first['connect'] > 0 and second['connect'] == 0) # pooled connection
+                self.assertTrue(0 < first['ttfb'] <= first['elapsed'])
+                self.assertTrue(all(e['decode_time'] >= 0 and e['size'] == 34 for e in events if e['event'] == 'decode'))
+                serv.remove_hook(events.append)
+                serv.add_hook(lambda e: 1 / 0, events='cache') # errors in hooks are ignored
+                serv.read_url(urls[1], ofmt='json')
+                self.assertEqual(len(events), 8)
+
+    #/************************************************************************/
+    def test_12_backoff(self):
+        limiter = _RateLimiter({'h': 10}, concurrency=4)
+        url = 'https://h/api?q=x'
+        self.assertTrue(all(0 <= limiter.backoff('https://other/', n) <= min(60, 0.5 * 2 ** n) for n in range(10)))
+        self.assertEqual(_RateLimiter.retry_after('2'), 2.)
+        self.assertTrue(0 < _RateLimiter.retry_after(email.utils.formatdate(time.time() + 30, usegmt=True)) <= 30)
+        limiter.acquire(url)
+        limiter.release(url, 429, 0.1)
+        self.assertEqual(limiter.state(url)['limit'], 2.) # multiplicative decrease
+        for _ in range(4):
+            limiter.acquire(url)
+            limiter.release(url, 200, 0.1)
+        self.assertTrue(2. < limiter.state(url)['limit'] <= 4.) # additive increase
+        hits = collections.Counter()
+        def do_GET(handler):
+            hits[handler.path] += 1
+            if handler.path == '/throttled' and hits[handler.path] == 1:
+                self.reply(handler, status=429, headers={'Retry-After': '0.3'})
+            elif handler.path == '/down':
+                self.reply(handler, status=503, headers={'Retry-After': '0'})
+            else:
+                self.reply(handler, b'{}')
+        base = self.serve(do_GET)
+        host = base.split('://')[-1]
+        with _Service(cache_store=False, retries=2, rate_limits={host: 20}) as serv:
+            requests = []
+            serv.add_hook(requests.append, events='request')
+            start = time.monotonic()
+            self.assertEqual(serv.read_url('%s/throttled' % base, ofmt='json'), {})
+            self.assertTrue(time.monotonic() - start >= 0.3) # Retry-After honored
+            self.assertEqual((hits['/throttled'], requests[-1]['retries']), (2, 1))
+            self.assertRaises(happyError, serv.read_url, '%s/down' % base, ofmt='json')
+            self.assertEqual(hits['/down'], 3) # 1 + 2 retries
+            self.assertEqual(serv.limiter.state('%s/' % base)['rate'], 20)
+            start = time.monotonic()
+            [serv.read_url('%s/%s' % (base, i), ofmt='json') for i in range(6)]
+            self.assertTrue(time.monotonic() - start >= 0.25) # 20 requests per second
+
+    #/************************************************************************/
+    def test_13_wakeup(self):
+        limiter, url = _RateLimiter({}, concurrency=1), 'https://h/api'
+        limiter.acquire(url)
+        async def waiter():
+            start = time.monotonic()
+            await limiter.aacquire(url)
+            return time.monotonic() - start
+        async def cancelled():
+            await asyncio.wait_for(limiter.aacquire(url), 0.05)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            # coroutines of another thread/loop are woken up as soon as a slot is released
+            future = executor.submit(asyncio.run, waiter())
+            time.sleep(0.2)
+            self.assertFalse(future.done())
+            limiter.release(url, 200, 0.1)
+            self.assertTrue(0.2 <= future.result(timeout=1) < 1)
+        self.assertEqual(limiter.state(url)['inflight'], 1)
+        # a cancelled coroutine does not keep waiting for a slot
+        self.assertRaises(asyncio.TimeoutError, asyncio.run, cancelled())
+        self.assertEqual(limiter._RateLimiter__waiters, [])
+
+    #/************************************************************************/
+    def test_14_backend(self):
+        url = self.serve(lambda handler: self.reply(handler, b'{}')) + '/a.json'
+        with tempfile.TemporaryDirectory() as root:
+            # third-party caches, even installed, are not used unless asked for
+            with mock.patch.object(base, 'CACHECONTROL_INSTALLED', True):
+                with _Service(cache_store=root) as serv:
+                    self.assertEqual(serv.cache_backend, 'disk')
+                    self.assertEqual(serv.read_url(url, ofmt='json'), {})
+                    self.assertTrue(serv.is_cached(url) and len(serv.disk_cache) == 1)
+            self.assertRaises(happyError, _Service, cache_store=root, cache_backend='dumb')
+            if base.CACHECONTROL_INSTALLED is False:
+                self.assertRaises(happyError, _Service, cache_store=root, cache_backend='cachecontrol')
+
 #==============================================================================
 # MAIN METHOD AND TESTING AREA
 #==============================================================================
 
 def runtest():
     _runtest(_DecoratorTestCase)
+    _runtest(_MemoizedTestCase)
+    _runtest(_DiskCacheTestCase)
+    _runtest(_JSONBackendTestCase)
+    _runtest(_ServiceTestCase)
     return
     
 if __name__ == '__main__':
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+.. _mod_tests_benchmarks
+
+Benchmarks of the hot paths of :mod:`happygisco`.
+
+**About**
+
+Performance regressions are caught by comparing the timings of the benchmarks
+with baselines stored (per machine) in the JSON file :data:`BASELINE`.
+
+**Description**
+
+Benchmarks are grouped into suites, *i.e.* classes whose methods :literal:`time_*`
+are timed after :literal:`setup` ran, in the style of |asv|: network and cache
+accesses (against a local :class:`happygisco.stubs.StubServer`), geometry tools,
+decorators and nested dictionaries. A suite whose :literal:`setup` raises
+:class:`NotImplementedError` (*e.g.*, when an optional package is missing) is
+skipped.
+
+**Usage**
+
+    >>> from tests import benchmarks
+    >>> results = benchmarks.runbench()                       # run all suites
+    >>> results = benchmarks.runbench(save=True)              # store the baselines
+    >>> results = benchmarks.runbench(compare=True)           # check for regressions
+
+or, from the command line:
+
+    python -m tests.benchmarks [--filter REGEX] [--save] [--compare] [--factor 1.25]
+                               [--machine NAME] [--baseline FILE]
+
+which exits with status 1 when any benchmark is slower than its baseline by more
+than :literal:`factor`.
+
+**Dependencies**
+
+*call*:         :mod:`happygisco.base`, :mod:`happygisco.tools`, :mod:`happygisco.features`,
+                :mod:`happygisco.stubs`
+
+*require*:      :mod:`os`, :mod:`sys`, :mod:`re`, :mod:`json`, :mod:`time`, :mod:`timeit`,
+                :mod:`statistics`, :mod:`platform`, :mod:`tempfile`, :mod:`shutil`,
+                :mod:`itertools`, :mod:`asyncio`
+
+.. |asv| replace:: `airspeed velocity <https://asv.readthedocs.io>`_
+"""
+
+# *credits*:      `gjacopo <jacopo.grazzini@ec.europa.eu>`_
+# *since*:        Fri Oct 16 15:41:07 2026
+
+#==============================================================================
+# PROGRAM METADATA
+#==============================================================================
+
+from happygisco.metadata import metadata
+
+metadata = metadata.copy()
+metadata.update({
+                'date': 'Fri Oct 16 15:41:07 2026'
+                })
+
+#==============================================================================
+# IMPORT STATEMENTS
+#==============================================================================
+
+import os, sys, re
+import json
+import time, timeit
+import statistics
+import platform
+import tempfile, shutil
+import itertools
+import asyncio
+
+from happygisco import base, tools, features
+from happygisco.base import _Service, _Decorator, _NestedDict
+from happygisco.stubs import StubServer
+
+#==============================================================================
+# GLOBAL VARIABLES/METHODS
+#==============================================================================
+
+DATADIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks.json')
+"""File storing the baselines, indexed by machine.
+"""
+
+FACTOR = 1.25
+"""Default ratio of the timing of a benchmark over its baseline above which a
+regression is reported.
+"""
+
+CAPITALS = [[52.5170365, 13.3888599], [41.8933203, 12.4829321], [48.8566969, 2.3514616],
+            [54.6870458, 25.2829111], [38.7077507, -9.1365919], [40.4167047, -3.7035825],
+            [50.8465573, 4.351697], [59.3251172, 18.0710935], [60.1674881, 24.9427473],
+            [47.4983815, 19.0404707], [52.2319237, 21.0067265], [44.4361414, 26.1027202]]
+
+#==============================================================================
+# BENCHMARK SUITES
+#==============================================================================
+
+#/****************************************************************************/
+# ServiceSuite
+#/****************************************************************************/
+class ServiceSuite(object):
+    """Benchmarks of :meth:`base._Service.get_response` and :meth:`base._Service.cache_response`
+    against a local stand-in server, when the responses are (hit) or are not (miss)
+    cached.
+    """
+
+    def setup(self):
+        self.server = StubServer().start()
+        self.dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        self.serv = _Service(cache_store=self.dirs[0])
+        self.memo = _Service(cache_store=self.dirs[1], memory_size=2**22)
+        self.url = '%s/gisco/api?q=Berlin' % self.server.url
+        self.geojson = '%s/cache/nuts/geojson/NUTS_RG_01M_2013_4326_LEVL_1.geojson' % self.server.url
+        self.serv.get_response(self.url)
+        self.memo.get_response(self.url)
+        self.serv.read_url(self.geojson, ofmt='json')
+        self.memo.read_url(self.geojson, ofmt='json')
+        self.count = itertools.count()
+
+    def teardown(self):
+        self.serv.close()
+        self.memo.close()
+        self.server.stop()
+        [shutil.rmtree(d, ignore_errors=True) for d in self.dirs]
+
+    def time_get_response_nocache(self):
+        self.serv.get_response(self.url, cache_store=False)
+
+    def time_get_response_miss(self):
+        self.serv.get_response('%s&n=%s' % (self.url, next(self.count)))
+
+    def time_get_response_hit(self):
+        self.serv.get_response(self.url)
+
+    def time_get_response_memory_hit(self):
+        self.memo.get_response(self.url)
+
+    def time_read_url_json_hit(self):
+        self.serv.read_url(self.geojson, ofmt='json')
+
+    def time_read_url_json_memory_hit(self):
+        self.memo.read_url(self.geojson, ofmt='json')
+
+    def time_cache_response_miss(self):
+        self.serv.cache_response('%s&c=%s' % (self.url, next(self.count)))
+
+    def time_cache_response_hit(self):
+        self.serv.cache_response(self.url)
+
+#/****************************************************************************/
+# AsyncServiceSuite
+#/****************************************************************************/
+class AsyncServiceSuite(object):
+    """Benchmarks of :meth:`base._Service.aget_response` against a local stand-in
+    server, for batches of :literal:`size` URLs.
+    """
+    size = 20
+
+    def setup(self):
+        if not base.AIOHTTP_INSTALLED:
+            raise NotImplementedError('AIOHTTP not installed')
+        self.server = StubServer().start()
+        self.dir = tempfile.mkdtemp()
+        self.serv = _Service(cache_store=self.dir)
+        self.loop = asyncio.new_event_loop()
+        self.url = '%s/gisco/api?q=Berlin' % self.server.url
+        self.urls = ['%s&n=%s' % (self.url, i) for i in range(self.size)]
+        self.loop.run_until_complete(self.serv.aget_response(*self.urls))
+        self.count = itertools.count()
+
+    def teardown(self):
+        self.loop.run_until_complete(self.serv.aclose())
+        self.loop.close()
+        self.serv.close()
+        self.server.stop()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def time_aget_response_miss(self):
+        batch = next(self.count)
+        self.loop.run_until_complete(self.serv.aget_response(*['%s&b=%s' % (u, batch) for u in self.urls]))
+
+    def time_aget_response_hit(self):
+        self.loop.run_until_complete(self.serv.aget_response(*self.urls))
+
+#/****************************************************************************/
+# GDALTransformSuite
+#/****************************************************************************/
+class GDALTransformSuite(object):
+    """Benchmarks of :meth:`tools.GDALTransform.layer2fid` and :meth:`tools.GDALTransform.coord2feat`
+    on the NUTS regions (level 1) shipped in :literal:`data/ref-nuts-2013-01m`.
+    """
+
+    def setup(self):
+        if not tools.GDAL_TOOL:
+            raise NotImplementedError('GDAL not installed')
+        self.file = os.path.join(DATADIR, 'ref-nuts-2013-01m', 'NUTS_RG_01M_2013_4326_LEVL_1.shp')
+        self.tool = tools.GDALTransform(driver_name='ESRI Shapefile')
+        self.data = self.tool.get_dataset(**{_Decorator.KW_FILE: self.file})[0]
+        self.layer = self.data.GetLayer()
+        self.geom = self.tool.coord2geom(CAPITALS)
+        self.index = self.tool.layer2index(self.layer)
+
+    def time_layer2fid(self):
+        self.tool.layer2fid(self.layer, self.geom, index=self.index)
+
+    def time_layer2fid_exhaustive(self):
+        self.tool.layer2fid(self.layer, self.geom, index=False)
+
+    def time_coord2feat(self):
+        self.tool.coord2feat(CAPITALS, **{_Decorator.KW_DATA: self.data})
+
+#/****************************************************************************/
+# GeoCoordinateSuite
+#/****************************************************************************/
+class GeoCoordinateSuite(object):
+    """Benchmarks of :meth:`tools.GeoCoordinate.distance`.
+    """
+
+    def setup(self):
+        self.pair = [tuple(c) for c in CAPITALS[:2]]
+        self.locs = [tuple(c) for c in CAPITALS] * 10
+
+    def time_distance(self):
+        tools.GeoCoordinate.distance(*self.pair)
+
+    def time_distance_matrix(self):
+        tools.GeoCoordinate.distance(*self.locs)
+
+#/****************************************************************************/
+# CRSTransformSuite
+#/****************************************************************************/
+class CRSTransformSuite(object):
+    """Benchmarks of :meth:`tools.CRSTransform.transform` on arrays of geolocations,
+    with the default engine.
+    """
+
+    def setup(self):
+        try:
+            self.tool = tools.CRSTransform()
+            import numpy as np
+        except Exception as e:
+            raise NotImplementedError('CRS transformer not available - %s' % e)
+        self.point = CAPITALS[0][::-1]
+        self.locs = np.column_stack([np.linspace(-30, 40, 10**5), np.linspace(30, 70, 10**5)])
+
+    def time_transform_point(self):
+        self.tool.transform(self.point, iproj=4326, oproj=3035)
+
+    def time_transform_array(self):
+        self.tool.transform(self.locs, iproj=4326, oproj=3035)
+
+    def time_transform_array_inverse(self):
+        self.tool.transform(self.locs, iproj=3857, oproj=3035)
+
+#/****************************************************************************/
+# DecoratorSuite
+#/****************************************************************************/
+class DecoratorSuite(object):
+    """Benchmarks of the overhead of the :meth:`base._Decorator.parse_*` decorators,
+    to be compared with :meth:`time_undecorated`.
+    """
+
+    def setup(self):
+        func = lambda *args, **kwargs: (args, kwargs)
+        self.func = func
+        self.coordinate = _Decorator.parse_coordinate(lambda coord, **kwargs: coord)
+        self.place = _Decorator.parse_place(lambda place, **kwargs: place)
+        self.projection = _Decorator.parse_projection(func)
+        self.year = _Decorator.parse_year(func)
+        self.level = _Decorator.parse_level(func)
+
+    def time_undecorated(self):
+        self.func(CAPITALS[0])
+
+    def time_parse_coordinate(self):
+        self.coordinate(CAPITALS[0])
+
+    def time_parse_coordinate_list(self):
+        self.coordinate(CAPITALS)
+
+    def time_parse_place(self):
+        self.place(place='Berlin, Germany')
+
+    def time_parse_projection(self):
+        self.projection(**{_Decorator.KW_PROJECTION: 'LAEA'})
+
+    def time_parse_year(self):
+        self.year(**{_Decorator.KW_YEAR: 2013})
+
+    def time_parse_level(self):
+        self.level(**{_Decorator.KW_LEVEL: 2})
+
+#/****************************************************************************/
+# NestedDictSuite
+#/****************************************************************************/
+class NestedDictSuite(object):
+    """Benchmarks of :class:`base._NestedDict` operations on a dictionary indexed
+    by year, scale, level and projection (240 leaves).
+    """
+
+    def setup(self):
+        self.dims = {'year': [2006, 2010, 2013, 2016], 'scale': ['01m', '03m', '10m', '20m'],
+                     'level': [0, 1, 2, 3, 'ALL'], 'proj': [3035, 3857, 4326]}
+        self.dic = _NestedDict(self.dims)
+        for i, prod in enumerate(itertools.product(*self.dims.values())):
+            self.dic.xupdate(i, **dict(zip(self.dims.keys(), prod)))
+
+    def time_create(self):
+        _NestedDict(self.dims)
+
+    def time_xupdate(self):
+        self.dic.xupdate(-1, year=2013, scale='20m', level=2, proj=4326)
+
+    def time_xget(self):
+        self.dic.xget(year=2013, scale='20m', level=2, proj=4326)
+
+    def time_xget_partial(self):
+        self.dic.xget(year=2013, level=2)
+
+    def time_xvalues(self):
+        self.dic.xvalues()
+
+    def time_deepmerge(self):
+        _NestedDict._deepmerge(self.dic, {2013: {'01m': {'ALL': {3035: -1}}}})
+
+#/****************************************************************************/
+# NUTSSuite
+#/****************************************************************************/
+class NUTSSuite(object):
+    """Benchmarks of :meth:`features.NUTS.load` on the regions of Austria shipped
+    in :literal:`data`.
+    """
+
+    def setup(self):
+        with open(os.path.join(DATADIR, 'AT-region-01m-4326-2016.geojson'), 'r') as f:
+            geom = json.load(f)
+        try:
+            self.nuts = features.NUTS(**{_Decorator.KW_GEOMETRY: geom})
+        except Exception as e:
+            raise NotImplementedError('NUTS feature not available - %s' % e)
+
+    def time_load(self):
+        self.nuts.load()
+
+SUITES = [ServiceSuite, AsyncServiceSuite, GDALTransformSuite, GeoCoordinateSuite,
+          CRSTransformSuite, DecoratorSuite, NestedDictSuite, NUTSSuite]
+
+#==============================================================================
+# RUNNING/COMPARING METHODS
+#==============================================================================
+
+#/****************************************************************************/
+def _timeit(func, repeat=5, min_time=0.05):
+    # time (in seconds) of single calls of func: the number of calls per sample
+    # is doubled until a sample lasts min_time at least
+    timer, number = timeit.Timer(func), 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 2**20:
+            break
+        number *= 2
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'min':      min(samples),
+            'median':   statistics.median(samples),
+            'number':   number,
+            'repeat':   repeat}
+
+#/****************************************************************************/
+def machine_info():
+    """Description of the machine the benchmarks are run on.
+    """
+    return {'machine':  platform.node(),
+            'system':   platform.platform(),
+            'cpu':      platform.processor() or platform.machine(),
+            'ncpus':    os.cpu_count(),
+            'python':   platform.python_version()}
+
+#/****************************************************************************/
+def load_baseline(baseline=BASELINE, machine=None):
+    """Load the baselines stored for a given machine (default: the current one).
+    """
+    try:
+        with open(baseline, 'r') as f:
+            stored = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    return stored.get('machines', {}).get(machine or platform.node(), {}).get('results', {})
+
+#/****************************************************************************/
+def save_baseline(results, baseline=BASELINE, machine=None):
+    """Store the results of the benchmarks as baselines of a given machine
+    (default: the current one); baselines of benchmarks not run are kept.
+    """
+    try:
+        with open(baseline, 'r') as f:
+            stored = json.load(f)
+    except (IOError, OSError, ValueError):
+        stored = {'version': 1, 'machines': {}}
+    entry = stored['machines'].setdefault(machine or platform.node(), {'results': {}})
+    entry.update({'info': machine_info(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    entry['results'].update({k: v for k, v in results.items() if 'median' in v})
+    tmp = '%s.tmp' % baseline
+    with open(tmp, 'w') as f:
+        json.dump(stored, f, indent=1, sort_keys=True)
+    os.replace(tmp, baseline)
+
+#/****************************************************************************/
+def compare(results, reference, factor=FACTOR):
+    """Compare the results of the benchmarks with reference ones: the ratio of
+    the minimum timings (less sensitive to the load of the machine than the median
+    ones) is reported for every benchmark, and those slower than their reference 
+    by more than :data:`factor` are returned.
+    """
+    regressions = {}
+    for name, res in results.items():
+        if 'median' not in res or name not in reference:
+            continue
+        res['ratio'] = res['min'] / reference[name]['min']
+        if res['ratio'] > factor:
+            regressions[name] = res['ratio']
+    return regressions
+
+#/****************************************************************************/
+def runbench(*suites, **kwargs):
+    """Run the benchmarks of given suites (default: :data:`SUITES`).
+
+        >>> results = runbench(*suites, filter=None, repeat=5, min_time=0.05,
+                               save=False, compare=False, factor=FACTOR,
+                               machine=None, baseline=BASELINE, verbose=True)
+
+    Returns
+    -------
+    results : dict
+        timings (in seconds) of the benchmarks indexed by :literal:`Suite.time_name`;
+        benchmarks that were skipped or failed report a :literal:`skipped`
+        (*resp.* :literal:`error`) message instead; when :data:`compare` is
+        set, the key :literal:`regressions` lists the benchmarks slower than their
+        baseline.
+    """
+    pattern = kwargs.pop('filter', None)
+    repeat, min_time = kwargs.pop('repeat', 5), kwargs.pop('min_time', 0.05)
+    save, check = kwargs.pop('save', False), kwargs.pop('compare', False)
+    factor, machine = kwargs.pop('factor', FACTOR), kwargs.pop('machine', None)
+    baseline, verbose = kwargs.pop('baseline', BASELINE), kwargs.pop('verbose', True)
+    results = {}
+    for suite in suites or SUITES:
+        names = ['%s.%s' % (suite.__name__, m) for m in sorted(dir(suite)) if m.startswith('time_')]
+        names = [n for n in names if pattern is None or re.search(pattern, n)]
+        if names == []:
+            continue
+        bench = suite()
+        try:
+            getattr(bench, 'setup', lambda: None)()
+        except NotImplementedError as e:
+            results.update({n: {'skipped': str(e)} for n in names})
+            continue
+        try:
+            for name in names:
+                try:
+                    results[name] = _timeit(getattr(bench, name.split('.')[-1]),
+                                            repeat=getattr(bench, 'repeat', repeat), min_time=min_time)
+                except Exception as e:
+                    results[name] = {'error': repr(e)}
+        finally:
+            getattr(bench, 'teardown', lambda: None)()
+    regressions = {}
+    if check:
+        regressions = compare(results, load_baseline(baseline, machine), factor=factor)
+    if verbose:
+        for name, res in sorted(results.items()):
+            if 'median' in res:
+                ratio = ' (x%.2f%s)' % (res['ratio'], ' !' if name in regressions else '') if 'ratio' in res else ''
+                print('%-50s %12.3f us%s' % (name, res['median'] * 1e6, ratio))
+            else:
+                print('%-50s %s' % (name, res.get('skipped') or res.get('error')))
+        sys.stdout.flush()
+    if save:
+        save_baseline(results, baseline, machine)
+    if check:
+        results['regressions'] = regressions
+    return results
+
+#==============================================================================
+# MAIN METHOD AND TESTING AREA
+#==============================================================================
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the benchmarks of happygisco.')
+    parser.add_argument('--filter', help='regular expression selecting the benchmarks (Suite.time_name)')
+    parser.add_argument('--repeat', type=int, default=5, help='number of samples per benchmark')
+    parser.add_argument('--min-time', dest='min_time', type=float, default=0.05,
+                        help='minimum duration (in seconds) of a sample')
+    parser.add_argument('--save', action='store_true', help='store the results as baselines')
+    parser.add_argument('--compare', action='store_true', help='compare the results with the baselines')
+    parser.add_argument('--factor', type=float, default=FACTOR,
+                        help='slowdown ratio reported as a regression (default: %s)' % FACTOR)
+    parser.add_argument('--machine', help='name of the machine the baselines refer to')
+    parser.add_argument('--baseline', default=BASELINE, help='file storing the baselines')
+    args = parser.parse_args()
+    results = runbench(**vars(args))
+    sys.exit(1 if results.get('regressions') else 0)
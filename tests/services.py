@@ -44,6 +44,7 @@ metadata.update({
 import unittest
 import warnings
 import requests
+import tempfile, shutil
 
 try:                               
     import numpy as np
@@ -54,7 +55,8 @@ except ImportError:
     raise IOError
 
 from happygisco import settings
-from happygisco.services import GISCOService, APIService
+from happygisco.services import GISCOService, APIService, OSMService
+from happygisco.stubs import StubServer
 
 #==============================================================================
 # GLOBAL VARIABLES/METHODS
@@ -124,6 +126,92 @@ class GISCOServiceTestCase(unittest.TestCase):
         self.assertEqual(', '.join(place['geometry']['city'],place['geometry']['city']),
                          self.berlin['place'])
         
+#/****************************************************************************/
+# StubServiceTestCase
+#/****************************************************************************/
+class StubServiceTestCase(unittest.TestCase):
+    """Class of tests for classes :class:`GISCOService` and :class:`OSMService`
+    run offline against :class:`stubs.StubServer`
+    """    
+    module = 'services'
+    # settings of the stub server of the tests run against a faulty one
+    FAULTS = {'test_2_faults': {'rate': 20, 'error_rate': 0.3, 'seed': 1}}
+
+    #/************************************************************************/
+    def setUp(self):
+        self.cache = tempfile.mkdtemp()
+        self.server = StubServer(**self.FAULTS.get(self._testMethodName, {'seed': 0})).start()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.cache, ignore_errors=True)
+
+    #/************************************************************************/
+    def test_1_endpoints(self):
+        serv = GISCOService(cache_store=self.cache, **self.server.domains(settings.CODER_GISCO))
+        lat, lon = serv.place2coord(place=BERLIN['place'], unique=True)
+        self.assertAlmostEqual(lat, BERLIN['lat'], delta=0.0001)
+        self.assertAlmostEqual(lon, BERLIN['lon'], delta=0.0001)
+        self.assertEqual(serv.coord2nuts([lat, lon], level=2)['value'], 'DE30')
+        x, y = serv.coordconvert([[-9.1630, 38.7775]], iproj=4326, oproj=3035)
+        self.assertAlmostEqual(x, 2664895.07, delta=0.01)
+        self.assertAlmostEqual(y, 1953237.73, delta=0.01)
+        self.assertTrue(serv.url_tile('osmec')[0].startswith(self.server.url))
+        url = '%s/nuts/distribution/DE3-region-01m-4326-2013.geojson' % serv.cache_url
+        self.assertEqual(serv.read_url(url, ofmt='json')['features'][0]['id'], 'DE3')
+        self.assertIsNone(serv.place2coord(place='averyunlikelynameforacity, inanunknowncountry'))
+        self.assertEqual(len(serv.negative_cache), 1) # unresolved lookup remembered
+        osm = OSMService(cache_store=self.cache, **self.server.domains(settings.CODER_OSM))
+        lat, lon = osm.place2coord(place=PARIS['place'], unique=True)
+        self.assertAlmostEqual(lat, PARIS['lat'], delta=0.0001)
+        self.assertEqual(self.server.hits['geocode'], 3)
+        self.assertEqual(set(self.server.status.keys()), {200})
+
+    #/************************************************************************/
+    def test_2_faults(self):
+        serv = GISCOService(cache_store=self.cache, retries=10, 
+                            **self.server.domains(settings.CODER_GISCO))
+        coord = [[52.5170365, 13.3888599], [41.8933203, 12.4829321], [48.8566969, 2.3514616],
+                 [54.6870458, 25.2829111], [38.7077507, -9.1365919], [40.4167047, -3.7035825]]
+        nuts = serv.coord2nuts(coord, level=3)
+        self.assertEqual([n['value'] for n in nuts], ['DE300', 'ITI43', 'FR101', 'LT011', 'PT170', 'ES300'])
+        self.assertTrue(self.server.status[429] + self.server.status[503] > 0)
+        self.assertEqual(self.server.status[200], len(coord))
+        self.server.reset()
+        serv.coord2nuts(coord, level=3) # served from the cache
+        self.assertEqual(self.server.hits['findnuts'], 0)
+
+    #/************************************************************************/
+    def test_3_coordconvert(self):
+        serv = GISCOService(cache_store=self.cache, **self.server.domains(settings.CODER_GISCO))
+        # (Lon,lat) coordinates and their reference projections, as computed by PROJ
+        # (the first one is also returned by the GISCO ArcGIS service)
+        coord = [[-9.1630, 38.7775], [2.3412, 48.85693], [13.3888599, 52.5170365], 
+                 [25.2829111, 54.6870458], [-20., 30.]]
+        reference = {'LAEA':        [[2664895.0682, 1953237.7269], [3759973.1456, 2889605.0912],
+                                     [4550957.6636, 3272887.6822], [5298385.1205, 3613033.8105],
+                                     [1452496.0182, 1338864.6393]],
+                     'Mercator':    [[-1020020.4941, 4689850.2845], [260621.1918, 6250620.1832],
+                                     [1490441.0664, 6894157.6606], [2814480.7894, 7301363.4586],
+                                     [-2226389.8159, 3503549.8435]]}
+        grid = [[-20. + 0.4*i, 30. + 0.25*i] for i in range(150)]
+        local = {proj: serv.coordconvert(coord, iproj='WGS84', oproj=proj) for proj in reference}
+        local['grid'] = serv.coordconvert(grid, iproj='WGS84', oproj='LAEA')
+        self.assertEqual(self.server.hits['conversion'], 0)
+        serv.transformer = None # online service, by batches
+        remote = {proj: serv.coordconvert(coord, iproj='WGS84', oproj=proj) for proj in reference}
+        remote['grid'] = serv.coordconvert(grid, iproj='WGS84', oproj='LAEA')
+        self.assertEqual(self.server.hits['conversion'], 4)
+        for proj in reference:
+            for (l, r, ref) in zip(local[proj], remote[proj], reference[proj]):
+                for i in (0, 1):
+                    self.assertAlmostEqual(l[i], ref[i], delta=0.01)
+                    self.assertAlmostEqual(r[i], ref[i], delta=0.01)
+        self.assertEqual(len(remote['grid']), len(grid))
+        for (l, r) in zip(local['grid'], remote['grid']):
+            self.assertAlmostEqual(l[0], r[0], delta=0.001)
+            self.assertAlmostEqual(l[1], r[1], delta=0.001)
+        
 #/****************************************************************************/
 # APIServiceTestCase
 #/****************************************************************************/
@@ -220,7 +308,7 @@ class GDALserviceTestCase(unittest.TestCase):
 #==============================================================================
 
 def runtest():
-    _runtest(GISCOServiceTestCase, APIServiceTestCase)
+    _runtest(GISCOServiceTestCase, StubServiceTestCase, APIServiceTestCase)
     return
     
 if __name__ == '__main__':
@@ -40,15 +40,24 @@ metadata.update({
 #==============================================================================
 
 import unittest
-import math
+import os, io, math, json, zipfile, tempfile
+from unittest import mock
 
 try:
     import numpy as np
 except ImportError:
     pass
 
-from happygisco import settings
-from happygisco.tools import GeoLocation, GeoDistance, GeoAngle, GeoCoordinate, GDALTransform
+from happygisco import settings, tools
+from happygisco.settings import happyError
+from happygisco.tools import GeoLocation, GeoDistance, GeoAngle, GeoCoordinate, SpatialIndex, GDALTransform, \
+    NUTSResolver, CRSTransform
+from happygisco.tools import GDAL_TOOL
+
+try:
+    from osgeo import ogr
+except ImportError:
+    pass
 
 #==============================================================================
 # TESTING UNITS
@@ -318,3 +327,190 @@ class GeoCoordinateTestCase(unittest.TestCase):
         self.assertTrue(self.paris.intersects(versailles))
         versailles_meet_paris = self.paris.intersection(versailles)
         self.assertEqual(versailles_meet_paris.bbox,    [48.76678, 2.21569, 48.89124, 2.26651])
+
+    #/************************************************************************/
+    def test_6_arrays(self):
+        bee = GeoCoordinate.from_degrees(45.9611, 8.5809)
+        locs = [self.paris.coordinates, bee.coordinates, [26.062951, -80.238853]]
+        dist = GeoCoordinate.pairwise_distance(locs, unit='m')
+        self.assertEqual(dist.shape, (3, 3))
+        for i in range(3):
+            self.assertEqual(dist[i][i], 0.)
+            for j in range(3):
+                if i!=j:
+                    self.assertAlmostEqual(dist[i][j], 
+                                           GeoCoordinate.distance_to_from(locs[i], locs[j], unit='m'), 
+                                           places=3)
+        self.assertEqual(GeoCoordinate.pairwise_distance(locs, locs[:1]).shape, (3, 1))
+        self.assertAlmostEqual(GeoCoordinate.rowwise_distance(locs[:2], locs[1::-1])[0],
+                               self.paris.distance_to(bee), places=6)
+        bbox = GeoCoordinate.bounding_locations_array(locs, self.radius)
+        for i in range(3):
+            ref = GeoCoordinate.bounding_locations_from(locs[i], self.radius)
+            self.assertAlmostEqual(bbox[i][0][0], ref[0][0])
+            self.assertAlmostEqual(bbox[i][1][1], ref[1][1])
+
+    #/************************************************************************/
+    def test_7_scalar_distance(self):
+        bee = GeoCoordinate.from_degrees(45.9611, 8.5809)
+        locs = [self.paris.coordinates, bee.coordinates, [26.062951, -80.238853]]
+        ref = GeoCoordinate.pairwise_distance(locs, unit='m')
+        # neither GEOPY nor NUMPY available: the great circle distances are computed one by one
+        with mock.patch.object(tools, 'geopy', None, create=True), mock.patch.object(tools, 'np', None):
+            dist = GeoCoordinate.distance(*locs, unit='m')
+            self.assertIsInstance(dist, list)
+            for i in range(3):
+                for j in range(3):
+                    self.assertAlmostEqual(dist[i][j], ref[i][j], places=3)
+            self.assertAlmostEqual(GeoCoordinate.distance(*locs[:2], unit='m'), ref[1][0], places=3)
+
+#/****************************************************************************/
+# SpatialIndexTestCase
+#/****************************************************************************/
+class SpatialIndexTestCase(unittest.TestCase):
+
+    module = 'tools'
+
+    #/************************************************************************/
+    def setUp(self):
+        # grid of 10x10 unit envelopes (minX, maxX, minY, maxY), plus a large one
+        self.envelopes = [(x, x+1, y, y+1) for x in range(10) for y in range(10)]
+        self.envelopes.append((2.5, 7.5, 2.5, 7.5))
+
+    #/************************************************************************/
+    def test_1_query(self):
+        for capacity in (2, 4, 16):
+            index = SpatialIndex(self.envelopes, capacity=capacity)
+            self.assertEqual(len(index), len(self.envelopes))
+            for (x, y) in [(0.5, 0.5), (3.2, 6.7), (5, 5), (9.9, 0.1), (-1, 4), (12, 12)]:
+                expected = [i for i, e in enumerate(self.envelopes)
+                            if e[0]<=x<=e[1] and e[2]<=y<=e[3]]
+                self.assertEqual(index.query(x, y), expected)
+
+    #/************************************************************************/
+    def test_2_ids(self):
+        ids = ['NUTS%s' % i for i in range(len(self.envelopes))]
+        index = SpatialIndex(self.envelopes, ids=ids)
+        self.assertEqual(index.query(0.5, 0.5), ['NUTS0'])
+        self.assertEqual(index.intersects((-5, -1, -5, -1)), [])
+        self.assertRaises(Exception, SpatialIndex, self.envelopes, ids=ids[1:])
+
+    #/************************************************************************/
+    @unittest.skipUnless(GDAL_TOOL, 'GDAL not available')
+    def test_3_layer2fid(self):
+        fname = os.path.join(os.path.dirname(__file__), '..', 'data', 'AT-region-01m-4326-2016.geojson')
+        data = ogr.Open(fname) # keep a reference on the data source while the layer is used
+        layer = data.GetLayer()
+        geom = ogr.Geometry(ogr.wkbMultiPoint)
+        for Lon in np.linspace(9.4, 17.2, 40):
+            for lat in np.linspace(46.3, 49.1, 20):
+                pt = ogr.Geometry(ogr.wkbPoint)
+                pt.AddPoint(float(Lon), float(lat))
+                geom.AddGeometry(pt)
+        tool = GDALTransform()
+        idfeat = tool.layer2fid(layer, geom, index=True)
+        self.assertEqual(len(idfeat), geom.GetGeometryCount())
+        self.assertTrue(any(i is not None for i in idfeat))
+        self.assertTrue(any(i is None for i in idfeat))
+        self.assertEqual(idfeat, tool.layer2fid(layer, geom, index=False))
+
+#/****************************************************************************/
+# NUTSResolverTestCase
+#/****************************************************************************/
+class NUTSResolverTestCase(unittest.TestCase):
+
+    module = 'tools'
+
+    #/************************************************************************/
+    def setUp(self):
+        square = lambda x0, y0, x1, y1: [[[x0,y0], [x1,y0], [x1,y1], [x0,y1], [x0,y0]]]
+        regions = [('XX',    0, (0,0,10,10)), 
+                   ('XX1',   1, (0,0,5,10)),   ('XX2',   1, (5,0,10,10)), 
+                   ('XX11',  2, (0,0,5,5)),    ('XX12',  2, (0,5,5,10)), 
+                   ('XX111', 3, (0,0,5,5)),    ('XX121', 3, (0,5,5,10))]
+        self.geom = {'type': 'FeatureCollection',
+                     'features': [{'type': 'Feature', 
+                                   'properties': {'NUTS_ID': nid, 'LEVL_CODE': level, 'CNTR_CODE': 'XX'},
+                                   'geometry': {'type': 'Polygon', 'coordinates': square(*bbox)}}
+                                  for (nid, level, bbox) in regions]}
+
+    #/************************************************************************/
+    def test_1_coord2nuts(self):
+        resolver = NUTSResolver(geom=self.geom, year=2013)
+        self.assertEqual(sorted(resolver.levels), [0, 1, 2, 3])
+        nuts = resolver.coord2nuts(coord=[7, 2]) # (lat,Lon) order
+        self.assertEqual([n['value'] for n in nuts], ['XX', 'XX1', 'XX12', 'XX121'])
+        self.assertEqual(nuts[0]['layerName'], 'NUTS_2013')
+        self.assertEqual(nuts[2]['attributes']['LEVL_CODE'], '2')
+        self.assertEqual(resolver.coord2nuts(coord=[2, 7], level=1)['value'], 'XX2')
+        self.assertIsNone(resolver.coord2nuts(coord=[20, 20]))
+
+    #/************************************************************************/
+    def test_2_findnuts(self):
+        resolver = NUTSResolver(geom=self.geom, year=2013)
+        self.assertEqual([n['value'] for n in resolver.findnuts([2, 2])['results']],
+                         ['XX', 'XX1', 'XX11', 'XX111'])
+        self.assertEqual(resolver.findnuts([2, 2], level=[0, 3])['results'][1]['value'],
+                         'XX111')
+
+    #/************************************************************************/
+    def test_3_from_bulk(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as zf:
+            zf.writestr('NUTS_RG_01M_2013_4326.geojson', json.dumps(self.geom))
+            zf.writestr('NUTS_RG_01M_2013_3035.geojson', json.dumps({'type': 'FeatureCollection', 'features': []}))
+        class service(object):
+            def url_nuts(self, *args, **kwargs):        return 'bulk.zip'
+            def get_response(self, url, **kwargs):      return type('response', (object,), {'content': buf.getvalue()})
+        for proj in ('WGS84', 'EPSG4326', 4326):
+            resolver = NUTSResolver.from_bulk(service(), proj=proj, year=2013)
+            self.assertEqual(resolver.coord2nuts(coord=[2, 7], level=1)['value'], 'XX2')
+        self.assertRaises(Exception, NUTSResolver.from_bulk, service(), proj='dumb')
+        # a cached archive is read from disk, and its file is closed
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'bulk.zip')
+            with open(path, 'wb') as f:
+                f.write(buf.getvalue())
+            response = mock.Mock(_cache_path=path, _cache_codec=None, raw=open(path, 'rb'))
+            type(response).content = mock.PropertyMock(side_effect=AssertionError)
+            service.get_response = lambda self, url, **kwargs: response
+            resolver = NUTSResolver.from_bulk(service(), proj=4326, year=2013)
+            self.assertEqual(resolver.coord2nuts(coord=[2, 7], level=1)['value'], 'XX2')
+            self.assertTrue(response.raw.closed)
+
+#/****************************************************************************/
+# CRSTransformTestCase
+#/****************************************************************************/
+class CRSTransformTestCase(unittest.TestCase):
+
+    module = 'tools'
+
+    #/************************************************************************/
+    def setUp(self):
+        self.lisbon = [-9.1630, 38.7775]                    # (Lon,lat) order
+        self.lisbon_laea = [2664895.0682, 1953237.7269]     # as returned by GISCO ArcGIS service
+
+    #/************************************************************************/
+    def test_1_transform(self):
+        for engine in CRSTransform.ENGINES:
+            if not CRSTransform.isavailable(engine):
+                continue
+            tool = CRSTransform(engine=engine)
+            x, y = tool.transform(self.lisbon, iproj='WGS84', oproj='LAEA')[0]
+            self.assertAlmostEqual(x, self.lisbon_laea[0], delta=0.01)
+            self.assertAlmostEqual(y, self.lisbon_laea[1], delta=0.01)
+            self.assertIs(tool.transformer(4326, 3035), tool.transformer('EPSG4326', 'laea'))
+
+    #/************************************************************************/
+    def test_2_roundtrip(self):
+        tool = CRSTransform()
+        coord = np.column_stack([np.linspace(-30, 40, 1000), np.linspace(30, 70, 1000)])
+        for proj in (3035, 3857, 4258):
+            new_coord = tool.transform(coord, iproj=4326, oproj=proj)
+            self.assertEqual(new_coord.shape, coord.shape)
+            back = tool.transform(new_coord, iproj=proj, oproj=4326)
+            self.assertTrue(np.allclose(back, coord, atol=1e-7))
+        self.assertRaises(Exception, tool.transform, coord)
+        self.assertRaises(Exception, CRSTransform, engine='unknown')
+        with mock.patch.object(CRSTransform, 'isavailable', return_value=False):
+            self.assertRaises(happyError, CRSTransform)